@@ -28,6 +28,9 @@ from typing import List, Dict, Any, Optional
 from datetime import datetime, timezone, timedelta
 from dotenv import load_dotenv
 from collections import deque
+from utils.sharding import load_seed_parts, parse_shard, select_shard
+from utils.key_index import DEFAULT_INDEX_PATH, LazyKeyIndex
+from utils.progress_journal import ProgressJournal
 
 # ==== Dedup Utils (leve, na origem) ====
 import os, json, re, glob, unicodedata
@@ -97,13 +100,19 @@ def load_seen_keys(base="data/raw", pattern="*.jsonl", limit=None):
 def _load_seen_keys_all():
     return load_seen_keys(base="data/raw", pattern="*.jsonl")
 
+def _raw_jsonl_files():
+    return [Path(p) for p in sorted(glob.glob(os.path.join("data/raw", "*.jsonl")))]
+
 # ==== /Dedup Utils ====
 
 # ---- Dedup na origem: índice global de chaves já vistas ----
+# Índice persistente em SQLite (hash das chaves), aberto só na primeira consulta;
+# a cada execução ingere apenas arquivos novos ou que cresceram (tamanho/mtime).
 try:
     _DEDUP_SEEN = _DEDUP_SEEN  # já existe
 except NameError:
-    _DEDUP_SEEN = _load_seen_keys_all()
+    _DEDUP_SEEN = LazyKeyIndex(os.getenv("DEDUP_INDEX", DEFAULT_INDEX_PATH),
+                               make_dedup_key, _raw_jsonl_files)
     _DEDUP_IGNORED = 0
 # ---- /Dedup na origem ----
 
@@ -245,7 +254,8 @@ SCRIPT_VERSION = "v1.2-stable"
 
 # ---- Dedup na origem: log final ----
 try:
-    print("[dedup@origem] ignorados=" + str(_DEDUP_IGNORED) + " | index_size=" + str(len(_DEDUP_SEEN)))
+    # len() abriria o índice; no import só informamos onde ele está.
+    print("[dedup@origem] ignorados=" + str(_DEDUP_IGNORED) + " | index=" + str(_DEDUP_SEEN.path) + " (lazy)")
 except Exception:
     pass
 # ---- /log final ----
@@ -280,28 +290,22 @@ class Verbose:
         if self.enabled and self.level >= min_level:
             self._write(line)
 
-class ProgressRecorder:
+class ProgressRecorder(ProgressJournal):
+    """Progresso em journal append-only: save() só grava a cada PROGRESS_FLUSH_MS e o
+    JSON é compactado a cada PROGRESS_COMPACT_EVERY linhas (e no close)."""
+
     def __init__(self, path: str = "logs/collector_progress.json"):
-        self.path = Path(path)
-        self.path.parent.mkdir(parents=True, exist_ok=True)
+        super().__init__(
+            Path(path),
+            flush_ms=float(os.getenv("PROGRESS_FLUSH_MS", "1000")),
+            compact_every=int(os.getenv("PROGRESS_COMPACT_EVERY", "500")),
+        )
 
     def save(self, **kwargs):
-        data = {}
-        if self.path.exists():
-            try:
-                data = json.loads(self.path.read_text(encoding="utf-8"))
-            except Exception:
-                data = {}
-        data.update(kwargs)
-        self.path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
-
-    def load(self) -> dict:
-        if self.path.exists():
-            try:
-                return json.loads(self.path.read_text(encoding="utf-8"))
-            except Exception:
-                return {}
-        return {}
+        super().save(**kwargs)
+        # Estados terminais vão direto para o disco.
+        if kwargs.get("stage") in ("done", "error"):
+            self.flush()
 
 
 
@@ -315,6 +319,8 @@ def _build_parser():
     p.add_argument("--verbose-level", type=int, default=1, choices=[1,2], help="1 contagens, 2 detalha faixas.")
     p.add_argument("--log-file", type=str, default=None, help="Também escreve as mensagens nesse arquivo.")
     p.add_argument("--progress-file", type=str, default="logs/collector_progress.json", help="JSON de progresso.")
+    p.add_argument("--shard", type=str, default=None,
+                   help="Coleta só o shard i/N dos artistas de data/seed/seed_part_*.txt (hash estável).")
     return p
 
 
@@ -331,7 +337,12 @@ def main():
         verbose.v(f"→ início {_now()} snapshot {snapshot}")
 
         # As funções abaixo devem existir no seu script original:
-        artists = load_seed_artists()
+        if args.shard:
+            shard_i, shard_n = parse_shard(args.shard)
+            artists = select_shard(load_seed_parts(SEED_DIR), shard_i, shard_n)
+            verbose.v(f"→ shard {shard_i}/{shard_n}: {len(artists)} artistas")
+        else:
+            artists = load_seed_artists()
         total = len(artists)
 
         start_idx = args.offset_artists
@@ -384,7 +395,10 @@ def main():
         verbose.v(f"✗ erro: {e}")
         raise
     finally:
+        progress.close()
         verbose.close()
+        if isinstance(_DEDUP_SEEN, LazyKeyIndex):
+            _DEDUP_SEEN.close()
 
 
 if __name__ == '__main__':
@@ -3,19 +3,58 @@
 from __future__ import annotations
 
 import argparse
+import asyncio
 import fcntl
 import json
 import os
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, Dict, Iterable, Iterator, List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
 try:
-    from spotify_client import SpotifyClient, SpotifyClientError
+    from spotify_client import (
+        AsyncSpotifyClient,
+        SpotifyClient,
+        SpotifyClientError,
+        SpotifyRateLimit,
+    )
+    from utils.batch_loader import BatchLoader, CatalogLoaders
+    from utils.checkpoint import ArtistCheckpoint, CheckpointJournal
+    from utils.job_queue import Job, JobQueue
+    from utils.jsonl_writer import FSYNC_POLICIES, JsonlWriter
+    from utils.markets import compact_row
+    from utils.resolution_cache import ResolutionCache
+    from utils.sharding import load_seed_parts, parse_shard, select_shard
+    from utils.snapshot_index import SnapshotIndex, snapshot_history
 except ImportError:  # pragma: no cover - fallback when executed as module
-    from .spotify_client import SpotifyClient, SpotifyClientError  # type: ignore[no-redef]
+    from .spotify_client import (  # type: ignore[no-redef]
+        AsyncSpotifyClient,
+        SpotifyClient,
+        SpotifyClientError,
+        SpotifyRateLimit,
+    )
+    from .utils.batch_loader import BatchLoader, CatalogLoaders  # type: ignore[no-redef]
+    from .utils.checkpoint import ArtistCheckpoint, CheckpointJournal  # type: ignore[no-redef]
+    from .utils.job_queue import Job, JobQueue  # type: ignore[no-redef]
+    from .utils.jsonl_writer import FSYNC_POLICIES, JsonlWriter  # type: ignore[no-redef]
+    from .utils.markets import compact_row  # type: ignore[no-redef]
+    from .utils.resolution_cache import ResolutionCache  # type: ignore[no-redef]
+    from .utils.sharding import (  # type: ignore[no-redef]
+        load_seed_parts,
+        parse_shard,
+        select_shard,
+    )
+    from .utils.snapshot_index import SnapshotIndex, snapshot_history  # type: ignore[no-redef]
+
+API = "https://api.spotify.com/v1"
+ALBUM_GROUPS = "album,single,appears_on,compilation"
+# Resolution cache strategy: the top /search hit for the query in the target market.
+SEARCH_STRATEGY = "search_top1"
+_LOG_LOCK = threading.Lock()
 
 
 def load_env_file(env_path: Path) -> None:
@@ -43,20 +82,11 @@ def chunked(seq: Iterable[Any], size: int) -> Iterator[List[Any]]:
         yield bucket
 
 
-def atomic_append_jsonl(path: Path, row: Dict[str, Any]) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    tmp_path = path.parent / f".{path.name}.tmp"
-    with tmp_path.open("w", encoding="utf-8") as handle:
-        json.dump(row, handle, ensure_ascii=False)
-        handle.write("\n")
-    with path.open("ab") as target, tmp_path.open("rb") as src:
-        target.write(src.read())
-    tmp_path.unlink(missing_ok=True)
-
-
 def json_log(event: str, **payload: Any) -> None:
     data = {"event": event, "ts": int(time.time()), **payload}
-    print(json.dumps(data, ensure_ascii=False), flush=True)
+    line = json.dumps(data, ensure_ascii=False)
+    with _LOG_LOCK:
+        print(line, flush=True)
 
 
 @contextmanager
@@ -72,32 +102,20 @@ def exclusive_lock(lock_path: Path) -> Iterator[None]:
         os.close(fd)
 
 
-def collect_artist_catalog(
-    client: SpotifyClient,
-    artist_query: str,
-    market: str,
-    out_path: Path,
-) -> int:
-    search_payload = client.get(
-        "https://api.spotify.com/v1/search",
-        params={"q": artist_query, "type": "artist", "limit": 1, "market": market},
-    )
-    items = search_payload.get("artists", {}).get("items", [])
-    if not items:
-        warn_row = {
-            "_type": "warn",
-            "artist_query": artist_query,
-            "market": market,
-            "warning": "artist_not_found",
-            "ts": int(time.time()),
-        }
-        atomic_append_jsonl(out_path, warn_row)
-        json_log("artist_not_found", query=artist_query, market=market)
-        return 0
+def _warn_row(artist_query: str, market: str) -> Dict[str, Any]:
+    return {
+        "_type": "warn",
+        "artist_query": artist_query,
+        "market": market,
+        "warning": "artist_not_found",
+        "ts": int(time.time()),
+    }
 
-    artist_id = items[0]["id"]
-    artist_detail = client.get(f"https://api.spotify.com/v1/artists/{artist_id}")
-    artist_row = {
+
+def _artist_row(
+    artist_query: str, artist_id: str, artist_detail: Dict[str, Any], market: str
+) -> Dict[str, Any]:
+    return {
         "_type": "artist_meta",
         "artist_query": artist_query,
         "artist_id": artist_id,
@@ -108,87 +126,704 @@ def collect_artist_catalog(
         "market": market,
         "ts": int(time.time()),
     }
-    atomic_append_jsonl(out_path, artist_row)
-    json_log("artist_collected", artist_id=artist_id, query=artist_query)
 
-    albums: List[Dict[str, Any]] = []
-    next_url: Optional[str] = f"https://api.spotify.com/v1/artists/{artist_id}/albums"
-    params = {
-        "include_groups": "album,single,appears_on,compilation",
+
+def _album_meta_entry(album: Dict[str, Any]) -> Dict[str, Any]:
+    ext = album.get("external_ids") or {}
+    return {
+        "album_label": album.get("label"),
+        "album_release_date": album.get("release_date"),
+        "album_release_precision": album.get("release_date_precision"),
+        "album_type": album.get("album_type"),
+        "album_total_tracks": album.get("total_tracks"),
+        "album_upc": ext.get("upc"),
+    }
+
+
+def _track_row(
+    track: Dict[str, Any],
+    artist_id: str,
+    artist_query: str,
+    album_meta: Dict[str, Dict[str, Any]],
+    market: str,
+) -> Dict[str, Any]:
+    album_id = track.get("album", {}).get("id")
+    meta = album_meta.get(album_id, {})
+    markets = track.get("available_markets") or []
+    return {
+        "_type": "track_row",
+        "artist_id": artist_id,
+        "artist_query": artist_query,
+        "album_id": album_id,
+        "album_label": meta.get("album_label"),
+        "album_release_date": meta.get("album_release_date"),
+        "album_release_precision": meta.get("album_release_precision"),
+        "album_type": meta.get("album_type"),
+        "album_total_tracks": meta.get("album_total_tracks"),
+        "album_upc": meta.get("album_upc"),
+        "track_id": track.get("id"),
+        "track_name": track.get("name"),
+        "duration_ms": track.get("duration_ms"),
+        "explicit": track.get("explicit"),
+        "track_number": track.get("track_number"),
+        "disc_number": track.get("disc_number"),
+        "track_popularity": track.get("popularity"),
+        "preview_url": track.get("preview_url"),
+        "available_in_BR": "BR" in markets,
+        "n_markets": len(markets),
+        "available_markets": markets,
+        "isrc": (track.get("external_ids") or {}).get("isrc"),
         "market": market,
-        "limit": 50,
+        "ts": int(time.time()),
     }
+
+
+def _write_track_rows(
+    writer: JsonlWriter,
+    track_ids: List[str],
+    track_details: Dict[str, Any],
+    artist_id: str,
+    artist_query: str,
+    album_meta: Dict[str, Dict[str, Any]],
+    market: str,
+) -> int:
+    """Write one artist's track rows and log a single summary instead of one line per track."""
+    total_rows = 0
+    in_br = 0
+    max_markets = 0
+    for track_id in track_ids:
+        track = track_details.get(track_id)
+        if not track:
+            continue
+        row = _track_row(track, artist_id, artist_query, album_meta, market)
+        writer.write(row)
+        total_rows += 1
+        in_br += row["available_in_BR"]
+        max_markets = max(max_markets, row["n_markets"])
+    json_log(
+        "tracks_persisted",
+        artist_id=artist_id,
+        rows=total_rows,
+        missing=len(track_ids) - total_rows,
+        available_in_BR=in_br,
+        max_markets=max_markets,
+    )
+    return total_rows
+
+
+def _search_params(artist_query: str, market: str) -> Dict[str, Any]:
+    return {"q": artist_query, "type": "artist", "limit": 1, "market": market}
+
+
+def _cached_artist(
+    resolutions: Optional[ResolutionCache], artist_query: str, market: str
+) -> Tuple[bool, Optional[str]]:
+    """``(hit, artist_id)`` from the resolution cache; ``artist_id`` is None if not found."""
+    cached = resolutions.get(artist_query, SEARCH_STRATEGY, market) if resolutions else None
+    if cached is None:
+        return False, None
+    return True, cached.artist_id
+
+
+def _searched_artist(
+    resolutions: Optional[ResolutionCache],
+    artist_query: str,
+    market: str,
+    payload: Dict[str, Any],
+) -> Optional[str]:
+    items = payload.get("artists", {}).get("items", [])
+    if resolutions is not None:
+        resolutions.put(
+            artist_query,
+            SEARCH_STRATEGY,
+            market,
+            items[0] if items else None,
+            candidates=[{"id": item.get("id"), "name": item.get("name")} for item in items[1:]],
+        )
+    return items[0]["id"] if items else None
+
+
+def _artist_not_found(writer: JsonlWriter, artist_query: str, market: str, cached: bool) -> int:
+    writer.write(_warn_row(artist_query, market))
+    json_log("artist_not_found", query=artist_query, market=market, cached=cached)
+    return 0
+
+
+def _albums_params(market: str) -> Dict[str, Any]:
+    return {"include_groups": ALBUM_GROUPS, "market": market, "limit": 50}
+
+
+def _album_tracks_url(album_id: str) -> str:
+    return f"{API}/albums/{album_id}/tracks"
+
+
+def _album_tracks_params(market: str) -> Dict[str, Any]:
+    return {"market": market, "limit": 50}
+
+
+def _page_track_ids(page: Dict[str, Any]) -> List[str]:
+    return [track["id"] for track in page.get("items", []) or [] if track and track.get("id")]
+
+
+def collect_album_track_ids(
+    client: SpotifyClient, album_id: str, detail: Optional[Dict[str, Any]], market: str
+) -> List[str]:
+    """Track IDs of one album, starting from the page embedded in the ``/albums`` payload.
+
+    Only albums with more than one page (or missing from the batch response) cost extra
+    ``/albums/{id}/tracks`` requests.
+    """
+    page = (detail or {}).get("tracks")
+    if page is None:
+        page = client.get(_album_tracks_url(album_id), params=_album_tracks_params(market))
+    track_ids = _page_track_ids(page)
+    next_url = page.get("next")
     while next_url:
-        page = client.get(next_url, params=params)
-        params = {}
-        albums.extend(page.get("items", []) or [])
+        page = client.get(next_url)
+        track_ids.extend(_page_track_ids(page))
         next_url = page.get("next")
+    return track_ids
 
-    album_meta: Dict[str, Dict[str, Any]] = {}
-    for batch in chunked([alb["id"] for alb in albums], 20):
-        details = client.get("https://api.spotify.com/v1/albums", params={"ids": ",".join(batch)})
-        for album in details.get("albums", []) or []:
-            ext = album.get("external_ids") or {}
-            album_meta[album["id"]] = {
-                "album_label": album.get("label"),
-                "album_release_date": album.get("release_date"),
-                "album_release_precision": album.get("release_date_precision"),
-                "album_type": album.get("album_type"),
-                "album_total_tracks": album.get("total_tracks"),
-                "album_upc": ext.get("upc"),
-            }
-
-    track_pairs: List[Dict[str, str]] = []
+
+async def collect_album_track_ids_async(
+    client: AsyncSpotifyClient, album_id: str, detail: Optional[Dict[str, Any]], market: str
+) -> List[str]:
+    """Async variant of :func:`collect_album_track_ids`."""
+    page = (detail or {}).get("tracks")
+    if page is None:
+        page = await client.get(_album_tracks_url(album_id), params=_album_tracks_params(market))
+    track_ids = _page_track_ids(page)
+    next_url = page.get("next")
+    while next_url:
+        page = await client.get(next_url)
+        track_ids.extend(_page_track_ids(page))
+        next_url = page.get("next")
+    return track_ids
+
+
+def _carry_forward(
+    previous: Optional[SnapshotIndex],
+    artist_id: str,
+    albums: List[Dict[str, Any]],
+) -> Tuple[List[Dict[str, Any]], List[bytes]]:
+    """Split off albums unchanged since ``previous``; return the albums still to fetch and
+    the rows to copy for the others.
+
+    An album is unchanged when the previous snapshot has rows for it under the same
+    artist and its listed ``total_tracks`` matches the stored ``album_total_tracks``. The
+    rows are written with the album stage, so a retry before it never copies them twice.
+    """
+    if previous is None:
+        return albums, []
+    changed: List[Dict[str, Any]] = []
+    carried: List[bytes] = []
     for album in albums:
-        album_tracks = client.get(
-            f"https://api.spotify.com/v1/albums/{album['id']}/tracks",
-            params={"market": market, "limit": 50},
+        lines = previous.unchanged_lines(artist_id, album["id"], album.get("total_tracks"))
+        if lines is None:
+            changed.append(album)
+            continue
+        carried.extend(lines)
+    json_log(
+        "albums_delta",
+        artist_id=artist_id,
+        listed=len(albums),
+        changed=len(changed),
+        carried_rows=len(carried),
+    )
+    return changed, carried
+
+
+def _artist_stage_done(
+    writer: JsonlWriter,
+    journal: Optional[CheckpointJournal],
+    artist_query: str,
+    market: str,
+    artist_id: str,
+    row: Dict[str, Any],
+) -> None:
+    writer.write(row)
+    json_log("artist_collected", artist_id=artist_id, query=artist_query)
+    if journal is not None:
+        # A retry or --resume after this point must not write the artist row again.
+        writer.flush()
+        journal.record_artist(artist_query, market, artist_id)
+
+
+def _written_artist_id(
+    journal: Optional[CheckpointJournal], artist_query: str, market: str
+) -> Optional[str]:
+    """Artist ID whose ``artist_meta`` row the journal already holds (``None`` otherwise)."""
+    state = journal.get(artist_query, market) if journal is not None else None
+    if state is None or not state.artist_written:
+        return None
+    json_log("artist_resumed", artist_query=artist_query, artist_id=state.artist_id, stage="albums")
+    return state.artist_id
+
+
+def _album_stage_done(
+    writer: JsonlWriter,
+    journal: Optional[CheckpointJournal],
+    artist_query: str,
+    market: str,
+    artist_id: str,
+    album_meta: Dict[str, Dict[str, Any]],
+    track_pairs: List[Dict[str, str]],
+    batch_size: int,
+    carried_lines: List[bytes],
+) -> ArtistCheckpoint:
+    for line in carried_lines:
+        writer.write_line(line)
+    carried_rows = len(carried_lines)
+    if journal is not None:
+        writer.flush()
+        journal.record_albums(
+            artist_query, market, artist_id, album_meta, track_pairs, batch_size, carried_rows
         )
-        for track in album_tracks.get("items", []) or []:
-            track_pairs.append({"album_id": album["id"], "track_id": track["id"]})
+    return ArtistCheckpoint(
+        artist_id=artist_id,
+        album_meta=album_meta,
+        track_pairs=track_pairs,
+        batch_size=batch_size,
+        carried_rows=carried_rows,
+    )
 
-    total_rows = 0
-    for batch in chunked([pair["track_id"] for pair in track_pairs], 50):
-        track_details = client.get(
-            "https://api.spotify.com/v1/tracks", params={"ids": ",".join(batch)}
+
+def _pending_track_batches(state: ArtistCheckpoint) -> List[Tuple[int, List[str]]]:
+    track_ids = [pair["track_id"] for pair in state.track_pairs]
+    return [
+        (index, batch)
+        for index, batch in enumerate(chunked(track_ids, state.batch_size))
+        if index not in state.track_batches
+    ]
+
+
+def _write_track_batch(
+    writer: JsonlWriter,
+    journal: Optional[CheckpointJournal],
+    state: ArtistCheckpoint,
+    index: int,
+    batch: List[str],
+    track_details: Dict[str, Any],
+    artist_query: str,
+    market: str,
+) -> int:
+    rows = _write_track_rows(
+        writer,
+        batch,
+        track_details,
+        state.artist_id or "",
+        artist_query,
+        state.album_meta or {},
+        market,
+    )
+    if journal is not None:
+        # Rows must be on disk before the stage is marked complete.
+        writer.flush()
+        journal.record_tracks(artist_query, market, index, rows)
+    return rows
+
+
+def _resumed_state(
+    journal: Optional[CheckpointJournal], artist_query: str, market: str
+) -> Optional[ArtistCheckpoint]:
+    state = journal.get(artist_query, market) if journal is not None else None
+    if state is None or not state.albums_done:
+        return None
+    json_log(
+        "artist_resumed",
+        artist_query=artist_query,
+        artist_id=state.artist_id,
+        track_batches_done=len(state.track_batches),
+    )
+    return state
+
+
+def collect_artist_catalog(
+    client: SpotifyClient,
+    artist_query: str,
+    market: str,
+    writer: JsonlWriter,
+    loaders: Optional[CatalogLoaders] = None,
+    journal: Optional[CheckpointJournal] = None,
+    previous: Optional[SnapshotIndex] = None,
+    resolutions: Optional[ResolutionCache] = None,
+) -> int:
+    """Collect one artist's catalog; ``loaders`` may be shared to batch IDs across artists.
+
+    With a ``journal``, finished stages are recorded and a later call resumes after the
+    last one, rebuilding ``album_meta``/``track_pairs`` from the journal. With a
+    ``previous`` snapshot index, only new or changed albums are hydrated and the rows of
+    the others are carried forward. With ``resolutions``, the query's artist ID (or its
+    absence) is taken from the cache instead of ``/search``. Returns the artist's total
+    track rows, including carried rows and those written before a resume.
+    """
+    loaders = loaders or CatalogLoaders(client, market=market, deadline=0.0)
+    state = _resumed_state(journal, artist_query, market)
+    if state is None:
+        artist_id = _written_artist_id(journal, artist_query, market)
+        if artist_id is None:
+            cached, artist_id = _cached_artist(resolutions, artist_query, market)
+            if not cached:
+                search_payload = client.get(
+                    f"{API}/search", params=_search_params(artist_query, market)
+                )
+                artist_id = _searched_artist(resolutions, artist_query, market, search_payload)
+            if artist_id is None:
+                return _artist_not_found(writer, artist_query, market, cached)
+
+            artist_detail = loaders.artists.load_many([artist_id])[artist_id] or {}
+            _artist_stage_done(
+                writer,
+                journal,
+                artist_query,
+                market,
+                artist_id,
+                _artist_row(artist_query, artist_id, artist_detail, market),
+            )
+
+        albums: List[Dict[str, Any]] = []
+        next_url: Optional[str] = f"{API}/artists/{artist_id}/albums"
+        params = _albums_params(market)
+        while next_url:
+            page = client.get(next_url, params=params)
+            params = {}
+            albums.extend(page.get("items", []) or [])
+            next_url = page.get("next")
+
+        albums, carried_lines = _carry_forward(previous, artist_id, albums)
+        album_details = loaders.albums.load_many([alb["id"] for alb in albums])
+        album_meta: Dict[str, Dict[str, Any]] = {}
+        for album in album_details.values():
+            if album:
+                album_meta[album["id"]] = _album_meta_entry(album)
+
+        track_pairs: List[Dict[str, str]] = []
+        for album in albums:
+            detail = album_details.get(album["id"])
+            for track_id in collect_album_track_ids(client, album["id"], detail, market):
+                track_pairs.append({"album_id": album["id"], "track_id": track_id})
+
+        state = _album_stage_done(
+            writer,
+            journal,
+            artist_query,
+            market,
+            artist_id,
+            album_meta,
+            track_pairs,
+            loaders.tracks.max_batch,
+            carried_lines,
+        )
+
+    total_rows = state.rows_written
+    for index, batch in _pending_track_batches(state):
+        track_details = loaders.tracks.load_many(batch)
+        total_rows += _write_track_batch(
+            writer, journal, state, index, batch, track_details, artist_query, market
         )
-        for track in track_details.get("tracks", []) or []:
-            album_id = track.get("album", {}).get("id")
-            markets = track.get("available_markets") or []
-            row = {
-                "_type": "track_row",
-                "artist_id": artist_id,
-                "artist_query": artist_query,
-                "album_id": album_id,
-                "album_label": album_meta.get(album_id, {}).get("album_label"),
-                "album_release_date": album_meta.get(album_id, {}).get("album_release_date"),
-                "album_release_precision": album_meta.get(album_id, {}).get(
-                    "album_release_precision"
-                ),
-                "album_type": album_meta.get(album_id, {}).get("album_type"),
-                "album_total_tracks": album_meta.get(album_id, {}).get("album_total_tracks"),
-                "album_upc": album_meta.get(album_id, {}).get("album_upc"),
-                "track_id": track.get("id"),
-                "track_name": track.get("name"),
-                "duration_ms": track.get("duration_ms"),
-                "explicit": track.get("explicit"),
-                "track_number": track.get("track_number"),
-                "disc_number": track.get("disc_number"),
-                "track_popularity": track.get("popularity"),
-                "preview_url": track.get("preview_url"),
-                "available_in_BR": "BR" in markets,
-                "n_markets": len(markets),
-                "available_markets": markets,
-                "isrc": (track.get("external_ids") or {}).get("isrc"),
-                "market": market,
-                "ts": int(time.time()),
-            }
-            atomic_append_jsonl(out_path, row)
-            json_log("track_persisted", track_id=row["track_id"], n_markets=row["n_markets"])
-            total_rows += 1
     return total_rows
 
 
+async def _load_async(
+    client: AsyncSpotifyClient, loader: BatchLoader, ids: List[str]
+) -> Dict[str, Any]:
+    """Resolve ``ids`` through a shared loader, one worker thread per full batch, each
+    holding one of ``client``'s in-flight slots."""
+    parts = await asyncio.gather(
+        *(client.run_blocking(loader.load_many, batch) for batch in chunked(ids, loader.max_batch))
+    )
+    merged: Dict[str, Any] = {}
+    for part in parts:
+        merged.update(part)
+    return merged
+
+
+async def collect_artist_catalog_async(
+    client: AsyncSpotifyClient,
+    artist_query: str,
+    market: str,
+    writer: JsonlWriter,
+    loaders: Optional[CatalogLoaders] = None,
+    journal: Optional[CheckpointJournal] = None,
+    previous: Optional[SnapshotIndex] = None,
+    resolutions: Optional[ResolutionCache] = None,
+) -> int:
+    """Async variant of :func:`collect_artist_catalog` producing the same rows.
+
+    Extra track pages of long albums and the multi-ID lookups through ``loaders`` (one
+    thread per batch) run concurrently, together bounded by ``client.max_in_flight``; rows
+    are written in the same order as the synchronous collector once each stage completes.
+    """
+    loaders = loaders or CatalogLoaders(client.client, market=market, deadline=0.0)
+    state = _resumed_state(journal, artist_query, market)
+    if state is None:
+        artist_id = _written_artist_id(journal, artist_query, market)
+        if artist_id is None:
+            cached, artist_id = _cached_artist(resolutions, artist_query, market)
+            if not cached:
+                search_payload = await client.get(
+                    f"{API}/search", params=_search_params(artist_query, market)
+                )
+                artist_id = _searched_artist(resolutions, artist_query, market, search_payload)
+            if artist_id is None:
+                return _artist_not_found(writer, artist_query, market, cached)
+
+            artist_detail = (await _load_async(client, loaders.artists, [artist_id]))[
+                artist_id
+            ] or {}
+            _artist_stage_done(
+                writer,
+                journal,
+                artist_query,
+                market,
+                artist_id,
+                _artist_row(artist_query, artist_id, artist_detail, market),
+            )
+
+        albums: List[Dict[str, Any]] = []
+        next_url: Optional[str] = f"{API}/artists/{artist_id}/albums"
+        params = _albums_params(market)
+        while next_url:
+            page = await client.get(next_url, params=params)
+            params = {}
+            albums.extend(page.get("items", []) or [])
+            next_url = page.get("next")
+
+        albums, carried_lines = _carry_forward(previous, artist_id, albums)
+        album_ids = [alb["id"] for alb in albums]
+        album_details = await _load_async(client, loaders.albums, album_ids)
+
+        album_meta: Dict[str, Dict[str, Any]] = {}
+        for album in album_details.values():
+            if album:
+                album_meta[album["id"]] = _album_meta_entry(album)
+
+        per_album = await asyncio.gather(
+            *(
+                collect_album_track_ids_async(client, album_id, album_details.get(album_id), market)
+                for album_id in album_ids
+            )
+        )
+        track_pairs = [
+            {"album_id": album_id, "track_id": track_id}
+            for album_id, album_track_ids in zip(album_ids, per_album)
+            for track_id in album_track_ids
+        ]
+        state = _album_stage_done(
+            writer,
+            journal,
+            artist_query,
+            market,
+            artist_id,
+            album_meta,
+            track_pairs,
+            loaders.tracks.max_batch,
+            carried_lines,
+        )
+
+    pending = _pending_track_batches(state)
+    details = await asyncio.gather(
+        *(client.run_blocking(loaders.tracks.load_many, batch) for _index, batch in pending)
+    )
+    total_rows = state.rows_written
+    for (index, batch), track_details in zip(pending, details):
+        total_rows += _write_track_batch(
+            writer, journal, state, index, batch, track_details, artist_query, market
+        )
+    return total_rows
+
+
+def _artist_loaders(client: SpotifyClient, market: str, workers: int) -> CatalogLoaders:
+    # A lone worker never has anyone to share a partial batch with.
+    return CatalogLoaders(client, market=market, deadline=0.0 if workers <= 1 else None)
+
+
+def _log_artist_done(
+    artist: str,
+    rows: int,
+    index: int,
+    loaders: CatalogLoaders,
+    writer: JsonlWriter,
+    stats: Dict[str, Any],
+) -> None:
+    json_log(
+        "artist_done",
+        artist_query=artist,
+        rows=rows,
+        index=index,
+        batching=loaders.stats(),
+        writer=writer.stats(),
+        **stats,
+    )
+
+
+def _finished_rows(
+    journal: Optional[CheckpointJournal], artist: str, market: str, index: int
+) -> Optional[int]:
+    """Rows of an artist the journal already marks as done (``None`` if it must run)."""
+    state = journal.get(artist, market) if journal is not None else None
+    if state is None or not state.done:
+        return None
+    json_log("artist_skipped", artist_query=artist, index=index, rows=state.rows)
+    return state.rows
+
+
+def _artist_finished(
+    journal: Optional[CheckpointJournal],
+    artist: str,
+    market: str,
+    rows: int,
+    index: int,
+    loaders: CatalogLoaders,
+    writer: JsonlWriter,
+    stats: Dict[str, Any],
+) -> None:
+    writer.flush()
+    if journal is not None:
+        journal.record_artist_done(artist, market, rows)
+    _log_artist_done(artist, rows, index, loaders, writer, stats)
+
+
+def _rate_limited(exc: BaseException) -> bool:
+    # Retries exhausted on 429s surface as RetryError chained to the last SpotifyRateLimit.
+    return isinstance(exc, SpotifyRateLimit) or isinstance(exc.__cause__, SpotifyRateLimit)
+
+
+def _artist_failed(queue: JobQueue, job: Job, exc: Exception) -> None:
+    state = queue.fail(job, str(exc), rate_limited=_rate_limited(exc))
+    json_log(
+        "artist_error",
+        artist_query=job.artist,
+        index=job.priority,
+        attempt=job.attempts,
+        state=state,
+        error=str(exc),
+    )
+
+
+def _idle_wait(queue: JobQueue, requeue_wait: float) -> Optional[float]:
+    """Seconds to sleep before the next cooled-down job, or ``None`` to stop draining."""
+    ready_at = queue.next_ready_at()
+    if ready_at is None:
+        return None
+    wait = max(0.0, ready_at - queue.clock())
+    return wait if wait <= requeue_wait else None
+
+
+def _collect_artists(
+    client: SpotifyClient,
+    artists: List[str],
+    market: str,
+    writer: JsonlWriter,
+    workers: int = 1,
+    journal: Optional[CheckpointJournal] = None,
+    previous: Optional[SnapshotIndex] = None,
+    queue: Optional[JobQueue] = None,
+    requeue_wait: float = 0.0,
+    resolutions: Optional[ResolutionCache] = None,
+) -> int:
+    """Drain the artist queue with up to ``workers`` threads sharing the client and writer.
+
+    Failed artists are requeued after the queue's cooldown and retried in this run if they
+    cool down within ``requeue_wait`` seconds of the queue running dry. Returns the track
+    rows of every artist the queue hands out; those a ``journal`` marks as done are counted
+    without collecting them again (``main`` requeues ``done`` jobs on ``--resume``).
+    """
+    loaders = _artist_loaders(client, market, workers)
+    if queue is None:
+        queue = JobQueue(Path(":memory:"))
+        queue.enqueue(artists, market)
+
+    def run(job: Job) -> int:
+        finished = _finished_rows(journal, job.artist, market, job.priority)
+        if finished is not None:
+            queue.complete(job)
+            return finished
+        try:
+            rows = collect_artist_catalog(
+                client, job.artist, market, writer, loaders, journal, previous, resolutions
+            )
+        except Exception as exc:  # noqa: BLE001
+            _artist_failed(queue, job, exc)
+            return 0
+        _artist_finished(
+            journal, job.artist, market, rows, job.priority, loaders, writer, client.stats()
+        )
+        queue.complete(job)
+        return rows
+
+    def drain() -> int:
+        rows = 0
+        while True:
+            job = queue.claim()
+            if job is not None:
+                rows += run(job)
+                continue
+            wait = _idle_wait(queue, requeue_wait)
+            if wait is None:
+                return rows
+            time.sleep(wait)
+
+    if workers <= 1:
+        return drain()
+    client.size_pool(workers)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="artist") as pool:
+        futures = [pool.submit(drain) for _ in range(workers)]
+        return sum(future.result() for future in futures)
+
+
+async def _collect_artists_async(
+    client: AsyncSpotifyClient,
+    artists: List[str],
+    market: str,
+    writer: JsonlWriter,
+    workers: int = 1,
+    journal: Optional[CheckpointJournal] = None,
+    previous: Optional[SnapshotIndex] = None,
+    queue: Optional[JobQueue] = None,
+    requeue_wait: float = 0.0,
+    resolutions: Optional[ResolutionCache] = None,
+) -> int:
+    """Drain the artist queue with ``workers`` tasks (see :func:`_collect_artists`)."""
+    loaders = _artist_loaders(client.client, market, workers)
+    if queue is None:
+        queue = JobQueue(Path(":memory:"))
+        queue.enqueue(artists, market)
+
+    async def run(job: Job) -> int:
+        finished = _finished_rows(journal, job.artist, market, job.priority)
+        if finished is not None:
+            queue.complete(job)
+            return finished
+        try:
+            rows = await collect_artist_catalog_async(
+                client, job.artist, market, writer, loaders, journal, previous, resolutions
+            )
+        except Exception as exc:  # noqa: BLE001
+            _artist_failed(queue, job, exc)
+            return 0
+        _artist_finished(
+            journal, job.artist, market, rows, job.priority, loaders, writer, client.stats()
+        )
+        queue.complete(job)
+        return rows
+
+    async def drain() -> int:
+        rows = 0
+        while True:
+            job = queue.claim()
+            if job is not None:
+                rows += await run(job)
+                continue
+            wait = _idle_wait(queue, requeue_wait)
+            if wait is None:
+                return rows
+            await asyncio.sleep(wait)
+
+    results = await asyncio.gather(*(drain() for _ in range(max(1, workers))))
+    return sum(results)
+
+
 def dry_run(fixtures_path: Path) -> None:
     json_log("dry_run_start", fixtures=str(fixtures_path))
     for fixture_file in sorted(fixtures_path.glob("*.jsonl")):
@@ -205,6 +840,16 @@ def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
     parser.add_argument("--limit-artists", type=int, default=5)
     parser.add_argument("--snapshot", help="Snapshot identifier", required=False)
     parser.add_argument("--seed", default="seed/seed_artists.txt")
+    parser.add_argument(
+        "--shard",
+        default=os.getenv("COLLECT_SHARD") or None,
+        help="Collect only shard i/N of the artists in --seed-dir (stable hash assignment)",
+    )
+    parser.add_argument(
+        "--seed-dir",
+        default="data/seed",
+        help="Directory with seed_part_*.txt used by --shard",
+    )
     parser.add_argument("--market", default=os.getenv("MARKET", "BR"))
     parser.add_argument("--output", default=None, help="Override output JSONL path")
     parser.add_argument(
@@ -215,17 +860,137 @@ def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
         default="tests/fixtures",
         help="Directory with dry-run JSONL fixtures",
     )
-    parser.add_argument("--lock-file", default="locks/collect_spotify_catalog.lock")
+    parser.add_argument(
+        "--lock-file",
+        default=None,
+        help="Collector lock (default: locks/collect_spotify_catalog[.shard-i-of-N].lock)",
+    )
+    parser.add_argument(
+        "--http-cache",
+        default=None,
+        help="SQLite response cache path (opt-in; defaults to $SPOTIFY_HTTP_CACHE)",
+    )
+    parser.add_argument(
+        "--async",
+        dest="use_async",
+        action="store_true",
+        help="Use the asyncio client and fan out album/track requests concurrently",
+    )
+    parser.add_argument(
+        "--max-in-flight",
+        type=int,
+        default=int(os.getenv("SPOTIFY_MAX_IN_FLIGHT", "8") or 8),
+        help="Maximum concurrent HTTP requests in --async mode",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.getenv("COLLECT_WORKERS", "1") or 1),
+        help="Artists collected concurrently under the collector lock",
+    )
+    parser.add_argument(
+        "--flush-rows",
+        type=int,
+        default=int(os.getenv("JSONL_FLUSH_ROWS", "500") or 500),
+        help="Commit buffered output rows every N rows",
+    )
+    parser.add_argument(
+        "--flush-ms",
+        type=float,
+        default=float(os.getenv("JSONL_FLUSH_MS", "1000") or 1000),
+        help="Commit buffered output rows at least every T milliseconds",
+    )
+    parser.add_argument(
+        "--fsync",
+        choices=FSYNC_POLICIES,
+        default=os.getenv("JSONL_FSYNC", "close") or "close",
+        help="fsync the output after every commit, once at close, or never",
+    )
+    parser.add_argument(
+        "--compact-markets",
+        action="store_true",
+        default=os.getenv("COMPACT_MARKETS", "0") == "1",
+        help="Store available_markets as a base64 bitset (see code/utils/markets.py)",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip artists and stages recorded in the output's checkpoint journal",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only hydrate albums new or changed since the previous snapshot; carry the rest",
+    )
+    parser.add_argument(
+        "--previous",
+        default=None,
+        help="Snapshot to diff against with --incremental (default: all of data/raw, newest wins)",
+    )
+    parser.add_argument(
+        "--requeue-wait",
+        type=float,
+        default=float(os.getenv("REQUEUE_MAX_WAIT_MIN", "0") or 0),
+        help="Minutes to wait for failed artists to cool down before ending the run",
+    )
+    parser.add_argument(
+        "--no-resolution-cache",
+        action="store_true",
+        help="Always /search artist names (ignore $ARTIST_RESOLUTION_CACHE)",
+    )
     return parser.parse_args(argv)
 
 
-def resolve_output(snapshot: Optional[str], override: Optional[str]) -> Path:
+def shard_suffix(shard: Optional[Tuple[int, int]]) -> str:
+    return f"shard-{shard[0]}-of-{shard[1]}" if shard else ""
+
+
+def resolve_output(
+    snapshot: Optional[str],
+    override: Optional[str],
+    shard: Optional[Tuple[int, int]] = None,
+) -> Path:
     if override:
         return Path(override)
     snapshot = snapshot or time.strftime("%Y%m%d")
+    if shard:
+        # Kept out of data/raw so shard files never match the snapshot glob.
+        name = f"funk_br_discografia_raw_{snapshot}_{shard_suffix(shard)}.jsonl"
+        return Path("data/raw/shards") / name
     return Path("data/raw") / f"funk_br_discografia_raw_{snapshot}.jsonl"
 
 
+def load_artists(args: argparse.Namespace, shard: Optional[Tuple[int, int]]) -> List[str]:
+    if shard:
+        return select_shard(load_seed_parts(Path(args.seed_dir)), *shard)
+    with Path(args.seed).open(encoding="utf-8") as handle:
+        return [line.strip() for line in handle if line.strip() and not line.startswith("#")]
+
+
+def _previous_index(
+    args: argparse.Namespace, out_path: Path, shard: Optional[Tuple[int, int]]
+) -> Optional[SnapshotIndex]:
+    if not args.incremental:
+        return None
+    # Shards diff against the merged snapshots. Without --previous every snapshot is
+    # indexed: global dedup leaves carried rows only in the older files.
+    raw_dir = resolve_output(args.snapshot, None).parent if shard else out_path.parent
+    paths = [Path(args.previous)] if args.previous else snapshot_history(raw_dir, out_path)
+    if not paths or not paths[-1].exists():
+        json_log("incremental_no_previous", out=str(out_path))
+        return None
+    started = time.time()
+    index = SnapshotIndex.build_many(paths)
+    json_log(
+        "incremental_index",
+        previous=str(paths[-1]),
+        snapshots=len(paths),
+        albums=len(index),
+        seconds=round(time.time() - started, 2),
+    )
+    return index
+
+
 def main(argv: Optional[List[str]] = None) -> int:
     args = parse_args(argv)
     repo_root = Path(__file__).resolve().parent.parent
@@ -235,37 +1000,107 @@ def main(argv: Optional[List[str]] = None) -> int:
         dry_run(Path(args.fixtures))
         return 0
 
-    out_path = resolve_output(args.snapshot, args.output)
+    try:
+        shard = parse_shard(args.shard) if args.shard else None
+    except ValueError as exc:
+        print(f"❌ {exc}", file=sys.stderr)
+        return 2
+    out_path = resolve_output(args.snapshot, args.output, shard)
     out_path.parent.mkdir(parents=True, exist_ok=True)
 
     try:
-        client = SpotifyClient.from_env()
+        client = SpotifyClient.from_env(cache_path=args.http_cache)
     except SpotifyClientError as exc:
         print(f"❌ {exc}", file=sys.stderr)
         return 2
 
-    seed_path = Path(args.seed)
+    seed_path = Path(args.seed_dir if shard else args.seed)
     if not seed_path.exists():
         print(f"❌ seed file not found: {seed_path}", file=sys.stderr)
         return 3
 
-    with seed_path.open(encoding="utf-8") as handle:
-        artists = [line.strip() for line in handle if line.strip() and not line.startswith("#")]
-    artists = artists[: args.limit_artists]
+    artists = load_artists(args, shard)[: args.limit_artists]
 
-    json_log("collector_start", artists=len(artists), market=args.market, out=str(out_path))
-    lock_path = Path(args.lock_file)
+    json_log(
+        "collector_start",
+        artists=len(artists),
+        market=args.market,
+        workers=args.workers,
+        shard=shard_suffix(shard) or None,
+        out=str(out_path),
+    )
+    lock_name = "collect_spotify_catalog" + (f".{shard_suffix(shard)}" if shard else "")
+    lock_path = Path(args.lock_file or f"locks/{lock_name}.lock")
     total_rows = 0
     start = time.time()
+    writer: Optional[JsonlWriter] = None
+    queue_stats: Optional[Dict[str, int]] = None
+    resolution_stats: Optional[Dict[str, int]] = None
     try:
         with exclusive_lock(lock_path):
-            for idx, artist in enumerate(artists, start=1):
-                try:
-                    rows = collect_artist_catalog(client, artist, args.market, out_path)
-                    total_rows += rows
-                    json_log("artist_done", artist_query=artist, rows=rows, index=idx)
-                except Exception as exc:  # noqa: BLE001
-                    json_log("artist_error", artist_query=artist, error=str(exc))
+            writer = JsonlWriter(
+                out_path,
+                flush_rows=args.flush_rows,
+                flush_ms=args.flush_ms,
+                fsync=args.fsync,
+                transform=compact_row if args.compact_markets else None,
+            )
+            if writer.repaired_bytes:
+                json_log("output_tail_repaired", out=str(out_path), bytes=writer.repaired_bytes)
+            journal = CheckpointJournal(
+                CheckpointJournal.path_for(out_path), fsync=args.fsync == "flush"
+            )
+            queue = JobQueue.from_env(JobQueue.path_for(out_path))
+            if not args.resume:
+                journal.reset()
+                queue.reset()
+            else:
+                # Finished artists go through _finished_rows again, so the totals and
+                # artist_skipped events cover the whole snapshot, not just this run.
+                queue.requeue_done()
+            queue.enqueue(artists, args.market)
+            previous = _previous_index(args, out_path, shard)
+            resolutions = None if args.no_resolution_cache else ResolutionCache.from_env()
+            try:
+                if args.use_async:
+                    aclient = AsyncSpotifyClient(client, max_in_flight=args.max_in_flight)
+                    total_rows = asyncio.run(
+                        _collect_artists_async(
+                            aclient,
+                            artists,
+                            args.market,
+                            writer,
+                            workers=args.workers,
+                            journal=journal,
+                            previous=previous,
+                            queue=queue,
+                            requeue_wait=args.requeue_wait * 60,
+                            resolutions=resolutions,
+                        )
+                    )
+                else:
+                    total_rows = _collect_artists(
+                        client,
+                        artists,
+                        args.market,
+                        writer,
+                        workers=args.workers,
+                        journal=journal,
+                        previous=previous,
+                        queue=queue,
+                        requeue_wait=args.requeue_wait * 60,
+                        resolutions=resolutions,
+                    )
+                queue_stats = queue.stats()
+                if resolutions is not None:
+                    resolution_stats = resolutions.stats()
+            finally:
+                writer.close()
+                queue.close()
+                if resolutions is not None:
+                    resolutions.close()
+                if previous is not None:
+                    previous.close()
     except BlockingIOError:
         print(f"❌ lock busy: {lock_path}", file=sys.stderr)
         return 4
@@ -276,6 +1111,10 @@ def main(argv: Optional[List[str]] = None) -> int:
         artists=len(artists),
         rows=total_rows,
         seconds=round(elapsed, 2),
+        writer=writer.stats() if writer else None,
+        queue=queue_stats,
+        resolution_cache=resolution_stats,
+        **client.stats(),
     )
     print(f"[ok] wrote -> {out_path}")
     return 0
@@ -0,0 +1,204 @@
+#!/usr/bin/env python
+"""Expand the seed list through Spotify related artists under a per-run request budget."""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import requests
+
+try:
+    from collect_spotify_catalog import API, exclusive_lock, json_log, load_env_file
+    from spotify_client import SpotifyClient, SpotifyClientError
+    from utils.frontier import DEFAULT_FRONTIER_PATH, Frontier
+    from utils.sharding import load_seed_parts
+except ImportError:  # pragma: no cover - fallback when executed as module
+    from .collect_spotify_catalog import (  # type: ignore[no-redef]
+        API,
+        exclusive_lock,
+        json_log,
+        load_env_file,
+    )
+    from .spotify_client import SpotifyClient, SpotifyClientError  # type: ignore[no-redef]
+    from .utils.frontier import DEFAULT_FRONTIER_PATH, Frontier  # type: ignore[no-redef]
+    from .utils.sharding import load_seed_parts  # type: ignore[no-redef]
+
+REQUEST_ERRORS = (SpotifyClientError, requests.RequestException)
+
+
+def _top_related(payload: Dict[str, Any], limit: int) -> List[Dict[str, Any]]:
+    artists = [artist for artist in payload.get("artists") or [] if artist.get("id")]
+    artists.sort(key=lambda artist: (-(artist.get("popularity") or 0), artist["id"]))
+    return artists[:limit]
+
+
+def crawl(
+    client: SpotifyClient,
+    frontier: Frontier,
+    *,
+    budget: int,
+    max_related: int,
+    max_depth: int,
+    market: str,
+) -> Dict[str, int]:
+    """Resolve pending seeds, then expand the best queued artists until ``budget`` GETs are spent.
+
+    Every lookup is committed to ``frontier`` as soon as it completes, so stopping at any
+    point (budget, crash, Ctrl-C) loses at most the request in flight.
+    """
+    counters = {"requests": 0, "seeds_resolved": 0, "expanded": 0, "queued": 0, "failed": 0}
+    for name in frontier.unresolved_seeds(limit=budget):
+        counters["requests"] += 1
+        try:
+            payload = client.get(
+                f"{API}/search",
+                params={"q": name, "type": "artist", "limit": 1, "market": market},
+            )
+        except REQUEST_ERRORS as exc:
+            json_log("seed_failed", seed=name, error=str(exc))
+            counters["failed"] += 1
+            continue
+        items = payload.get("artists", {}).get("items", [])
+        found = items[0] if items else {}
+        frontier.resolve_seed(name, found.get("id"), found.get("popularity"))
+        counters["seeds_resolved"] += 1
+
+    while counters["requests"] < budget:
+        # Artists at max_depth are recorded but not expanded further.
+        entry = frontier.peek(max_depth=max_depth - 1)
+        if entry is None:
+            break
+        counters["requests"] += 1
+        try:
+            payload = client.get(f"{API}/artists/{entry.artist_id}/related-artists")
+        except REQUEST_ERRORS as exc:
+            json_log("related_failed", artist_id=entry.artist_id, error=str(exc))
+            frontier.mark(entry.artist_id, "failed")
+            counters["failed"] += 1
+            continue
+        counters["queued"] += frontier.push_many(
+            _top_related(payload, max_related), entry.depth + 1, entry.artist_id
+        )
+        frontier.mark(entry.artist_id)
+        counters["expanded"] += 1
+    return counters
+
+
+def export_discovered(frontier: Frontier, path: Path) -> int:
+    """Write names of artists found through the graph (not seeds), best score first."""
+    names: List[str] = []
+    seen = set()
+    for entry in frontier.discovered(min_depth=1):
+        key = entry.name.casefold()
+        if entry.name and key not in seen:
+            seen.add(key)
+            names.append(entry.name)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.parent / f".{path.name}.tmp"
+    tmp_path.write_text("".join(f"{name}\n" for name in names), encoding="utf-8")
+    os.replace(tmp_path, path)
+    return len(names)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Crawl Spotify related artists from the seeds")
+    parser.add_argument("--seed-dir", default="data/seed")
+    parser.add_argument(
+        "--frontier",
+        default=os.getenv("RELATED_FRONTIER", DEFAULT_FRONTIER_PATH),
+        help="SQLite frontier/visited set (kept between runs)",
+    )
+    parser.add_argument(
+        "--budget",
+        type=int,
+        default=int(os.getenv("RELATED_REQUEST_BUDGET", "500")),
+        help="Maximum Spotify GETs issued by this run",
+    )
+    parser.add_argument(
+        "--max-related",
+        type=int,
+        default=int(os.getenv("MAX_RELATED_PER_SEED", "20")),
+        help="Related artists queued per expanded artist (most popular first)",
+    )
+    parser.add_argument(
+        "--max-depth",
+        type=int,
+        default=int(os.getenv("RELATED_MAX_DEPTH", "2")),
+        help="Maximum hops away from a seed",
+    )
+    parser.add_argument("--market", default=os.getenv("MARKET", "BR"))
+    parser.add_argument(
+        "--export", default=None, help="Write discovered artist names to this text file"
+    )
+    parser.add_argument(
+        "--retry-failed", action="store_true", help="Queue artists whose expansion failed again"
+    )
+    parser.add_argument("--lock-file", default="locks/crawl_related.lock")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    repo_root = Path(__file__).resolve().parent.parent
+    load_env_file(repo_root / ".env")
+
+    if os.getenv("INCLUDE_RELATED", "1") == "0":
+        json_log("related_disabled")
+        return 0
+    seed_dir = Path(args.seed_dir)
+    if not seed_dir.exists():
+        print(f"❌ seed dir not found: {seed_dir}", file=sys.stderr)
+        return 3
+    try:
+        client = SpotifyClient.from_env()
+    except SpotifyClientError as exc:
+        print(f"❌ {exc}", file=sys.stderr)
+        return 2
+
+    start = time.time()
+    lock_path = Path(args.lock_file)
+    try:
+        with exclusive_lock(lock_path):
+            frontier = Frontier(Path(args.frontier))
+            try:
+                new_seeds = frontier.add_seeds(load_seed_parts(seed_dir))
+                requeued = frontier.requeue_failed() if args.retry_failed else 0
+                json_log(
+                    "crawl_start",
+                    new_seeds=new_seeds,
+                    requeued=requeued,
+                    budget=args.budget,
+                    **frontier.stats(),
+                )
+                counters = crawl(
+                    client,
+                    frontier,
+                    budget=args.budget,
+                    max_related=args.max_related,
+                    max_depth=args.max_depth,
+                    market=args.market,
+                )
+                exported = export_discovered(frontier, Path(args.export)) if args.export else None
+                stats = frontier.stats()
+            finally:
+                frontier.close()
+    except BlockingIOError:
+        print(f"❌ lock busy: {lock_path}", file=sys.stderr)
+        return 4
+
+    json_log(
+        "crawl_complete",
+        seconds=round(time.time() - start, 2),
+        exported=exported,
+        frontier=stats,
+        **counters,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
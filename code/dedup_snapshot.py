@@ -1,7 +1,17 @@
 #!/usr/bin/env python3
-import os, sys, json, re, glob, shutil, unicodedata
+import os, sys, re, glob, heapq, shutil, struct, hashlib, tempfile, unicodedata
 from argparse import ArgumentParser
-from typing import Iterable, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, List, Tuple
+try:
+    from utils.dedup_store import DedupStore
+except ImportError:  # executado como módulo do pacote
+    from .utils.dedup_store import DedupStore
+
+try:  # orjson parseia bytes direto e bem mais rápido; json é o fallback
+    from orjson import loads as _loads
+except ImportError:
+    from json import loads as _loads
 
 def _strip_accents(s: str) -> str:
     return ''.join(c for c in unicodedata.normalize('NFD', s) if unicodedata.category(c) != 'Mn')
@@ -40,47 +50,252 @@ def make_key(obj: dict) -> str:
     y = y or 0
     return f"cty::{canonical(aname)}::{canonical(tname)}::{y}"
 
-def iter_lines_jsonl(path: str) -> Iterable[Tuple[str,dict]]:
-    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+def _raw_lines(path: str) -> Iterable[Tuple[int,bytes]]:
+    """(nº da linha, bytes) por linha não vazia, sempre terminada em \\n."""
+    with open(path, "rb") as f:
         for ln, line in enumerate(f, start=1):
-            line = line.strip()
-            if not line:
+            if not line.strip():
                 continue
-            try:
-                obj = json.loads(line)
-                yield (make_key(obj), obj)
-            except Exception:
-                # mantém linha bruta para não perder dado
-                yield (f"raw::{ln}::{hash(line)}", {"__RAW__": line})
-
-def write_atomic(path: str, lines):
-    tmp = f"{path}.tmp"
-    bak = f"{path}.bak"
-    with open(tmp, "w", encoding="utf-8") as w:
-        for L in lines:
-            w.write(L)
-            if not L.endswith("\n"):
-                w.write("\n")
-    if os.path.exists(path):
-        shutil.copy2(path, bak)
+            if not line.endswith(b"\n"):
+                line += b"\n"
+            yield ln, line
+
+def _numbered_keys(path: str) -> Iterable[Tuple[int,str,bytes]]:
+    for ln, line in _raw_lines(path):
+        try:
+            yield (ln, make_key(_loads(line)), line)
+        except Exception:
+            # mantém linha bruta para não perder dado (hash estável: vale entre processos)
+            yield (ln, f"raw::{ln}::{hashlib.blake2b(line, digest_size=8).hexdigest()}", line)
+
+def iter_keyed_lines(path: str) -> Iterable[Tuple[str,bytes]]:
+    """(chave, bytes originais da linha) por linha não vazia; a linha nunca é re-serializada."""
+    for _, key, line in _numbered_keys(path):
+        yield (key, line)
+
+def _tmp_path(path: str) -> str:
+    d, name = os.path.split(path)
+    return os.path.join(d, f".{name}.dedup.tmp")
+
+def replace_with_tmp(path: str, tmp: str, backup: bool = False):
+    """Promove o tmp já gravado; com backup, o original ganha um hard link .bak (sem cópia).
+
+    O original nunca some do próprio nome: um crash entre os dois passos deixa o .bak e o
+    arquivo antigo intactos, e o os.replace final é atômico.
+    """
+    if backup and os.path.exists(path):
+        bak = f"{path}.bak"
+        if os.path.lexists(bak):
+            os.remove(bak)  # .bak antigo de outra execução
+        os.link(path, bak)
     os.replace(tmp, path)
 
-def dedup_file(path: str):
-    seen = set()
-    kept_lines = []
-    total = ded = 0
-    for key, obj in iter_lines_jsonl(path):
-        total += 1
-        if key in seen:
-            ded += 1
-            continue
-        seen.add(key)
-        if "__RAW__" in obj:
-            kept_lines.append(obj["__RAW__"])
-        else:
-            kept_lines.append(json.dumps(obj, ensure_ascii=False))
-    write_atomic(path, kept_lines)
-    return total, len(kept_lines), ded
+def dedup_file(path: str, seen=None, backup: bool = False):
+    """Dedup em streaming: linhas mantidas vão byte a byte para o tmp; só as chaves ficam em memória.
+
+    ``seen`` compartilhado entre chamadas dá o dedup global. Se nada for descartado o
+    arquivo original fica intocado.
+    """
+    seen = set() if seen is None else seen
+    total = kept = ded = 0
+    tmp = _tmp_path(path)
+    try:
+        with open(tmp, "wb") as w:
+            for key, line in iter_keyed_lines(path):
+                total += 1
+                if key in seen:
+                    ded += 1
+                    continue
+                seen.add(key)
+                kept += 1
+                w.write(line)
+            w.flush()
+            if ded:
+                os.fsync(w.fileno())
+        if ded:
+            replace_with_tmp(path, tmp, backup)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return total, kept, ded
+
+def _dedup_one(job):
+    fp, backup = job
+    return dedup_file(fp, backup=backup)
+
+def _pool_map(fn, jobs_in: list, workers: int) -> Iterable:
+    """map em ordem de entrada; com workers > 1 roda num pool de processos."""
+    if workers <= 1 or len(jobs_in) <= 1:
+        yield from map(fn, jobs_in)
+        return
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs_in))) as ex:
+        yield from ex.map(fn, jobs_in)
+
+# --- dedup global particionado por hash da chave -------------------------------------------
+# 1) por arquivo: cada chave vira um digest de 16 bytes gravado em spill/<partição>.<arquivo>;
+# 2) por partição: lê os spills na ordem dos arquivos e marca as repetições (1ª ocorrência
+#    vence, igual ao modo serial) — cada worker só guarda as chaves da sua partição;
+# 3) por arquivo: reescreve sem as linhas marcadas (mesmo tmp + os.replace do dedup_file).
+
+def _key_digest(key: str) -> bytes:
+    return hashlib.blake2b(key.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+def _spill_keys(job) -> int:
+    idx, fp, parts, spill = job
+    outs = [open(os.path.join(spill, f"{p}.{idx}.keys"), "w") for p in range(parts)]
+    total = 0
+    try:
+        for ln, key, _ in _numbered_keys(fp):
+            total += 1
+            d = _key_digest(key)
+            outs[int.from_bytes(d[:8], "big") % parts].write(f"{ln}\t{d.hex()}\n")
+    finally:
+        for o in outs:
+            o.close()
+    return total
+
+def _mark_repeats(job) -> List[int]:
+    p, nfiles, spill = job
+    seen = set(); drops_per_file = []
+    for idx in range(nfiles):
+        drops = []
+        with open(os.path.join(spill, f"{p}.{idx}.keys")) as f:
+            for row in f:
+                ln, digest = row.rstrip("\n").split("\t", 1)
+                if digest in seen:
+                    drops.append(ln)
+                else:
+                    seen.add(digest)
+        if drops:
+            with open(os.path.join(spill, f"{p}.{idx}.drop"), "w") as f:
+                f.write("\n".join(drops) + "\n")
+        drops_per_file.append(len(drops))
+    return drops_per_file
+
+def _drop_lines(job) -> int:
+    idx, fp, parts, spill, backup = job
+    drops = set()
+    for p in range(parts):
+        dp = os.path.join(spill, f"{p}.{idx}.drop")
+        if os.path.exists(dp):
+            with open(dp) as f:
+                drops.update(int(ln) for ln in f.read().split())
+    if not drops:
+        return 0  # nada descartado: arquivo intocado
+    tmp = _tmp_path(fp)
+    try:
+        with open(tmp, "wb") as w:
+            for ln, line in _raw_lines(fp):
+                if ln not in drops:
+                    w.write(line)
+            w.flush(); os.fsync(w.fileno())
+        replace_with_tmp(fp, tmp, backup)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return len(drops)
+
+def dedup_global_partitioned(files: List[str], workers: int, backup: bool = False) -> Iterable[Tuple[int,int,int]]:
+    """Dedup global em ``workers`` processos sem conjunto compartilhado; (total, mantidos, descartados) por arquivo."""
+    parts = max(1, workers)
+    spill = tempfile.mkdtemp(prefix=".dedup-spill-", dir=os.path.dirname(files[0]) or ".")
+    try:
+        totals = list(_pool_map(_spill_keys, [(i, fp, parts, spill) for i, fp in enumerate(files)], workers))
+        list(_pool_map(_mark_repeats, [(p, len(files), spill) for p in range(parts)], workers))
+        drops = _pool_map(_drop_lines, [(i, fp, parts, spill, backup) for i, fp in enumerate(files)], workers)
+        for total, ded in zip(totals, drops):
+            yield total, total - ded, ded
+    finally:
+        shutil.rmtree(spill, ignore_errors=True)
+
+# --- dedup global fora da memória (external sort) ---------------------------------------------
+# Em vez de um set com as chaves (cty:: tem centenas de bytes), cada linha vira um registro fixo
+# (digest de 16 bytes, arquivo, linha) gravado em runs ordenados de ``run_rows`` registros; o merge
+# k-way dos runs agrupa as ocorrências de cada chave na ordem (arquivo, linha): a 1ª sobrevive,
+# as demais viram runs (arquivo, linha) de descarte, consumidos em passo único na reescrita.
+_KEY_REC = struct.Struct(">16sII")   # digest da chave, índice do arquivo, nº da linha
+_DROP_REC = struct.Struct(">II")     # índice do arquivo, nº da linha
+DEFAULT_RUN_ROWS = 1_000_000
+
+def _sorted_runs(records: Iterable[tuple], rec: struct.Struct, spill: str, prefix: str, run_rows: int) -> List[str]:
+    runs, buf = [], []
+    def flush():
+        buf.sort()
+        path = os.path.join(spill, f"{prefix}{len(runs):05d}.run")
+        with open(path, "wb") as f:
+            for i in range(0, len(buf), 65536):
+                f.write(b"".join(rec.pack(*r) for r in buf[i:i + 65536]))
+        runs.append(path); buf.clear()
+    for r in records:
+        buf.append(r)
+        if len(buf) >= run_rows:
+            flush()
+    if buf:
+        flush()
+    return runs
+
+def _read_run(path: str, rec: struct.Struct) -> Iterable[tuple]:
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(rec.size * 8192)
+            if not chunk:
+                return
+            yield from rec.iter_unpack(chunk)
+
+def _merged(runs: List[str], rec: struct.Struct) -> Iterable[tuple]:
+    return heapq.merge(*(_read_run(path, rec) for path in runs))
+
+def dedup_global_external(files: List[str], backup: bool = False, run_rows: int = DEFAULT_RUN_ROWS) -> Iterable[Tuple[int,int,int]]:
+    """Dedup global com memória limitada a ``run_rows`` registros; (total, mantidos, descartados) por arquivo."""
+    run_rows = max(1, run_rows)
+    spill = tempfile.mkdtemp(prefix=".dedup-sort-", dir=os.path.dirname(files[0]) or ".")
+    totals = [0] * len(files)
+    def keyed():
+        for idx, fp in enumerate(files):
+            for ln, key, _ in _numbered_keys(fp):
+                totals[idx] += 1
+                yield (_key_digest(key), idx, ln)
+    def repeats(key_runs):
+        last = None
+        for digest, idx, ln in _merged(key_runs, _KEY_REC):
+            if digest == last:
+                yield (idx, ln)
+            last = digest
+    try:
+        key_runs = _sorted_runs(keyed(), _KEY_REC, spill, "keys", run_rows)
+        drop_runs = _sorted_runs(repeats(key_runs), _DROP_REC, spill, "drop", run_rows)
+        for path in key_runs:
+            os.remove(path)
+        drops = _merged(drop_runs, _DROP_REC)
+        nxt = next(drops, None)
+        for idx, fp in enumerate(files):
+            if nxt is None or nxt[0] != idx:
+                yield totals[idx], totals[idx], 0  # nada descartado: arquivo intocado
+                continue
+            ded = 0
+            tmp = _tmp_path(fp)
+            try:
+                with open(tmp, "wb") as w:
+                    for ln, line in _raw_lines(fp):
+                        if nxt == (idx, ln):
+                            ded += 1; nxt = next(drops, None)
+                            continue
+                        w.write(line)
+                    w.flush(); os.fsync(w.fileno())
+                replace_with_tmp(fp, tmp, backup)
+            finally:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+            yield totals[idx], totals[idx] - ded, ded
+    finally:
+        shutil.rmtree(spill, ignore_errors=True)
+
+def dedup_against_store(files: List[str], store: DedupStore, backup: bool = False) -> Iterable[Tuple[int,int,int]]:
+    """Dedup global incremental: cada arquivo é checado contra as chaves já guardadas e entra no manifesto."""
+    for fp in files:
+        result = dedup_file(fp, store.keys_for(fp), backup=backup)
+        store.record(fp)
+        yield result
 
 def main():
     ap = ArgumentParser()
@@ -88,7 +303,20 @@ def main():
     ap.add_argument("--pattern", default="*.jsonl", help="Glob dos arquivos")
     ap.add_argument("--scope", choices=("file","global"), default="file",
                     help="file: dedup por arquivo; global: dedup entre todos (mantém 1ª ocorrência)")
+    ap.add_argument("--backup", action="store_true",
+                    help="Guarda o original como <arquivo>.bak (hard link, sem cópia) ao reescrever")
+    ap.add_argument("--jobs", type=int, default=int(os.getenv("DEDUP_JOBS", "1") or 1),
+                    help="Processos em paralelo (0 = todos os núcleos); no escopo global particiona as chaves por hash")
+    ap.add_argument("--store", default=os.getenv("DEDUP_STORE", "data/cache/dedup_global.sqlite"),
+                    help="Manifesto + chaves do escopo global (vazio = sempre reprocessa tudo)")
+    ap.add_argument("--full-rebuild", action="store_true",
+                    help="Escopo global: ignora o manifesto, relê todos os arquivos e recria o store")
+    ap.add_argument("--external", action="store_true",
+                    help="Escopo global fora da memória: runs ordenados em disco + merge k-way (sem set de chaves); sempre uma passada completa, como --full-rebuild")
+    ap.add_argument("--run-rows", type=int, default=int(os.getenv("DEDUP_RUN_ROWS", DEFAULT_RUN_ROWS) or DEFAULT_RUN_ROWS),
+                    help="Registros por run ordenado no modo --external (limita a memória)")
     args = ap.parse_args()
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
 
     pattern = os.path.join(args.path, args.pattern)
     files = sorted(glob.glob(pattern))
@@ -96,36 +324,49 @@ def main():
         print(f"[dedup] nenhum arquivo encontrado em {pattern}", file=sys.stderr)
         sys.exit(0)
 
-    print(f"[dedup] iniciando: {len(files)} arquivo(s) | base={args.path} | pattern={args.pattern} | scope={args.scope}")
+    print(f"[dedup] iniciando: {len(files)} arquivo(s) | base={args.path} | pattern={args.pattern} | scope={args.scope} | jobs={jobs}")
     grand_total = kept_total = dedup_total = 0
 
     if args.scope == "file":
-        # dedup isolado por arquivo
-        for fp in files:
-            t, k, d = dedup_file(fp)
+        # dedup isolado por arquivo (independentes: um processo por arquivo, saída na ordem dos nomes)
+        results = _pool_map(_dedup_one, [(fp, args.backup) for fp in files], jobs)
+        for fp, (t, k, d) in zip(files, results):
             grand_total += t; kept_total += k; dedup_total += d
             pct = (d / t * 100.0) if t else 0.0
             print(f"[dedup] {os.path.basename(fp)} → total={t} mantidos={k} descartados={d} ({pct:.1f}%)")
     else:
         # dedup global entre arquivos (ordem lexicográfica dos nomes)
-        seen_global = set()
-        for fp in files:
-            kept_lines = []
-            total = ded = 0
-            for key, obj in iter_lines_jsonl(fp):
-                total += 1
-                if key in seen_global:
-                    ded += 1
-                    continue
-                seen_global.add(key)
-                if "__RAW__" in obj:
-                    kept_lines.append(obj["__RAW__"])
-                else:
-                    kept_lines.append(json.dumps(obj, ensure_ascii=False))
-            write_atomic(fp, kept_lines)
-            grand_total += total; kept_total += len(kept_lines); dedup_total += ded
+        # com store, só arquivos novos/alterados desde a última execução são lidos (manifesto)
+        store = DedupStore.from_env(args.store)
+        # --external é uma passada completa por definição (não consulta o store)
+        rebuild = store is None or args.full_rebuild or args.external or not len(store)
+        if rebuild:
+            todo = files
+        else:
+            todo = store.pending(files)
+            if len(todo) < len(files):
+                print(f"[dedup][global] {len(files) - len(todo)} arquivo(s) inalterado(s) desde a última execução (manifesto)")
+            if todo and jobs > 1:
+                print("[dedup][global] incremental: arquivos checados em série contra o store (--jobs só vale na passada completa)")
+        if not rebuild:
+            results = dedup_against_store(todo, store, backup=args.backup)
+        elif args.external:
+            results = dedup_global_external(todo, backup=args.backup, run_rows=args.run_rows)
+        elif jobs > 1:
+            results = dedup_global_partitioned(todo, jobs, backup=args.backup)
+        else:
+            seen_global = set()
+            results = (dedup_file(fp, seen_global, backup=args.backup) for fp in todo)
+        for fp, (total, kept, ded) in zip(todo, results):
+            grand_total += total; kept_total += kept; dedup_total += ded
             pct = (ded / total * 100.0) if total else 0.0
-            print(f"[dedup][global] {os.path.basename(fp)} → total={total} mantidos={len(kept_lines)} descartados={ded} ({pct:.1f}%)")
+            print(f"[dedup][global] {os.path.basename(fp)} → total={total} mantidos={kept} descartados={ded} ({pct:.1f}%)")
+        if store is not None:
+            if rebuild:  # recria o store a partir dos arquivos já deduplicados
+                store.reset()
+                for fp in files:
+                    store.record(fp, (key for key, _ in iter_keyed_lines(fp)))
+            store.close()
 
     gpct = (dedup_total / grand_total * 100.0) if grand_total else 0.0
     print(f"[dedup] resumo | arquivos={len(files)} total={grand_total} mantidos={kept_total} descartados={dedup_total} ({gpct:.1f}%)")
@@ -1,31 +1,29 @@
 import os, glob, csv, json, time
 from urllib import request, parse
+from utils.rate_limit import SharedRateLimiter, urlopen_json
+from utils.token_cache import AccessTokenProvider
+
+LIMITER = SharedRateLimiter.from_env()  # compartilhado com os demais coletores
 
 def get_token():
     cid = os.getenv("SPOTIFY_CLIENT_ID"); sec = os.getenv("SPOTIFY_CLIENT_SECRET")
     if not cid or not sec:
         raise SystemExit("Falta SPOTIFY_CLIENT_ID/SECRET no ambiente")
-    basic = (cid + ":" + sec).encode()
-    basic = __import__("base64").b64encode(basic).decode()
-    data = parse.urlencode({"grant_type":"client_credentials"}).encode()
-    req = request.Request("https://accounts.spotify.com/api/token", data=data, headers={"Authorization":"Basic "+basic})
-    return json.load(request.urlopen(req))["access_token"]
+    # token pedido ao cache a cada lote (renovado antes de expirar; 401 força um novo)
+    return AccessTokenProvider(cid, sec)
 
-def batch_get_tracks(token, ids):
+def batch_get_tracks(auth, ids):
     out = {}
-    H = {"Authorization":"Bearer "+token}
     for i in range(0, len(ids), 50):
         chunk = ids[i:i+50]
         url = "https://api.spotify.com/v1/tracks?ids=" + ",".join(chunk)
-        with request.urlopen(request.Request(url, headers=H)) as r:
-            data = json.load(r)
+        data = urlopen_json(request.Request(url), LIMITER, auth=auth)
         for tr in data.get("tracks",[]) or []:
             if tr:
                 out[tr["id"]] = {
                     "isrc": ((tr.get("external_ids") or {}).get("isrc")),
                     "pop": tr.get("popularity")
                 }
-        time.sleep(0.1)
     return out
 
 def main():
@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+"""Merge per-shard collector outputs into one snapshot with global dedup and a manifest."""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    from dedup_snapshot import make_key
+except ImportError:  # pragma: no cover - fallback when executed as module
+    from .dedup_snapshot import make_key  # type: ignore[no-redef]
+
+SHARD_RE = re.compile(r"_shard-(\d+)-of-(\d+)\.jsonl$")
+
+
+def merge_key(row: Dict[str, Any]) -> str:
+    """Dedup key: per-artist rows by query and market, track rows by ``make_key``."""
+    if row.get("_type") in {"artist_meta", "warn"}:
+        return f"{row['_type']}::{row.get('artist_query')}::{row.get('market')}"
+    return make_key(row)
+
+
+def shard_inputs(shard_dir: Path, snapshot: str) -> List[Tuple[int, int, Path]]:
+    """``(index, total, path)`` of every shard output of ``snapshot``, in shard order."""
+    found = []
+    for path in shard_dir.glob(f"funk_br_discografia_raw_{snapshot}_shard-*-of-*.jsonl"):
+        match = SHARD_RE.search(path.name)
+        if match:
+            found.append((int(match.group(1)), int(match.group(2)), path))
+    return sorted(found)
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def merge(inputs: List[Path], out_path: Path) -> Dict[str, Any]:
+    """Write the first occurrence of every key across ``inputs`` (byte-for-byte) to ``out_path``.
+
+    Returns per-input and total counts; the output is replaced atomically.
+    """
+    seen = set()
+    entries: List[Dict[str, Any]] = []
+    kept_total = 0
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = out_path.parent / f".{out_path.name}.tmp"
+    with tmp_path.open("wb") as out:
+        for path in inputs:
+            rows = kept = 0
+            with path.open("rb") as handle:
+                for line_no, line in enumerate(handle, start=1):
+                    if not line.strip():
+                        continue
+                    rows += 1
+                    try:
+                        key = merge_key(json.loads(line))
+                    except (ValueError, AttributeError):
+                        # Keep unparsable or non-object lines rather than lose data (as
+                        # dedup_snapshot does).
+                        key = f"raw::{path.name}::{line_no}"
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    out.write(line if line.endswith(b"\n") else line + b"\n")
+                    kept += 1
+            kept_total += kept
+            entries.append(
+                {
+                    "file": str(path),
+                    "size_bytes": path.stat().st_size,
+                    "sha256": _sha256(path),
+                    "rows": rows,
+                    "kept": kept,
+                    "duplicates": rows - kept,
+                }
+            )
+        out.flush()
+        os.fsync(out.fileno())
+    os.replace(tmp_path, out_path)
+    return {
+        "inputs": entries,
+        "rows": sum(entry["rows"] for entry in entries),
+        "kept": kept_total,
+        "duplicates": sum(entry["duplicates"] for entry in entries),
+    }
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Merge sharded catalog snapshots")
+    parser.add_argument("--snapshot", default=None, help="Snapshot identifier (default: today)")
+    parser.add_argument("--shard-dir", default="data/raw/shards")
+    parser.add_argument("--output", default=None, help="Override merged JSONL path")
+    parser.add_argument(
+        "--allow-partial",
+        action="store_true",
+        help="Merge even if some shards of the snapshot are missing",
+    )
+    parser.add_argument("inputs", nargs="*", help="Explicit shard files (skips discovery)")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    snapshot = args.snapshot or time.strftime("%Y%m%d")
+    out_path = Path(args.output or f"data/raw/funk_br_discografia_raw_{snapshot}.jsonl")
+
+    if args.inputs:
+        inputs = [Path(path) for path in args.inputs]
+        shards: List[Tuple[int, int, Path]] = []
+    else:
+        shards = shard_inputs(Path(args.shard_dir), snapshot)
+        inputs = [path for _index, _total, path in shards]
+    if not inputs:
+        print(f"❌ no shard outputs found for snapshot {snapshot}", file=sys.stderr)
+        return 3
+
+    totals = {total for _index, total, _path in shards}
+    if len(totals) > 1:
+        print(f"❌ shard outputs disagree on N: {sorted(totals)}", file=sys.stderr)
+        return 2
+    missing: List[int] = []
+    if totals:
+        present = {index for index, _total, _path in shards}
+        missing = sorted(set(range(1, totals.pop() + 1)) - present)
+    if missing and not args.allow_partial:
+        print(f"❌ missing shards {missing} (use --allow-partial to merge anyway)", file=sys.stderr)
+        return 4
+
+    started = time.time()
+    summary = merge(inputs, out_path)
+    manifest = {
+        "snapshot": snapshot,
+        "created_at": int(time.time()),
+        "seconds": round(time.time() - started, 2),
+        "missing_shards": missing,
+        "output": {
+            "file": str(out_path),
+            "size_bytes": out_path.stat().st_size,
+            "sha256": _sha256(out_path),
+            "rows": summary["kept"],
+        },
+        **summary,
+    }
+    manifest_path = out_path.with_name(out_path.name + ".manifest.json")
+    manifest_path.write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(
+        f"[ok] merged {len(inputs)} shard(s) -> {out_path} "
+        f"(rows={summary['rows']} kept={summary['kept']} duplicates={summary['duplicates']})"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
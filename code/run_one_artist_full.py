@@ -1,8 +1,11 @@
-import os, sys, csv, json, time, base64, logging, unicodedata, re
+import os, sys, csv, json, time, base64, logging
 from typing import List, Dict, Any
 from urllib import request, parse
 from dotenv import load_dotenv
-from rapidfuzz import fuzz
+from utils.rate_limit import SharedRateLimiter, urlopen_json
+from utils.token_cache import AccessTokenProvider
+from utils.resolution_cache import ResolutionCache
+from utils.artist_match import best_match
 
 # ---------- Config/env ----------
 load_dotenv()
@@ -17,6 +20,11 @@ FLUSH_EVERY    = int(os.getenv("FLUSH_EVERY_N_ROWS","100"))
 
 SPOTIFY_CLIENT_ID     = os.getenv("SPOTIFY_CLIENT_ID")
 SPOTIFY_CLIENT_SECRET = os.getenv("SPOTIFY_CLIENT_SECRET")
+LIMITER               = SharedRateLimiter.from_env()  # compartilhado com os demais coletores
+RESOLUTIONS           = ResolutionCache.from_env()    # nome -> artist_id (com TTL)
+FUZZY_MAX_VARIANTS    = int(os.getenv("FUZZY_MAX_VARIANTS", "1") or 1)  # grafias MC/DJ/feat. testadas
+# mesma escolha em run_pilot; nº de variantes na chave do cache (configs diferentes não colidem)
+FUZZY_STRATEGY        = f"fuzzy_ratio_artist50_v{FUZZY_MAX_VARIANTS}"
 
 os.makedirs(os.path.dirname(LOG_FILE), exist_ok=True)
 os.makedirs(os.path.dirname(OUT_JSONL), exist_ok=True)
@@ -28,63 +36,51 @@ logging.basicConfig(
 )
 
 # ---------- Helpers ----------
-def _norm(x:str)->str:
-    x = unicodedata.normalize("NFKD", x or "")
-    x = "".join(ch for ch in x if not unicodedata.combining(ch))
-    x = re.sub(r"[^a-z0-9 ]+", "", x.lower())
-    return re.sub(r"\s+", " ", x).strip()
-
-def _token() -> str:
+def _token() -> AccessTokenProvider:
     if not SPOTIFY_CLIENT_ID or not SPOTIFY_CLIENT_SECRET:
         raise RuntimeError("SPOTIFY_CLIENT_ID/SECRET ausentes no .env")
-    basic = base64.b64encode(f"{SPOTIFY_CLIENT_ID}:{SPOTIFY_CLIENT_SECRET}".encode()).decode()
-    data = parse.urlencode({"grant_type":"client_credentials"}).encode()
-    req = request.Request("https://accounts.spotify.com/api/token", data=data, headers={"Authorization":f"Basic {basic}"})
-    with request.urlopen(req) as r:
-        payload = json.load(r)
-    tok = payload.get("access_token")
-    if not tok: raise RuntimeError("Falha ao obter token Spotify")
-    return tok
-
-def _http_json(url: str, headers: Dict[str,str]) -> Dict[str,Any]:
-    req = request.Request(url, headers=headers)
-    with request.urlopen(req) as r:
-        return json.load(r)
-
-def _search_artist(token: str, q: str) -> Dict[str,Any]:
+    # cache em disco compartilhado: 1 POST por hora, não 1 por processo; o token é
+    # pedido a cada requisição (renovado antes de expirar) e um 401 força um novo
+    return AccessTokenProvider(SPOTIFY_CLIENT_ID, SPOTIFY_CLIENT_SECRET)
+
+def _http_json(url: str, auth: AccessTokenProvider) -> Dict[str,Any]:
+    return urlopen_json(request.Request(url), LIMITER, auth=auth)
+
+def _search_artist(auth: AccessTokenProvider, q: str) -> Dict[str,Any]:
+    # cache de resolução compartilhado com run_pilot (mesma estratégia de ranking)
+    if RESOLUTIONS is not None:
+        cached = RESOLUTIONS.get(q, FUZZY_STRATEGY)
+        if cached is not None:
+            return cached.artist
     q_enc = parse.quote(f'artist:"{q}"')
     url = f"https://api.spotify.com/v1/search?q={q_enc}&type=artist&limit=50"
-    data = _http_json(url, {"Authorization": f"Bearer {token}"})
+    data = _http_json(url, auth)
     items = data.get("artists",{}).get("items",[]) or []
-    if not items: return {}
-    qn = _norm(q)
-    ranked = []
-    for it in items:
-        score = fuzz.ratio(_norm(it.get("name","")), qn)
-        ranked.append((score, it.get("popularity") or -1, (it.get("followers") or {}).get("total") or -1, it))
-    ranked.sort(key=lambda t: (t[0], t[1], t[2]), reverse=True)
-    best = ranked[0][3]
-    for t in ranked:
-        if t[0] == 100:
-            best = t[3]; break
-    return best
-
-def _iter_artist_albums(token: str, artist_id: str):
+    best = best_match(q, items, max_variants=FUZZY_MAX_VARIANTS)  # rank fuzz.ratio, desempate popularity -> followers
+    if best is None:
+        if RESOLUTIONS is not None:
+            RESOLUTIONS.put(q, FUZZY_STRATEGY, "", None)
+        return {}
+    if RESOLUTIONS is not None:
+        RESOLUTIONS.put(q, FUZZY_STRATEGY, "", best.artist, score=best.score,
+                        candidates=[{"id": a.get("id"), "name": a.get("name"), "score": sc}
+                                    for a, sc in best.runners_up])
+    return best.artist
+
+def _iter_artist_albums(auth: AccessTokenProvider, artist_id: str):
     # include_groups: álbuns próprios e singles; compilações opcional
     include_groups = "album,single,compilation"
     limit = 50
     offset = 0
-    headers = {"Authorization": f"Bearer {token}"}
     while True:
         url = f"https://api.spotify.com/v1/artists/{artist_id}/albums?include_groups={include_groups}&limit={limit}&offset={offset}"
-        data = _http_json(url, headers)
+        data = _http_json(url, auth)
         items = data.get("items",[]) or []
         for it in items:
             yield it
         if len(items) < limit:
             break
         offset += limit
-        time.sleep(0.1)
 
 def _album_year(album: Dict[str,Any]) -> int:
     rd = (album.get("release_date") or "")[:10]
@@ -93,31 +89,27 @@ def _album_year(album: Dict[str,Any]) -> int:
     except Exception:
         return -1
 
-def _iter_album_tracks(token: str, album_id: str):
+def _iter_album_tracks(auth: AccessTokenProvider, album_id: str):
     limit=50; offset=0
-    headers={"Authorization": f"Bearer {token}"}
     while True:
         url = f"https://api.spotify.com/v1/albums/{album_id}/tracks?limit={limit}&offset={offset}"
-        data = _http_json(url, headers)
+        data = _http_json(url, auth)
         items = data.get("items",[]) or []
         for it in items:
             yield it
         if len(items) < limit:
             break
         offset += limit
-        time.sleep(0.1)
 
-def _batch_get_tracks(token: str, ids: List[str]) -> Dict[str,Dict[str,Any]]:
+def _batch_get_tracks(auth: AccessTokenProvider, ids: List[str]) -> Dict[str,Dict[str,Any]]:
     # opcional: enriquecer com ISRC e popularity por track
     out={}
-    headers={"Authorization": f"Bearer {token}"}
     for i in range(0, len(ids), 50):
         chunk = ids[i:i+50]
         url = "https://api.spotify.com/v1/tracks?ids=" + ",".join(chunk)
-        data = _http_json(url, headers)
+        data = _http_json(url, auth)
         for tr in data.get("tracks",[]) or []:
             if tr: out[tr["id"]] = tr
-        time.sleep(0.1)
     return out
 
 def main() -> int:
@@ -126,9 +118,9 @@ def main() -> int:
         return 2
 
     logging.info(f"Coleta 1 artista — '{ARTIST_NAME}' | {YEAR_START}-{YEAR_END}")
-    token = _token()
+    auth = _token()
 
-    art = _search_artist(token, ARTIST_NAME)
+    art = _search_artist(auth, ARTIST_NAME)
     if not art:
         logging.error(f"Artista não encontrado: {ARTIST_NAME}")
         return 3
@@ -153,7 +145,7 @@ def main() -> int:
     track_ids_for_enrich = []
     rows_buffer = []
 
-    for alb in _iter_artist_albums(token, artist_id):
+    for alb in _iter_artist_albums(auth, artist_id):
         y = _album_year(alb)
         if y < YEAR_START or y > YEAR_END:
             continue
@@ -163,7 +155,7 @@ def main() -> int:
         album_total_tracks = alb.get("total_tracks")
         album_type = alb.get("album_type")
 
-        for tr in _iter_album_tracks(token, album_id):
+        for tr in _iter_album_tracks(auth, album_id):
             row = {
                 "artist_id": artist_id,
                 "artist_name": artist_name,
@@ -197,8 +189,6 @@ def main() -> int:
                 logging.info(f"flush {total_rows} linhas")
                 rows_buffer.clear()
 
-        time.sleep(0.2)  # leve respiro entre álbuns
-
     # flush final
     for r in rows_buffer:
         fjson.write(json.dumps(r, ensure_ascii=False) + "\n")
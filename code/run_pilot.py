@@ -1,9 +1,11 @@
 import os, sys, csv, json, time, base64, logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from urllib import request, parse
 from dotenv import load_dotenv
-from rapidfuzz import fuzz
-import unicodedata, re
+from utils.rate_limit import SharedRateLimiter, urlopen_json
+from utils.token_cache import AccessTokenProvider
+from utils.resolution_cache import ResolutionCache
+from utils.artist_match import match_artists, normalize_name
 
 # ---------- Config ----------
 load_dotenv()
@@ -19,6 +21,11 @@ FLUSH_EVERY    = int(os.getenv("FLUSH_EVERY_N_ROWS","200"))
 
 SPOTIFY_CLIENT_ID     = os.getenv("SPOTIFY_CLIENT_ID")
 SPOTIFY_CLIENT_SECRET = os.getenv("SPOTIFY_CLIENT_SECRET")
+LIMITER               = SharedRateLimiter.from_env()  # compartilhado com os demais coletores
+RESOLUTIONS           = ResolutionCache.from_env()    # nome do seed -> artist_id (com TTL)
+FUZZY_MAX_VARIANTS    = int(os.getenv("FUZZY_MAX_VARIANTS", "1") or 1)  # grafias MC/DJ/feat. testadas
+# mesma escolha em run_one_artist_full; nº de variantes na chave do cache (configs diferentes não colidem)
+FUZZY_STRATEGY        = f"fuzzy_ratio_artist50_v{FUZZY_MAX_VARIANTS}"
 
 os.makedirs(os.path.dirname(LOG_FILE), exist_ok=True)
 os.makedirs(os.path.dirname(OUTPUT_JSONL), exist_ok=True)
@@ -29,79 +36,100 @@ logging.basicConfig(
     handlers=[logging.FileHandler(LOG_FILE, encoding="utf-8"), logging.StreamHandler(sys.stdout)]
 )
 
-def _spotify_token() -> str:
+def _spotify_token() -> AccessTokenProvider:
     if not SPOTIFY_CLIENT_ID or not SPOTIFY_CLIENT_SECRET:
         raise RuntimeError("SPOTIFY_CLIENT_ID/SECRET ausentes no .env")
-    basic = base64.b64encode(f"{SPOTIFY_CLIENT_ID}:{SPOTIFY_CLIENT_SECRET}".encode()).decode()
-    data = parse.urlencode({"grant_type":"client_credentials"}).encode()
-    req = request.Request("https://accounts.spotify.com/api/token", data=data, headers={"Authorization":f"Basic {basic}"})
-    with request.urlopen(req) as r:
-        payload = json.load(r)
-    tok = payload.get("access_token")
-    if not tok: raise RuntimeError("Falha ao obter token Spotify")
-    return tok
+    # cache em disco compartilhado: 1 POST por hora, não 1 por processo; o token é
+    # pedido a cada requisição (renovado antes de expirar) e um 401 força um novo
+    return AccessTokenProvider(SPOTIFY_CLIENT_ID, SPOTIFY_CLIENT_SECRET)
 
 def _read_seed(path: str) -> List[str]:
     with open(path, "r", encoding="utf-8") as f:
         return [ln.strip() for ln in f if ln.strip()]
 
-def _norm(x:str)->str:
-    x = unicodedata.normalize("NFKD", x or "")
-    x = "".join(ch for ch in x if not unicodedata.combining(ch))
-    x = re.sub(r"[^a-z0-9 ]+", "", x.lower())
-    return re.sub(r"\s+", " ", x).strip()
+def _search_items(auth: AccessTokenProvider, q: str) -> Optional[List[Dict[str,Any]]]:
+    """Query restrita artist:"<q>" (limit=50, sem market); None em erro de busca."""
+    q_enc = parse.quote(f'artist:"{q}"')
+    url = f"https://api.spotify.com/v1/search?q={q_enc}&type=artist&limit=50"
+    try:
+        data = urlopen_json(request.Request(url), LIMITER, auth=auth)
+    except Exception as e:
+        logging.warning(f"search_artist erro para '{q}': {e}")
+        return None
+    return data.get("artists",{}).get("items",[]) or []
 
-def _search_artist(token: str, q: str) -> Dict[str,Any]:
+def _resolve_artists(auth: AccessTokenProvider, queries: List[str]) -> List[Dict[str,Any]]:
     """
-    Busca artista no Spotify e escolhe o melhor match pelo nome usando rapidfuzz.
-    1) Query restrita: artist:"<q>" (limit=50, sem market)
-    2) Rank por fuzz.ratio(nome_normalizado, q_normalizado)
-    3) Se houver score 100, escolhe esse; senão, maior score.
-       Empate: popularity -> followers.
+    Resolve um lote de nomes do seed para artistas do Spotify.
+    0) Cache de resolução (match ou "não encontrado" ainda válidos)
+    1) Busca restrita para os demais
+    2) Rank em lote (utils.artist_match): fuzz.ratio sobre nomes normalizados,
+       desempate por popularity -> followers
+    O resultado (com score e candidatos seguintes) vai para o cache; erros de busca não.
     """
-    q_orig = (q or "").strip()
-    q_norm = _norm(q_orig)
-    if not q_norm:
-        return {}
-
-    # 1) tentar com query restrita, sem market
-    q_enc = parse.quote(f'artist:"{q_orig}"')
-    url = f"https://api.spotify.com/v1/search?q={q_enc}&type=artist&limit=50"
-    req = request.Request(url, headers={"Authorization": f"Bearer {token}"})
+    arts: List[Dict[str,Any]] = [{} for _ in queries]
+    pending = []
+    for i, q in enumerate(queries):
+        q_orig = (q or "").strip()
+        if not normalize_name(q_orig):
+            continue
+        if RESOLUTIONS is not None:
+            cached = RESOLUTIONS.get(q_orig, FUZZY_STRATEGY)
+            if cached is not None:
+                arts[i] = cached.artist
+                continue
+        items = _search_items(auth, q_orig)
+        if items is not None:
+            pending.append((i, q_orig, items))
+
+    matches = match_artists([(q, items) for _, q, items in pending], max_variants=FUZZY_MAX_VARIANTS)
+    for (i, q_orig, _items), match in zip(pending, matches):
+        arts[i] = match.artist if match else {}
+        if RESOLUTIONS is None:
+            continue
+        if match is None:
+            RESOLUTIONS.put(q_orig, FUZZY_STRATEGY, "", None)
+        else:
+            RESOLUTIONS.put(
+                q_orig, FUZZY_STRATEGY, "", match.artist, score=match.score,
+                candidates=[{"id": a.get("id"), "name": a.get("name"), "score": sc}
+                            for a, sc in match.runners_up],
+            )
+    return arts
+
+def _refresh_artists(auth: AccessTokenProvider, arts: List[Dict[str,Any]]) -> List[Dict[str,Any]]:
+    """followers/popularity atuais via /artists?ids= (1 chamada por até 50 artistas)."""
+    ids = [a["id"] for a in arts if a.get("id")]
+    if not ids:
+        return arts
+    url = "https://api.spotify.com/v1/artists?ids=" + ",".join(ids[:50])
     try:
-        with request.urlopen(req) as r:
-            data = json.load(r)
-        items = data.get("artists",{}).get("items",[]) or []
+        data = urlopen_json(request.Request(url), LIMITER, auth=auth)
     except Exception as e:
-        logging.warning(f"search_artist erro para '{q_orig}': {e}")
-        items = []
-
-    if not items:
-        return {}
-
-    ranked = []
-    for it in items:
-        name = it.get("name","")
-        score = fuzz.ratio(_norm(name), q_norm)
-        ranked.append((
-            score,
-            it.get("popularity") or -1,
-            (it.get("followers") or {}).get("total") or -1,
-            it
-        ))
-    ranked.sort(key=lambda t: (t[0], t[1], t[2]), reverse=True)
-
-    best = ranked[0][3]
-    # se houver algum com score 100, prioriza
-    for tup in ranked:
-        if tup[0] == 100:
-            best = tup[3]
-            break
-    return best
+        logging.warning(f"refresh_artists erro: {e}")
+        return arts
+    fresh = {a["id"]: a for a in data.get("artists", []) or [] if a}
+    return [fresh.get(a.get("id"), a) for a in arts]
+
+def _write_artist_row(artist_q: str, art: Dict[str,Any], json_f, csv_w) -> None:
+    row = {
+        "artist_query": artist_q,
+        "artist_id": art.get("id") or "",
+        "artist_name": art.get("name") or "",
+        "followers": (art.get("followers") or {}).get("total"),
+        "popularity": art.get("popularity"),
+        "genres": ",".join(art.get("genres",[])),
+        "year_start": YEAR_START,
+        "year_end": YEAR_END,
+        "market": MARKET,
+        "ts": int(time.time())
+    }
+    json_f.write(json.dumps(row, ensure_ascii=False) + "\n")
+    csv_w.writerow(row)
 
 def main():
     logging.info(f"Pilot runner iniciado | SEED={SEED_FILE} | OUT_JSONL={OUTPUT_JSONL} | OUT_CSV={OUTPUT_CSV} | {YEAR_START}-{YEAR_END} | MARKET={MARKET}")
-    token = _spotify_token()
+    auth = _spotify_token()
     seed = _read_seed(SEED_FILE)
     logging.info(f"{len(seed)} artistas no seed")
 
@@ -116,30 +144,20 @@ def main():
     json_f = open(OUTPUT_JSONL, "a", encoding="utf-8")
 
     processed = 0
-    for artist_q in seed:
-        art = _search_artist(token, artist_q)
-        row = {
-            "artist_query": artist_q,
-            "artist_id": art.get("id") or "",
-            "artist_name": art.get("name") or "",
-            "followers": (art.get("followers") or {}).get("total"),
-            "popularity": art.get("popularity"),
-            "genres": ",".join(art.get("genres",[])),
-            "year_start": YEAR_START,
-            "year_end": YEAR_END,
-            "market": MARKET,
-            "ts": int(time.time())
-        }
-        json_f.write(json.dumps(row, ensure_ascii=False) + "\n")
-        csv_w.writerow(row)
-
-        processed += 1
-        if processed % FLUSH_EVERY == 0:
-            csv_f.flush(); json_f.flush()
-            logging.info(f"flush {processed} linhas")
+    for start in range(0, len(seed), 50):
+        chunk = seed[start:start + 50]
+        arts = _refresh_artists(auth, _resolve_artists(auth, chunk))
+        for artist_q, art in zip(chunk, arts):
+            _write_artist_row(artist_q, art, json_f, csv_w)
+            processed += 1
+            if processed % FLUSH_EVERY == 0:
+                csv_f.flush(); json_f.flush()
+                logging.info(f"flush {processed} linhas")
 
     csv_f.flush(); json_f.flush()
     csv_f.close(); json_f.close()
+    if RESOLUTIONS is not None:
+        logging.info(f"cache de resolução: {RESOLUTIONS.stats()}")
 
     with open(PROGRESS_FILE,"w",encoding="utf-8") as pf:
         json.dump({"processed": processed, "seed": SEED_FILE, "market": MARKET, "window":[YEAR_START, YEAR_END]}, pf, ensure_ascii=False)
@@ -10,6 +10,11 @@ from datetime import datetime
 from pathlib import Path
 from typing import Iterable, Iterator
 
+try:
+    from utils.markets import row_markets
+except ImportError:  # pragma: no cover - fallback when executed as module
+    from .utils.markets import row_markets  # type: ignore[no-redef]
+
 
 def parse_args(argv: Iterable[str] | None = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Emit sanity reports based on synthetic inputs")
@@ -58,8 +63,8 @@ def _market_bucket(record: dict) -> str:
     market = record.get("market")
     if isinstance(market, str) and market:
         return market
-    markets = record.get("available_markets")
-    if isinstance(markets, list) and markets:
+    markets = row_markets(record)
+    if markets:
         candidate = markets[0]
         if isinstance(candidate, str) and candidate:
             return candidate
@@ -2,17 +2,31 @@
 
 from __future__ import annotations
 
+import asyncio
 import os
+import threading
 import time
+from collections import OrderedDict
+from concurrent.futures import Future
 from dataclasses import dataclass
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Optional, TypeVar
 
 import requests
 
 try:
-    from .utils.retry import retry_with_backoff
+    from .utils.http_cache import ResponseCache, request_key
+    from .utils.pacing import AdaptivePacer
+    from .utils.rate_limit import SharedRateLimiter
+    from .utils.retry import async_retry_with_backoff, retry_with_backoff
+    from .utils.token_cache import TokenCache
 except ImportError:  # pragma: no cover - fallback for direct execution
-    from utils.retry import retry_with_backoff  # type: ignore[no-redef]
+    from utils.http_cache import ResponseCache, request_key  # type: ignore[no-redef]
+    from utils.pacing import AdaptivePacer  # type: ignore[no-redef]
+    from utils.rate_limit import SharedRateLimiter  # type: ignore[no-redef]
+    from utils.retry import async_retry_with_backoff, retry_with_backoff  # type: ignore[no-redef]
+    from utils.token_cache import TokenCache  # type: ignore[no-redef]
+
+T = TypeVar("T")
 
 
 class SpotifyClientError(RuntimeError):
@@ -46,6 +60,11 @@ class SpotifyClient:
     """Minimal Spotify Web API client with client credentials flow."""
 
     token_url = "https://accounts.spotify.com/api/token"
+    retry_exceptions = (
+        SpotifyRateLimit,
+        SpotifyTransientError,
+        requests.RequestException,
+    )
 
     def __init__(
         self,
@@ -55,6 +74,12 @@ class SpotifyClient:
         session: Optional[requests.Session] = None,
         timeout: float = 30.0,
         retry: Optional[RetryConfig] = None,
+        limiter: Optional[SharedRateLimiter] = None,
+        pacer: Optional[AdaptivePacer] = None,
+        token_cache: Optional[TokenCache] = None,
+        token_refresh_margin: float = 300.0,
+        cache: Optional[ResponseCache] = None,
+        memo_size: int = 256,
     ) -> None:
         if not client_id or not client_secret:
             raise SpotifyClientError("missing Spotify credentials")
@@ -63,17 +88,42 @@ class SpotifyClient:
         self.session = session or requests.Session()
         self.timeout = timeout
         self.retry = retry or RetryConfig()
+        self.limiter = limiter
+        self.pacer = pacer
+        self.token_cache = token_cache
+        self.cache = cache
+        self.memo_size = max(0, int(memo_size))
+        self.coalesced = 0
+        self.memo_hits = 0
+        self._memo: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._inflight: Dict[str, Future] = {}
+        self._flight_lock = threading.Lock()
+        self.token_refresh_margin = (
+            token_cache.refresh_margin if token_cache is not None else token_refresh_margin
+        )
         self._token: Optional[str] = None
+        self._token_expires_at = 0.0
+        self._auth_lock = threading.Lock()
 
     @classmethod
-    def from_env(cls) -> "SpotifyClient":
+    def from_env(cls, *, cache_path: Optional[str] = None) -> "SpotifyClient":
+        """Build a client from the environment; the response cache is opt-in
+        (``cache_path`` or ``SPOTIFY_HTTP_CACHE``)."""
         client_id = os.getenv("SPOTIFY_CLIENT_ID") or os.getenv("SPOTIPY_CLIENT_ID")
         client_secret = os.getenv("SPOTIFY_CLIENT_SECRET") or os.getenv("SPOTIPY_CLIENT_SECRET")
         if not client_id or not client_secret:
             raise SpotifyClientError("SPOTIFY_CLIENT_ID/SECRET not configured")
-        return cls(client_id, client_secret)
+        return cls(
+            client_id,
+            client_secret,
+            limiter=SharedRateLimiter.from_env(),
+            pacer=AdaptivePacer.from_env(),
+            token_cache=TokenCache.from_env(),
+            cache=ResponseCache.from_env(cache_path),
+            memo_size=int(os.getenv("SPOTIFY_MEMO_SIZE", "256") or 256),
+        )
 
-    def authenticate(self) -> None:
+    def _fetch_token(self) -> Dict[str, Any]:
         response = self.session.post(
             self.token_url,
             auth=(self.client_id, self.client_secret),
@@ -82,71 +132,268 @@ class SpotifyClient:
         )
         response.raise_for_status()
         data = response.json()
-        token = data.get("access_token")
-        if not token:
+        if not data.get("access_token"):
             raise SpotifyClientError("no access_token in response")
-        self._token = token
+        return data
 
-    def _request_headers(self) -> Dict[str, str]:
-        if not self._token:
-            self.authenticate()
-        assert self._token is not None
-        return {"Authorization": f"Bearer {self._token}"}
+    def authenticate(self) -> None:
+        if self.token_cache is not None:
+            self._token, self._token_expires_at = self.token_cache.get(
+                self.client_id, self._fetch_token
+            )
+            return
+        data = self._fetch_token()
+        self._token = data["access_token"]
+        self._token_expires_at = time.time() + float(data.get("expires_in") or 3600)
+
+    def _token_is_fresh(self) -> bool:
+        return bool(self._token) and (
+            time.time() < self._token_expires_at - self.token_refresh_margin
+        )
 
-    def get(self, url: str, *, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-        sleep_between = max(0.0, float(os.getenv("SPOTIFY_REQ_SLEEP", "0.35") or 0.35))
+    def _request_headers(self) -> Dict[str, str]:
+        with self._auth_lock:
+            if not self._token_is_fresh():
+                # Refresh ahead of expiry so batches in flight never hit a 401.
+                self.authenticate()
+            assert self._token is not None
+            return {"Authorization": f"Bearer {self._token}"}
+
+    def _invalidate_token(self, stale: str) -> None:
+        with self._auth_lock:
+            if self._token != stale:
+                return  # another thread already refreshed it
+            if self.token_cache is not None:
+                self.token_cache.invalidate(self.client_id, stale)
+            self._token = None
+            self._token_expires_at = 0.0
+
+    def _send(self, url: str, params: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Perform a single GET attempt, mapping failures to typed client errors."""
+        if self.pacer is not None:
+            self.pacer.wait()
+        if self.limiter is not None:
+            self.limiter.acquire()
+        headers = self._request_headers()
+        response = self.session.get(url, params=params, headers=headers, timeout=self.timeout)
+        if self.pacer is not None:
+            if response.status_code == 429 or response.status_code >= 500:
+                self.pacer.on_throttle()
+            elif response.status_code < 400:
+                self.pacer.on_success()
+
+        if response.status_code == 401:
+            # Token expired or revoked. Force re-authentication and retry.
+            self._invalidate_token(headers["Authorization"].split(" ", 1)[1])
+            raise SpotifyTransientError(401, "unauthorized")
+
+        if response.status_code == 429:
+            retry_after = response.headers.get("Retry-After")
+            try:
+                retry_seconds = float(retry_after) if retry_after is not None else 1.0
+            except ValueError:
+                retry_seconds = 1.0
+            if self.limiter is not None:
+                # Every process sharing the limiter backs off, not just this one.
+                self.limiter.pause(retry_seconds)
+            raise SpotifyRateLimit(max(0.0, retry_seconds))
 
-        def _call() -> Dict[str, Any]:
-            headers = self._request_headers()
-            response = self.session.get(url, params=params, headers=headers, timeout=self.timeout)
+        if 500 <= response.status_code < 600:
+            raise SpotifyTransientError(response.status_code, "server error")
 
-            if response.status_code == 401:
-                # Token expired or revoked. Force re-authentication and retry.
-                self._token = None
-                raise SpotifyTransientError(401, "unauthorized")
+        response.raise_for_status()
+        try:
+            return response.json()
+        except ValueError as exc:  # JSON decode issues are transient.
+            raise SpotifyTransientError(response.status_code, "invalid JSON") from exc
+
+    def _on_retry(self, exc: BaseException, _attempt: int) -> Optional[float]:
+        if isinstance(exc, SpotifyRateLimit):
+            if self.pacer is not None:
+                return self.pacer.retry_after(exc.retry_after)
+            return exc.retry_after
+        return None
+
+    def size_pool(self, connections: int) -> None:
+        """Grow the session's connection pool to serve ``connections`` concurrent callers."""
+        if isinstance(self.session, requests.Session) and connections > 10:
+            # requests pools 10 connections per host by default; match the concurrency.
+            adapter = requests.adapters.HTTPAdapter(pool_maxsize=connections)
+            self.session.mount("https://", adapter)
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters worth charting; empty sections are omitted."""
+        data: Dict[str, Any] = {}
+        if self.pacer is not None:
+            data["pacing"] = self.pacer.snapshot()
+        if self.cache is not None:
+            data["http_cache"] = self.cache.stats()
+        data["coalescing"] = {
+            "coalesced": self.coalesced,
+            "memo_hits": self.memo_hits,
+            "saved_calls": self.coalesced + self.memo_hits,
+        }
+        return data
+
+    def _memo_get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Completed response for ``key`` from this run's memo (caller holds the lock)."""
+        payload = self._memo.get(key)
+        if payload is not None:
+            self._memo.move_to_end(key)
+            self.memo_hits += 1
+        return payload
+
+    def _memo_put(self, key: str, payload: Dict[str, Any]) -> None:
+        if not self.memo_size:
+            return
+        self._memo[key] = payload
+        self._memo.move_to_end(key)
+        while len(self._memo) > self.memo_size:
+            self._memo.popitem(last=False)
 
-            if response.status_code == 429:
-                retry_after = response.headers.get("Retry-After")
-                try:
-                    retry_seconds = float(retry_after) if retry_after is not None else 1.0
-                except ValueError:
-                    retry_seconds = 1.0
-                raise SpotifyRateLimit(max(0.0, retry_seconds))
+    def get(self, url: str, *, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """GET with request coalescing: identical concurrent calls share one HTTP request.
+
+        Completed responses are kept in a bounded in-run memo. Payloads are shared between
+        callers and must be treated as read-only.
+        """
+        key = request_key(url, params)
+        with self._flight_lock:
+            memoized = self._memo_get(key)
+            if memoized is not None:
+                return memoized
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+            else:
+                self.coalesced += 1
+        assert future is not None
+        if not leader:
+            return future.result()
+
+        try:
+            payload = self._fetch(url, params)
+        except BaseException as exc:
+            with self._flight_lock:
+                self._inflight.pop(key, None)
+            future.set_exception(exc)
+            raise
+        with self._flight_lock:
+            self._memo_put(key, payload)
+            self._inflight.pop(key, None)
+        future.set_result(payload)
+        return payload
+
+    def _fetch(self, url: str, params: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        if self.cache is not None:
+            cached = self.cache.get(url, params)
+            if cached is not None:
+                return cached
+        payload = retry_with_backoff(
+            lambda: self._send(url, params),
+            max_tries=self.retry.max_tries,
+            base=self.retry.base,
+            cap=self.retry.cap,
+            jitter=True,
+            retry_exceptions=self.retry_exceptions,
+            on_retry=self._on_retry,
+        )
+        if self.cache is not None:
+            self.cache.put(url, params, payload)
+        return payload
 
-            if 500 <= response.status_code < 600:
-                raise SpotifyTransientError(response.status_code, "server error")
 
-            response.raise_for_status()
-            try:
-                payload = response.json()
-            except ValueError as exc:  # JSON decode issues are transient.
-                raise SpotifyTransientError(response.status_code, "invalid JSON") from exc
+class AsyncSpotifyClient:
+    """Asyncio facade over :class:`SpotifyClient` with a bounded number of in-flight GETs.
 
-            if sleep_between:
-                time.sleep(sleep_between)
-            return payload
+    Each attempt runs the blocking :meth:`SpotifyClient._send` in a worker thread, so the
+    401/429/5xx handling is shared with the synchronous client; retries are awaited with
+    ``asyncio.sleep``. Throughput is bounded by ``max_in_flight`` (shared with blocking
+    callers via :meth:`run_blocking`) and by the wrapped client's pacer and limiter.
+    """
 
-        def _on_retry(exc: BaseException, _attempt: int) -> Optional[float]:
-            if isinstance(exc, SpotifyRateLimit):
-                return exc.retry_after
-            return None
+    def __init__(self, client: SpotifyClient, *, max_in_flight: int = 8) -> None:
+        self.client = client
+        self.max_in_flight = max(1, int(max_in_flight))
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._inflight: Dict[str, "asyncio.Future[Dict[str, Any]]"] = {}
+        client.size_pool(self.max_in_flight)
 
-        return retry_with_backoff(
-            _call,
-            max_tries=self.retry.max_tries,
-            base=self.retry.base,
-            cap=self.retry.cap,
+    @classmethod
+    def from_env(cls, *, max_in_flight: Optional[int] = None) -> "AsyncSpotifyClient":
+        if max_in_flight is None:
+            max_in_flight = int(os.getenv("SPOTIFY_MAX_IN_FLIGHT", "8") or 8)
+        return cls(SpotifyClient.from_env(), max_in_flight=max_in_flight)
+
+    async def run_blocking(self, func: Callable[..., T], *args: Any) -> T:
+        """Run a blocking call that sends requests through the wrapped client (e.g. a
+        ``BatchLoader.load_many``) in a worker thread, holding one in-flight slot."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+        async with self._semaphore:
+            return await asyncio.to_thread(func, *args)
+
+    async def _send(self, url: str, params: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        return await self.run_blocking(self.client._send, url, params)
+
+    async def get(self, url: str, *, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Coalescing GET sharing the wrapped client's memo and counters."""
+        client = self.client
+        key = request_key(url, params)
+        with client._flight_lock:
+            memoized = client._memo_get(key)
+            if memoized is not None:
+                return memoized
+            future = self._inflight.get(key)
+            if future is not None:
+                client.coalesced += 1
+        if future is not None:
+            return await asyncio.shield(future)
+
+        future = self._inflight[key] = asyncio.get_running_loop().create_future()
+        try:
+            payload = await self._fetch(url, params)
+        except BaseException as exc:
+            self._inflight.pop(key, None)
+            if isinstance(exc, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(exc)
+                future.exception()  # mark retrieved when nobody else was waiting
+            raise
+        with client._flight_lock:
+            client._memo_put(key, payload)
+        self._inflight.pop(key, None)
+        future.set_result(payload)
+        return payload
+
+    async def _fetch(self, url: str, params: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        cache = self.client.cache
+        if cache is not None:
+            cached = await asyncio.to_thread(cache.get, url, params)
+            if cached is not None:
+                return cached
+        retry = self.client.retry
+        payload = await async_retry_with_backoff(
+            lambda: self._send(url, params),
+            max_tries=retry.max_tries,
+            base=retry.base,
+            cap=retry.cap,
             jitter=True,
-            retry_exceptions=(
-                SpotifyRateLimit,
-                SpotifyTransientError,
-                requests.RequestException,
-            ),
-            on_retry=_on_retry,
+            retry_exceptions=SpotifyClient.retry_exceptions,
+            on_retry=self.client._on_retry,
         )
+        if cache is not None:
+            await asyncio.to_thread(cache.put, url, params, payload)
+        return payload
+
+    def stats(self) -> Dict[str, Any]:
+        return self.client.stats()
 
 
 __all__ = [
+    "AsyncSpotifyClient",
     "SpotifyClient",
     "SpotifyClientError",
     "SpotifyRateLimit",
@@ -0,0 +1,152 @@
+"""Batch fuzzy matching of artist queries against Spotify search candidates."""
+
+from __future__ import annotations
+
+import re
+import unicodedata
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from rapidfuzz import fuzz, process
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only where numpy is missing
+    np = None  # type: ignore[assignment]
+
+_PREFIX_RE = re.compile(r"^(mc|dj|mcs)\s+")
+_FEAT_RE = re.compile(r"\s+(feat|ft|part|participacao|featuring)\s+.*$")
+_PARENS_RE = re.compile(r"\([^)]*\)|\[[^\]]*\]")
+
+
+def normalize_name(name: str) -> str:
+    """Accent-free lowercase alphanumerics with single spaces (the runners' ``_norm``)."""
+    name = unicodedata.normalize("NFKD", name or "")
+    name = "".join(ch for ch in name if not unicodedata.combining(ch))
+    name = re.sub(r"[^a-z0-9 ]+", "", name.lower())
+    return re.sub(r"\s+", " ", name).strip()
+
+
+def query_variants(query: str, max_variants: int = 6) -> List[str]:
+    """Normalized spellings of a seed name, the plain one first (at most ``max_variants``).
+
+    Covers the usual funk naming noise: ``MC``/``DJ`` prefixes present or not, a
+    ``feat.`` tail and bracketed notes.
+    """
+    lowered = (query or "").lower()
+    no_brackets = _PARENS_RE.sub(" ", lowered)
+    core = normalize_name(_FEAT_RE.sub("", re.sub(r"[.,]", " ", no_brackets)))
+    bare = _PREFIX_RE.sub("", core)
+    forms = [normalize_name(query), normalize_name(no_brackets), core, bare, f"mc {bare}"]
+    variants: List[str] = []
+    for form in forms:
+        if form and form not in variants:
+            variants.append(form)
+    return variants[: max(1, max_variants)]
+
+
+@dataclass
+class ArtistMatch:
+    query: str
+    artist: Dict[str, Any]
+    score: float
+    # Remaining candidates in rank order, as ``(artist, score)``.
+    runners_up: List[Tuple[Dict[str, Any], float]] = field(default_factory=list)
+
+
+def _score_matrix(queries: List[str], names: List[str], workers: int) -> Any:
+    """``len(queries) x len(names)`` ``fuzz.ratio`` scores (numpy array when available)."""
+    if np is not None:
+        return process.cdist(queries, names, scorer=fuzz.ratio, processor=None, workers=workers)
+    return [[fuzz.ratio(query, name) for name in names] for query in queries]
+
+
+def _rank(
+    scores: Sequence[float], popularity: Sequence[int], followers: Sequence[int]
+) -> List[int]:
+    """Candidate indices by score, then popularity, then followers (all descending).
+
+    Ties keep the search order, as the runners' stable ``sort(reverse=True)`` did.
+    """
+    if np is not None:
+        return np.lexsort(
+            (-np.asarray(followers), -np.asarray(popularity), -np.asarray(scores))
+        ).tolist()
+    return sorted(
+        range(len(scores)),
+        key=lambda idx: (scores[idx], popularity[idx], followers[idx]),
+        reverse=True,
+    )
+
+
+def match_artists(
+    searches: Sequence[Tuple[str, Sequence[Dict[str, Any]]]],
+    *,
+    max_variants: int = 1,
+    min_score: float = 0.0,
+    workers: int = -1,
+) -> List[Optional[ArtistMatch]]:
+    """Pick the best candidate for each ``(query, search_items)`` pair in one pass.
+
+    Candidate names are normalized once across all searches (artists repeat a lot
+    between related queries) and every query variant is scored against every distinct
+    name with a single ``process.cdist`` call on ``workers`` threads. A candidate's score
+    is its best over the query's variants. Returns ``None`` for a query without
+    candidates or whose best score is below ``min_score``.
+    """
+    names: List[str] = []
+    name_idx: Dict[str, int] = {}
+    rows: List[str] = []
+    row_idx: Dict[str, int] = {}
+    plan: List[Tuple[List[int], List[int]]] = []
+    for query, items in searches:
+        variant_rows = []
+        for variant in query_variants(query, max_variants):
+            if variant not in row_idx:
+                row_idx[variant] = len(rows)
+                rows.append(variant)
+            variant_rows.append(row_idx[variant])
+        columns = []
+        for item in items:
+            name = normalize_name(item.get("name", ""))
+            if name not in name_idx:
+                name_idx[name] = len(names)
+                names.append(name)
+            columns.append(name_idx[name])
+        plan.append((variant_rows, columns))
+
+    matrix = _score_matrix(rows, names, workers) if rows and names else []
+    results: List[Optional[ArtistMatch]] = []
+    for (query, items), (variant_rows, columns) in zip(searches, plan):
+        if not items or not variant_rows:
+            results.append(None)
+            continue
+        if np is not None:
+            scores = matrix[np.ix_(variant_rows, columns)].max(axis=0).tolist()
+        else:
+            scores = [max(matrix[row][col] for row in variant_rows) for col in columns]
+        popularity = [item.get("popularity") or -1 for item in items]
+        followers = [(item.get("followers") or {}).get("total") or -1 for item in items]
+        order = _rank(scores, popularity, followers)
+        best = order[0]
+        if scores[best] < min_score:
+            results.append(None)
+            continue
+        results.append(
+            ArtistMatch(
+                query,
+                items[best],
+                float(scores[best]),
+                [(items[idx], float(scores[idx])) for idx in order[1:]],
+            )
+        )
+    return results
+
+
+def best_match(
+    query: str, items: Sequence[Dict[str, Any]], *, max_variants: int = 1
+) -> Optional[ArtistMatch]:
+    return match_artists([(query, items)], max_variants=max_variants, workers=1)[0]
+
+
+__all__ = ["ArtistMatch", "best_match", "match_artists", "normalize_name", "query_variants"]
@@ -0,0 +1,182 @@
+"""DataLoader-style batching of Spotify multi-ID lookups shared across callers."""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, wait
+from typing import Any, Dict, List, Optional, Sequence
+
+API = "https://api.spotify.com/v1"
+
+
+class BatchLoader:
+    """Merges ID lookups from any thread into full-size ``?ids=`` requests.
+
+    Requested IDs are queued; a batch is dispatched as soon as ``max_batch`` IDs are
+    pending, or by a waiting caller once its ``deadline`` expires. The thread that
+    dispatches performs the HTTP call itself, so no background worker is needed.
+    Results are matched to IDs by position (Spotify returns them in request order,
+    even when track relinking changes the returned ``id``).
+
+    Args:
+        client: Object with a ``get(url, *, params)`` method (``SpotifyClient``).
+        url: Multi-ID endpoint, e.g. ``.../v1/tracks``.
+        result_key: Key holding the result list (``"tracks"``).
+        max_batch: IDs per request accepted by the endpoint.
+        deadline: Seconds a partial batch may wait for more IDs.
+        params: Extra query parameters (e.g. ``market``).
+        memo_size: Completed results kept for repeated IDs.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        url: str,
+        result_key: str,
+        *,
+        max_batch: int,
+        deadline: float = 0.05,
+        params: Optional[Dict[str, Any]] = None,
+        memo_size: int = 4096,
+    ) -> None:
+        self.client = client
+        self.url = url
+        self.result_key = result_key
+        self.max_batch = max(1, max_batch)
+        self.deadline = max(0.0, deadline)
+        self.params = dict(params or {})
+        self.memo_size = max(0, memo_size)
+        self.requests = 0
+        self.ids_requested = 0
+        self._pending: "OrderedDict[str, Future]" = OrderedDict()
+        self._futures: Dict[str, Future] = {}
+        self._memo: "OrderedDict[str, Optional[Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _take(self, full_only: bool) -> List[List[str]]:
+        """Pop pending IDs into batches (caller holds the lock)."""
+        batches: List[List[str]] = []
+        while self._pending and (not full_only or len(self._pending) >= self.max_batch):
+            batch = []
+            while self._pending and len(batch) < self.max_batch:
+                batch.append(self._pending.popitem(last=False)[0])
+            batches.append(batch)
+        return batches
+
+    def _dispatch(self, batch: List[str]) -> None:
+        with self._lock:
+            futures = [self._futures[item_id] for item_id in batch]
+            self.requests += 1
+            self.ids_requested += len(batch)
+        try:
+            payload = self.client.get(self.url, params={**self.params, "ids": ",".join(batch)})
+            items = payload.get(self.result_key) or []
+        except Exception as exc:  # noqa: BLE001 - delivered to every waiter of the batch
+            with self._lock:
+                for item_id in batch:
+                    self._futures.pop(item_id, None)
+            for future in futures:
+                future.set_exception(exc)
+            return
+        results = dict(zip(batch, items))
+        with self._lock:
+            for item_id in batch:
+                self._futures.pop(item_id, None)
+                if self.memo_size:
+                    self._memo[item_id] = results.get(item_id)
+            while len(self._memo) > self.memo_size:
+                self._memo.popitem(last=False)
+        for item_id, future in zip(batch, futures):
+            future.set_result(results.get(item_id))
+
+    def flush(self) -> None:
+        """Dispatch every pending ID now."""
+        with self._lock:
+            batches = self._take(full_only=False)
+        for batch in batches:
+            self._dispatch(batch)
+
+    def load_many(self, ids: Sequence[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Resolve ``ids``; unknown IDs map to ``None``."""
+        results: Dict[str, Optional[Dict[str, Any]]] = {}
+        own: Dict[str, Future] = {}
+        with self._lock:
+            for item_id in ids:
+                if item_id in results or item_id in own:
+                    continue
+                if item_id in self._memo:
+                    self._memo.move_to_end(item_id)
+                    results[item_id] = self._memo[item_id]
+                    continue
+                future = self._futures.get(item_id)
+                if future is None:
+                    future = self._futures[item_id] = self._pending[item_id] = Future()
+                own[item_id] = future
+            batches = self._take(full_only=True)
+        for batch in batches:
+            self._dispatch(batch)
+
+        deadline_at = time.monotonic() + self.deadline
+        pending = list(own.values())
+        while pending:
+            remaining = deadline_at - time.monotonic()
+            if remaining > 0:
+                _done, not_done = wait(pending, timeout=remaining)
+                pending = list(not_done)
+                continue
+            self.flush()
+            wait(pending)
+            break
+        for item_id, future in own.items():
+            results[item_id] = future.result()
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "ids": self.ids_requested,
+            "fill": (
+                round(self.ids_requested / (self.requests * self.max_batch), 3)
+                if self.requests
+                else None
+            ),
+        }
+
+
+class CatalogLoaders:
+    """The three multi-ID loaders used by the catalog collector, sharing one client."""
+
+    def __init__(
+        self, client: Any, *, market: Optional[str] = None, deadline: Optional[float] = None
+    ) -> None:
+        if deadline is None:
+            deadline = float(os.getenv("SPOTIFY_BATCH_DEADLINE_MS", "50") or 50) / 1000.0
+        self.artists = BatchLoader(
+            client, f"{API}/artists", "artists", max_batch=50, deadline=deadline
+        )
+        # With a market, the embedded first page of tracks is relinked like /albums/{id}/tracks.
+        # /tracks stays market-less so every row keeps its available_markets.
+        self.albums = BatchLoader(
+            client,
+            f"{API}/albums",
+            "albums",
+            max_batch=20,
+            deadline=deadline,
+            params={"market": market} if market else None,
+        )
+        self.tracks = BatchLoader(
+            client, f"{API}/tracks", "tracks", max_batch=50, deadline=deadline
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "artists": self.artists.stats(),
+            "albums": self.albums.stats(),
+            "tracks": self.tracks.stats(),
+        }
+
+
+__all__ = ["BatchLoader", "CatalogLoaders"]
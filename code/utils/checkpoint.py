@@ -0,0 +1,160 @@
+"""Append-only checkpoint journal for resumable catalog collection."""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    from .jsonl_writer import repair_tail
+except ImportError:  # pragma: no cover - fallback when utils is on sys.path
+    from jsonl_writer import repair_tail  # type: ignore[no-redef]
+
+
+@dataclass
+class ArtistCheckpoint:
+    """What the journal knows about one ``(artist_query, market)``."""
+
+    artist_id: Optional[str] = None
+    artist_written: bool = False
+    album_meta: Optional[Dict[str, Dict[str, Any]]] = None
+    track_pairs: List[Dict[str, str]] = field(default_factory=list)
+    batch_size: int = 50
+    carried_rows: int = 0
+    track_batches: Dict[int, int] = field(default_factory=dict)
+    done: bool = False
+    rows: int = 0
+
+    @property
+    def albums_done(self) -> bool:
+        return self.album_meta is not None
+
+    @property
+    def rows_written(self) -> int:
+        return self.carried_rows + sum(self.track_batches.values())
+
+
+class CheckpointJournal:
+    """JSONL journal of completed collector stages, one record per line.
+
+    Stages per artist: ``artist`` (the ``artist_meta`` row and the resolved ID),
+    ``albums`` (album listing, album batches and track IDs, with the
+    ``album_meta``/``track_pairs`` needed to continue and the count of rows carried
+    forward from a previous snapshot), ``tracks`` (one record per written track batch)
+    and ``artist_done``. Callers flush their output before recording a stage, so a crash
+    can at worst repeat the last batch (duplicates are removed by dedup), never lose it.
+
+    Args:
+        path: Journal file (usually ``<output>.ckpt`` next to the snapshot).
+        fsync: fsync after each record.
+    """
+
+    def __init__(self, path: Path, *, fsync: bool = False) -> None:
+        self.path = Path(path)
+        self.fsync = fsync
+        self._artists: Dict[Tuple[str, str], ArtistCheckpoint] = {}
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        repair_tail(self.path)
+        self._load()
+
+    @staticmethod
+    def path_for(out_path: Path) -> Path:
+        return out_path.with_name(out_path.name + ".ckpt")
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        with self.path.open(encoding="utf-8") as handle:
+            for line in handle:
+                if line.strip():
+                    self._apply(json.loads(line))
+
+    def _apply(self, record: Dict[str, Any]) -> None:
+        state = self._artists.setdefault((record["artist"], record["market"]), ArtistCheckpoint())
+        stage = record["stage"]
+        if stage == "artist":
+            state.artist_id = record["artist_id"]
+            state.artist_written = True
+        elif stage == "albums":
+            state.artist_id = record["artist_id"]
+            state.artist_written = True
+            state.album_meta = record["album_meta"]
+            state.track_pairs = record["track_pairs"]
+            state.batch_size = record["batch_size"]
+            state.carried_rows = record.get("carried_rows", 0)
+            state.track_batches.clear()
+        elif stage == "tracks":
+            state.track_batches[record["batch"]] = record["rows"]
+        elif stage == "artist_done":
+            state.done = True
+            state.rows = record["rows"]
+
+    def _append(self, record: Dict[str, Any]) -> None:
+        line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+        with self._lock:
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, line)
+                if self.fsync:
+                    os.fsync(fd)
+            finally:
+                os.close(fd)
+            self._apply(record)
+
+    def reset(self) -> None:
+        """Forget every checkpoint (fresh run without ``--resume``)."""
+        with self._lock:
+            self.path.write_bytes(b"")
+            self._artists.clear()
+
+    def get(self, artist: str, market: str) -> Optional[ArtistCheckpoint]:
+        with self._lock:
+            return self._artists.get((artist, market))
+
+    def is_done(self, artist: str, market: str) -> bool:
+        state = self.get(artist, market)
+        return bool(state and state.done)
+
+    def record_artist(self, artist: str, market: str, artist_id: str) -> None:
+        self._append(
+            {"stage": "artist", "artist": artist, "market": market, "artist_id": artist_id}
+        )
+
+    def record_albums(
+        self,
+        artist: str,
+        market: str,
+        artist_id: str,
+        album_meta: Dict[str, Dict[str, Any]],
+        track_pairs: List[Dict[str, str]],
+        batch_size: int,
+        carried_rows: int = 0,
+    ) -> None:
+        self._append(
+            {
+                "stage": "albums",
+                "artist": artist,
+                "market": market,
+                "artist_id": artist_id,
+                "album_meta": album_meta,
+                "track_pairs": track_pairs,
+                "batch_size": batch_size,
+                "carried_rows": carried_rows,
+            }
+        )
+
+    def record_tracks(self, artist: str, market: str, batch: int, rows: int) -> None:
+        self._append(
+            {"stage": "tracks", "artist": artist, "market": market, "batch": batch, "rows": rows}
+        )
+
+    def record_artist_done(self, artist: str, market: str, rows: int) -> None:
+        self._append({"stage": "artist_done", "artist": artist, "market": market, "rows": rows})
+
+
+__all__ = ["ArtistCheckpoint", "CheckpointJournal"]
@@ -0,0 +1,168 @@
+"""Manifest and key store that make global dedup incremental across runs."""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    from .key_index import key_hash
+except ImportError:  # pragma: no cover - when utils/ itself is on sys.path
+    from key_index import key_hash  # type: ignore[no-redef]
+
+DEFAULT_STORE_PATH = "data/cache/dedup_global.sqlite"
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class FileKeys:
+    """Set-like view used as ``seen`` while deduping one file against the store.
+
+    Membership covers every stored key (whichever file owns it); :meth:`add` gives new
+    keys to this file. Changes are committed by :meth:`DedupStore.record`.
+    """
+
+    def __init__(self, store: "DedupStore", path: str) -> None:
+        self.store = store
+        self.path = path
+
+    def __contains__(self, key: str) -> bool:
+        with self.store._lock:
+            row = self.store._conn.execute(
+                "SELECT 1 FROM keys WHERE hash = ?", (key_hash(key),)
+            ).fetchone()
+        return row is not None
+
+    def add(self, key: str) -> None:
+        with self.store._lock:
+            self.store._conn.execute(
+                "INSERT OR IGNORE INTO keys VALUES (?, ?)", (key_hash(key), self.path)
+            )
+
+
+class DedupStore:
+    """SQLite manifest of deduped files plus the 64-bit hashes of the keys they hold.
+
+    ``files`` records path, size, mtime and SHA-256 of each file as it was left by the
+    last run. :meth:`pending` finds the first file that is new or whose content changed
+    (size/mtime first, the hash only when those differ) and returns it with every file
+    after it, forgetting their keys, and forgets files that are gone. Redoing that tail in
+    order keeps the first occurrence in file order, exactly as a full rebuild would; the
+    usual nightly case (a new last snapshot) still reads only the new file.
+
+    Args:
+        path: SQLite database file.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            " path TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL,"
+            " sha256 TEXT NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS keys (hash INTEGER PRIMARY KEY, path TEXT NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS keys_path ON keys (path)")
+        self._conn.commit()
+
+    @classmethod
+    def from_env(cls, path: Optional[str] = None) -> Optional["DedupStore"]:
+        """Open ``DEDUP_STORE``; ``None`` when set to empty (every run is a full one)."""
+        path = path if path is not None else os.getenv("DEDUP_STORE", DEFAULT_STORE_PATH)
+        return cls(Path(path)) if path else None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+
+    def pending(self, files: Iterable[str]) -> List[str]:
+        """The first new or changed file and every later one (in the given order), which
+        must be deduped again; vanished files are dropped."""
+        wanted = [str(path) for path in files]
+        with self._lock:
+            known: Dict[str, Tuple[int, int, str]] = {
+                row[0]: (row[1], row[2], row[3])
+                for row in self._conn.execute("SELECT path, size, mtime_ns, sha256 FROM files")
+            }
+            for path in set(known) - set(wanted):
+                self._forget(path)
+            todo: List[str] = []
+            for path in wanted:
+                entry = known.get(path)
+                if not todo:
+                    st = os.stat(path)
+                    if entry and entry[:2] == (st.st_size, st.st_mtime_ns):
+                        continue
+                    if entry and entry[0] == st.st_size and entry[2] == file_sha256(path):
+                        # touched but identical: only the mtime moves
+                        self._conn.execute(
+                            "UPDATE files SET mtime_ns = ? WHERE path = ?",
+                            (st.st_mtime_ns, path),
+                        )
+                        continue
+                # from the first change on, later files may now hold first occurrences
+                # that an earlier file used to own
+                if entry:
+                    self._forget(path)
+                todo.append(path)
+            self._conn.commit()
+        return todo
+
+    def keys_for(self, path: str) -> FileKeys:
+        return FileKeys(self, str(path))
+
+    def record(self, path: str, keys: Iterable[str] = ()) -> None:
+        """Store ``path`` in the manifest as it is now, owning ``keys`` not yet stored."""
+        path = str(path)
+        st = os.stat(path)
+        sha = file_sha256(path)
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO keys VALUES (?, ?)",
+                ((key_hash(key), path) for key in keys),
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)",
+                (path, st.st_size, st.st_mtime_ns, sha),
+            )
+            self._conn.commit()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM keys")
+            self._conn.execute("DELETE FROM files")
+            self._conn.commit()
+
+    def _forget(self, path: str) -> None:
+        self._conn.execute("DELETE FROM keys WHERE path = ?", (path,))
+        self._conn.execute("DELETE FROM files WHERE path = ?", (path,))
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            files = self._conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+            keys = self._conn.execute("SELECT COUNT(*) FROM keys").fetchone()[0]
+        return {"files": files, "keys": keys}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
+
+
+__all__ = ["DEFAULT_STORE_PATH", "DedupStore", "FileKeys", "file_sha256"]
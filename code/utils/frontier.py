@@ -0,0 +1,210 @@
+"""Persistent priority frontier for crawling the related-artists graph."""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+DEFAULT_FRONTIER_PATH = "data/cache/related_frontier.sqlite"
+DEPTH_DECAY = 0.5
+
+
+def frontier_score(popularity: Optional[int], depth: int, decay: float = DEPTH_DECAY) -> float:
+    """Higher is expanded first: popularity (0-100) damped by graph distance from a seed."""
+    return (popularity if popularity is not None else 50) * decay**depth
+
+
+@dataclass
+class FrontierEntry:
+    artist_id: str
+    name: str
+    depth: int
+    popularity: Optional[int]
+    score: float
+    parent: Optional[str] = None
+
+
+class Frontier:
+    """SQLite-backed priority queue of artist IDs with a persistent visited set.
+
+    ``seeds`` holds seed names waiting to be resolved to an artist ID; ``artists`` holds
+    every discovered artist with its state (``queued``, ``visited`` or ``failed``). A
+    visited artist is never queued again, and an artist reached again through a shorter
+    path keeps the better score. Each state change is committed, so the database is the
+    crawl checkpoint: a run stopped by its request budget resumes the next one from the
+    highest-scored queued artist.
+
+    Args:
+        path: SQLite database file.
+        decay: Score multiplier applied per hop away from a seed.
+    """
+
+    def __init__(self, path: Path, *, decay: float = DEPTH_DECAY) -> None:
+        self.path = Path(path)
+        self.decay = decay
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS seeds ("
+            " name TEXT PRIMARY KEY, artist_id TEXT, resolved_at INTEGER)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS artists ("
+            " artist_id TEXT PRIMARY KEY, name TEXT NOT NULL, depth INTEGER NOT NULL,"
+            " popularity INTEGER, score REAL NOT NULL, parent TEXT,"
+            " state TEXT NOT NULL DEFAULT 'queued', added_at INTEGER NOT NULL,"
+            " visited_at INTEGER)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS artists_queue ON artists (state, score)")
+        self._conn.commit()
+
+    def add_seeds(self, names: Iterable[str]) -> int:
+        """Register seed names (already known ones are ignored); returns how many are new."""
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO seeds (name) VALUES (?)", ((name,) for name in names)
+            )
+            self._conn.commit()
+            return self._conn.total_changes - before
+
+    def unresolved_seeds(self, limit: Optional[int] = None) -> List[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT name FROM seeds WHERE resolved_at IS NULL ORDER BY rowid LIMIT ?",
+                (-1 if limit is None else limit,),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def resolve_seed(
+        self, name: str, artist_id: Optional[str], popularity: Optional[int] = None
+    ) -> None:
+        """Record a seed lookup; a found artist is queued at depth 0 (``None`` = not found)."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE seeds SET artist_id = ?, resolved_at = ? WHERE name = ?",
+                (artist_id, int(time.time()), name),
+            )
+            if artist_id:
+                self._push(artist_id, name, 0, popularity, None)
+            self._conn.commit()
+
+    def push(
+        self,
+        artist_id: str,
+        name: str,
+        depth: int,
+        popularity: Optional[int] = None,
+        parent: Optional[str] = None,
+    ) -> bool:
+        """Queue an artist; returns False when it was already visited or queued with a
+        better score."""
+        with self._lock:
+            added = self._push(artist_id, name, depth, popularity, parent)
+            self._conn.commit()
+            return added
+
+    def push_many(
+        self, artists: Iterable[Dict[str, object]], depth: int, parent: Optional[str]
+    ) -> int:
+        """Queue Spotify artist objects found one hop below ``parent``; returns how many
+        were new or improved."""
+        with self._lock:
+            added = sum(
+                self._push(
+                    str(artist["id"]),
+                    str(artist.get("name") or ""),
+                    depth,
+                    artist.get("popularity"),  # type: ignore[arg-type]
+                    parent,
+                )
+                for artist in artists
+                if artist.get("id")
+            )
+            self._conn.commit()
+            return added
+
+    def _push(
+        self,
+        artist_id: str,
+        name: str,
+        depth: int,
+        popularity: Optional[int],
+        parent: Optional[str],
+    ) -> bool:
+        score = frontier_score(popularity, depth, self.decay)
+        cursor = self._conn.execute(
+            "INSERT INTO artists (artist_id, name, depth, popularity, score, parent, added_at)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)"
+            " ON CONFLICT(artist_id) DO UPDATE SET depth = excluded.depth,"
+            " score = excluded.score, parent = excluded.parent"
+            " WHERE artists.state = 'queued' AND excluded.score > artists.score",
+            (artist_id, name, depth, popularity, score, parent, int(time.time())),
+        )
+        return cursor.rowcount > 0
+
+    def peek(self, max_depth: Optional[int] = None) -> Optional[FrontierEntry]:
+        """Highest-scored queued artist (ties broken by ID), optionally below ``max_depth``."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT artist_id, name, depth, popularity, score, parent FROM artists"
+                " WHERE state = 'queued' AND depth <= ?"
+                " ORDER BY score DESC, artist_id LIMIT 1",
+                (max_depth if max_depth is not None else 1 << 30,),
+            ).fetchone()
+        return FrontierEntry(*row) if row else None
+
+    def mark(self, artist_id: str, state: str = "visited") -> None:
+        if state not in {"visited", "failed"}:
+            raise ValueError(f"unknown frontier state {state!r}")
+        with self._lock:
+            self._conn.execute(
+                "UPDATE artists SET state = ?, visited_at = ? WHERE artist_id = ?",
+                (state, int(time.time()), artist_id),
+            )
+            self._conn.commit()
+
+    def requeue_failed(self) -> int:
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE artists SET state = 'queued', visited_at = NULL WHERE state = 'failed'"
+            )
+            self._conn.commit()
+            return cursor.rowcount
+
+    def discovered(self, min_depth: int = 1) -> List[FrontierEntry]:
+        """Artists reached at ``min_depth`` hops or more, best first (for export)."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT artist_id, name, depth, popularity, score, parent FROM artists"
+                " WHERE depth >= ? ORDER BY score DESC, artist_id",
+                (min_depth,),
+            ).fetchall()
+        return [FrontierEntry(*row) for row in rows]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            counts = dict(self._conn.execute("SELECT state, COUNT(*) FROM artists GROUP BY state"))
+            pending = self._conn.execute(
+                "SELECT COUNT(*) FROM seeds WHERE resolved_at IS NULL"
+            ).fetchone()[0]
+        return {
+            "queued": counts.get("queued", 0),
+            "visited": counts.get("visited", 0),
+            "failed": counts.get("failed", 0),
+            "unresolved_seeds": pending,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
+
+
+__all__ = ["DEFAULT_FRONTIER_PATH", "Frontier", "FrontierEntry", "frontier_score"]
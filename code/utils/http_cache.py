@@ -0,0 +1,167 @@
+"""Persistent SQLite cache for Spotify GET responses with per-endpoint TTLs."""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Pattern, Sequence, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+DAY = 86400.0
+
+# First matching pattern (against the URL path) wins; unmatched endpoints are not cached.
+# Artist album listings and /artists/{id} are left out on purpose: new releases and
+# follower/popularity counts must be fresh in every nightly snapshot.
+DEFAULT_TTLS: Tuple[Tuple[str, float], ...] = (
+    (r"/v1/albums/[^/]+/tracks$", 30 * DAY),
+    (r"/v1/albums$", 30 * DAY),
+    (r"/v1/search$", 7 * DAY),
+    (r"/v1/tracks$", 0.5 * DAY),
+)
+
+
+def request_key(url: str, params: Optional[Dict[str, Any]] = None) -> str:
+    """Canonical key for a GET: URL with query string and ``params`` merged and sorted."""
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    query.extend((k, str(v)) for k, v in (params or {}).items())
+    return f"{parts.scheme}://{parts.netloc}{parts.path}?{urlencode(sorted(query))}"
+
+
+class ResponseCache:
+    """Size-bounded LRU cache of JSON payloads keyed by URL and sorted params.
+
+    Args:
+        path: SQLite database file.
+        max_entries: Entries kept after eviction (least recently used go first).
+        ttls: ``(path_regex, seconds)`` rules; a TTL ``<= 0`` disables caching.
+        clock: Wall-clock function, injectable for tests.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        max_entries: int = 200_000,
+        ttls: Sequence[Tuple[str, float]] = DEFAULT_TTLS,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.path = Path(path)
+        self.max_entries = max(1, int(max_entries))
+        self.ttls: Tuple[Tuple[Pattern[str], float], ...] = tuple(
+            (re.compile(pattern), float(ttl)) for pattern, ttl in ttls
+        )
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, payload TEXT NOT NULL,"
+            " expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)"
+        )
+        self._conn.commit()
+        self._count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    @classmethod
+    def from_env(cls, path: Optional[str] = None) -> Optional["ResponseCache"]:
+        """Build the cache from ``SPOTIFY_HTTP_CACHE``; ``None`` when not configured."""
+        path = path or os.getenv("SPOTIFY_HTTP_CACHE")
+        if not path:
+            return None
+        return cls(
+            Path(path),
+            max_entries=int(os.getenv("SPOTIFY_HTTP_CACHE_MAX", "200000") or 200000),
+        )
+
+    def ttl_for(self, url: str) -> float:
+        path = urlsplit(url).path
+        for pattern, ttl in self.ttls:
+            if pattern.search(path):
+                return ttl
+        return 0.0
+
+    key = staticmethod(request_key)
+
+    def get(self, url: str, params: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        if self.ttl_for(url) <= 0:
+            return None
+        key = self.key(url, params)
+        now = self.clock()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or row[1] <= now:
+                if row is not None:
+                    self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._conn.commit()
+                    self._count -= 1
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, url: str, params: Optional[Dict[str, Any]], payload: Dict[str, Any]) -> None:
+        ttl = self.ttl_for(url)
+        if ttl <= 0:
+            return
+        key = self.key(url, params)
+        now = self.clock()
+        data = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+        with self._lock:
+            cur = self._conn.execute(
+                "INSERT OR IGNORE INTO responses VALUES (?, ?, ?, ?)", (key, data, now + ttl, now)
+            )
+            if cur.rowcount:
+                self._count += 1
+            else:
+                self._conn.execute(
+                    "UPDATE responses SET payload = ?, expires_at = ?, accessed_at = ?"
+                    " WHERE key = ?",
+                    (data, now + ttl, now, key),
+                )
+            if self._count > self.max_entries:
+                # Other processes may share the file: recount before evicting.
+                self._count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            if self._count > self.max_entries:
+                excess = self._count - self.max_entries
+                self._conn.execute(
+                    "DELETE FROM responses WHERE key IN"
+                    " (SELECT key FROM responses ORDER BY accessed_at LIMIT ?)",
+                    (excess,),
+                )
+                self._count -= excess
+                self.evictions += excess
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            "evictions": self.evictions,
+            "entries": self._count,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+__all__ = ["DEFAULT_TTLS", "ResponseCache", "request_key"]
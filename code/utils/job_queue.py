@@ -0,0 +1,190 @@
+"""SQLite-backed artist job queue with attempt counts and cooldown requeue."""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional
+
+JOB_STATES = ("queued", "running", "done", "skipped")
+
+
+@dataclass
+class Job:
+    artist: str
+    market: str
+    priority: int
+    attempts: int
+
+
+class JobQueue:
+    """Per-artist jobs drained in priority order; failures come back after a cooldown.
+
+    ``claim`` hands out the lowest-priority-number ``queued`` job whose ``not_before`` has
+    passed, so a cooling-down artist never blocks the ones behind it. :meth:`fail` requeues
+    a job ``cooldown_s`` later unless it reached ``skip_on_429`` consecutive rate-limited
+    failures or ``skip_on_errors`` consecutive failures of any kind, in which case it is
+    ``skipped``. Jobs left ``running`` by a crash are requeued when the queue is reopened.
+
+    Args:
+        path: SQLite database file (``":memory:"`` for a throwaway queue).
+        cooldown_s: Delay before a failed job can be claimed again.
+        skip_on_429: Consecutive rate-limited failures after which a job is skipped.
+        skip_on_errors: Consecutive failures after which a job is skipped.
+        clock: Wall clock, injectable for tests (``not_before`` survives restarts).
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        cooldown_s: float = 3600.0,
+        skip_on_429: int = 6,
+        skip_on_errors: int = 8,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.path = Path(path)
+        self.cooldown_s = max(0.0, cooldown_s)
+        self.skip_on_429 = max(1, skip_on_429)
+        self.skip_on_errors = max(1, skip_on_errors)
+        self.clock = clock
+        self._lock = threading.Lock()
+        if str(path) != ":memory:":
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), timeout=30, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " artist TEXT NOT NULL, market TEXT NOT NULL, priority INTEGER NOT NULL,"
+            " state TEXT NOT NULL DEFAULT 'queued', attempts INTEGER NOT NULL DEFAULT 0,"
+            " consec_429 INTEGER NOT NULL DEFAULT 0, consec_errors INTEGER NOT NULL DEFAULT 0,"
+            " not_before REAL NOT NULL DEFAULT 0, last_error TEXT, updated_at REAL,"
+            " PRIMARY KEY (artist, market))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (state, priority)")
+        self._conn.execute("UPDATE jobs SET state = 'queued' WHERE state = 'running'")
+        self._conn.commit()
+
+    @classmethod
+    def from_env(cls, path: Path) -> "JobQueue":
+        return cls(
+            path,
+            cooldown_s=float(os.getenv("REQUEUE_COOLDOWN_MIN", "60") or 60) * 60,
+            skip_on_429=int(os.getenv("SKIP_ON_CONSEC_429", "6") or 6),
+            skip_on_errors=int(os.getenv("SKIP_ON_CONSEC_ERRORS", "8") or 8),
+        )
+
+    @staticmethod
+    def path_for(output: Path) -> Path:
+        return output.with_name(output.name + ".queue")
+
+    def reset(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM jobs")
+            self._conn.commit()
+
+    def requeue_done(self) -> int:
+        """Put ``done`` jobs back in the queue (a resumed run re-reads their row counts)."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET state = 'queued', not_before = 0 WHERE state = 'done'"
+            )
+            self._conn.commit()
+            return cursor.rowcount
+
+    def enqueue(self, artists: Iterable[str], market: str) -> int:
+        """Add artists in priority order (1-based position); known jobs keep their state."""
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO jobs (artist, market, priority, updated_at)"
+                " VALUES (?, ?, ?, ?)",
+                (
+                    (artist, market, idx, self.clock())
+                    for idx, artist in enumerate(artists, start=1)
+                ),
+            )
+            self._conn.commit()
+            return self._conn.total_changes - before
+
+    def claim(self) -> Optional[Job]:
+        """Mark the best ready job ``running`` and return it (``None`` if nothing is ready)."""
+        with self._lock:
+            now = self.clock()
+            row = self._conn.execute(
+                "SELECT artist, market, priority, attempts FROM jobs"
+                " WHERE state = 'queued' AND not_before <= ?"
+                " ORDER BY priority, artist LIMIT 1",
+                (now,),
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE jobs SET state = 'running', attempts = attempts + 1, updated_at = ?"
+                " WHERE artist = ? AND market = ?",
+                (now, row[0], row[1]),
+            )
+            self._conn.commit()
+        return Job(row[0], row[1], row[2], row[3] + 1)
+
+    def next_ready_at(self) -> Optional[float]:
+        """When the earliest cooling-down job becomes claimable (``None`` if none is queued)."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MIN(not_before) FROM jobs WHERE state = 'queued'"
+            ).fetchone()
+        return row[0]
+
+    def complete(self, job: Job) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET state = 'done', last_error = NULL, updated_at = ?"
+                " WHERE artist = ? AND market = ?",
+                (self.clock(), job.artist, job.market),
+            )
+            self._conn.commit()
+
+    def fail(self, job: Job, error: str, *, rate_limited: bool = False) -> str:
+        """Record a failed attempt; returns the new state (``queued`` or ``skipped``)."""
+        with self._lock:
+            consec_429, consec_errors = self._conn.execute(
+                "SELECT consec_429, consec_errors FROM jobs WHERE artist = ? AND market = ?",
+                (job.artist, job.market),
+            ).fetchone()
+            consec_429 = consec_429 + 1 if rate_limited else 0
+            consec_errors += 1
+            skip = consec_429 >= self.skip_on_429 or consec_errors >= self.skip_on_errors
+            state = "skipped" if skip else "queued"
+            now = self.clock()
+            self._conn.execute(
+                "UPDATE jobs SET state = ?, consec_429 = ?, consec_errors = ?, not_before = ?,"
+                " last_error = ?, updated_at = ? WHERE artist = ? AND market = ?",
+                (
+                    state,
+                    consec_429,
+                    consec_errors,
+                    now + self.cooldown_s,
+                    error,
+                    now,
+                    job.artist,
+                    job.market,
+                ),
+            )
+            self._conn.commit()
+        return state
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            counts = dict(self._conn.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state"))
+        return {state: counts.get(state, 0) for state in JOB_STATES}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
+
+
+__all__ = ["JOB_STATES", "Job", "JobQueue"]
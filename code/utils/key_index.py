@@ -0,0 +1,219 @@
+"""Persistent, incrementally updated index of dedup keys seen in raw JSONL files."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_INDEX_PATH = "data/cache/dedup_keys.sqlite"
+FINGERPRINT_BYTES = 4096
+COMMIT_EVERY = 1000
+
+
+def _fingerprint(path: str, offset: int) -> str:
+    """SHA-1 of the bytes right before ``offset`` (detects in-place rewrites)."""
+    start = max(0, offset - FINGERPRINT_BYTES)
+    with open(path, "rb") as handle:
+        handle.seek(start)
+        return hashlib.sha1(handle.read(offset - start)).hexdigest()
+
+
+def key_hash(key: str) -> int:
+    """Signed 64-bit BLAKE2b of ``key`` (fits an SQLite INTEGER PRIMARY KEY)."""
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+class KeyIndex:
+    """SQLite set of hashed dedup keys, with a reference from every file holding each key.
+
+    ``files`` remembers size, mtime, the byte offset ingested and a fingerprint of the
+    bytes just before it for every JSONL file, so :meth:`sync` only reads what was
+    appended since the last run; a file that shrank or was rewritten is re-ingested and
+    a deleted one drops its references. A key stays in the set while any file still
+    references it. Keys are stored as 64-bit hashes, so the index stays a fraction of
+    the size of the raw data.
+
+    Args:
+        path: SQLite database file.
+        key_fn: Maps a parsed row to its dedup key.
+    """
+
+    def __init__(self, path: Path, key_fn: Callable[[Dict[str, Any]], str]) -> None:
+        self.path = Path(path)
+        self.key_fn = key_fn
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            " file_id INTEGER PRIMARY KEY, path TEXT UNIQUE NOT NULL,"
+            " size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, offset INTEGER NOT NULL,"
+            " fingerprint TEXT NOT NULL DEFAULT '')"
+        )
+        # file_id is 0 for keys added during a run; the next sync reads them back from
+        # the output file itself.
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS key_refs ("
+            " hash INTEGER NOT NULL, file_id INTEGER NOT NULL, PRIMARY KEY (hash, file_id))"
+            " WITHOUT ROWID"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS key_refs_file ON key_refs (file_id)")
+        self._conn.commit()
+        self._uncommitted = 0
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM key_refs WHERE hash = ? LIMIT 1", (key_hash(key),)
+            ).fetchone()
+        return row is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(DISTINCT hash) FROM key_refs").fetchone()[0]
+
+    def add(self, key: str) -> None:
+        """Record a key written during this run (committed in groups; the next
+        :meth:`sync` recovers any lost in a crash from the output file itself)."""
+        with self._lock:
+            self._conn.execute("INSERT OR IGNORE INTO key_refs VALUES (?, 0)", (key_hash(key),))
+            self._uncommitted += 1
+            if self._uncommitted >= COMMIT_EVERY:
+                self._conn.commit()
+                self._uncommitted = 0
+
+    def sync(self, files: Iterable[Path]) -> Dict[str, int]:
+        """Bring the index up to date with ``files``; returns ingestion counters."""
+        stats = {"files": 0, "ingested_files": 0, "ingested_rows": 0, "dropped_files": 0}
+        wanted = {str(Path(path)) for path in files}
+        with self._lock:
+            self._conn.execute("DELETE FROM key_refs WHERE file_id = 0")
+            known: Dict[str, Tuple[int, int, int, int, str]] = {
+                row[1]: (row[0], row[2], row[3], row[4], row[5])
+                for row in self._conn.execute(
+                    "SELECT file_id, path, size, mtime_ns, offset, fingerprint FROM files"
+                )
+            }
+            for path in set(known) - wanted:
+                self._drop(known[path][0])
+                stats["dropped_files"] += 1
+            for path in sorted(wanted):
+                stats["files"] += 1
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entry = known.get(path)
+                if entry and entry[1] == st.st_size and entry[2] == st.st_mtime_ns:
+                    continue
+                file_id, start = None, 0
+                if entry:
+                    file_id = entry[0]
+                    if st.st_size >= entry[3] and _fingerprint(path, entry[3]) == entry[4]:
+                        start = entry[3]  # appended: read only the new tail
+                    else:
+                        self._drop(file_id, keep_file=True)
+                stats["ingested_rows"] += self._ingest(path, st, file_id, start)
+                stats["ingested_files"] += 1
+            self._conn.commit()
+        return stats
+
+    def _drop(self, file_id: int, keep_file: bool = False) -> None:
+        self._conn.execute("DELETE FROM key_refs WHERE file_id = ?", (file_id,))
+        if not keep_file:
+            self._conn.execute("DELETE FROM files WHERE file_id = ?", (file_id,))
+
+    def _ingest(self, path: str, st: os.stat_result, file_id: Optional[int], start: int) -> int:
+        if file_id is None:
+            file_id = self._conn.execute(
+                "INSERT INTO files (path, size, mtime_ns, offset) VALUES (?, 0, 0, 0)", (path,)
+            ).lastrowid
+        offset = start
+        batch: List[Tuple[int, int]] = []
+        rows = 0
+        with open(path, "rb") as handle:
+            handle.seek(start)
+            for line in handle:
+                if not line.endswith(b"\n"):
+                    break  # partial last line: picked up once it is complete
+                offset += len(line)
+                if not line.strip():
+                    continue
+                try:
+                    key = self.key_fn(json.loads(line))
+                except (ValueError, AttributeError):
+                    continue
+                batch.append((key_hash(key), file_id))
+                rows += 1
+                if len(batch) >= 10_000:
+                    self._insert(batch)
+        self._insert(batch)
+        self._conn.execute(
+            "UPDATE files SET size = ?, mtime_ns = ?, offset = ?, fingerprint = ?"
+            " WHERE file_id = ?",
+            (st.st_size, st.st_mtime_ns, offset, _fingerprint(path, offset), file_id),
+        )
+        return rows
+
+    def _insert(self, batch: List[Tuple[int, int]]) -> None:
+        self._conn.executemany("INSERT OR IGNORE INTO key_refs VALUES (?, ?)", batch)
+        batch.clear()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
+
+
+class LazyKeyIndex:
+    """Opens and syncs a :class:`KeyIndex` on first use, so importing stays instant."""
+
+    def __init__(
+        self,
+        path: Path,
+        key_fn: Callable[[Dict[str, Any]], str],
+        files: Callable[[], Iterable[Path]],
+    ) -> None:
+        self.path = Path(path)
+        self.key_fn = key_fn
+        self.files = files
+        self.last_sync: Optional[Dict[str, int]] = None
+        self._index: Optional[KeyIndex] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._index is not None
+
+    def _get(self) -> KeyIndex:
+        with self._lock:
+            if self._index is None:
+                index = KeyIndex(self.path, self.key_fn)
+                self.last_sync = index.sync(self.files())
+                self._index = index
+            return self._index
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._get()
+
+    def __len__(self) -> int:
+        return len(self._get())
+
+    def add(self, key: str) -> None:
+        self._get().add(key)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._index is not None:
+                self._index.close()
+                self._index = None
+
+
+__all__ = ["DEFAULT_INDEX_PATH", "KeyIndex", "LazyKeyIndex", "key_hash"]
@@ -0,0 +1,107 @@
+"""Compact, versioned encoding of Spotify ``available_markets`` lists."""
+
+from __future__ import annotations
+
+import base64
+from typing import Any, Dict, Iterable, List, Tuple
+
+# Bit ``i`` of an encoded row stands for ``MARKET_DICTIONARIES[version][i]``. A released
+# version must never be reordered; new markets go into a new version that extends the
+# previous tuple, so older rows keep decoding to the same codes.
+MARKET_DICTIONARIES: Dict[int, Tuple[str, ...]] = {
+    1: tuple(
+        """
+        AD AE AG AL AM AO AR AT AU AZ BA BB BD BE BF BG BH BI BJ BN BO BR BS BT BW BY BZ
+        CA CD CG CH CI CL CM CO CR CV CW CY CZ DE DJ DK DM DO DZ EC EE EG ES ET FI FJ FM
+        FR GA GB GD GE GH GM GN GQ GR GT GW GY HK HN HR HT HU ID IE IL IN IQ IS IT JM JO
+        JP KE KG KH KI KM KN KR KW KZ LA LB LC LI LK LR LS LT LU LV LY MA MC MD ME MG MH
+        MK ML MN MO MR MT MU MV MW MX MY MZ NA NE NG NI NL NO NP NR NZ OM PA PE PG PH PK
+        PL PR PS PT PW PY QA RO RS RW SA SB SC SE SG SI SK SL SM SN SR ST SV SZ TD TG TH
+        TJ TL TN TO TR TT TV TW TZ UA UG US UY UZ VC VE VN VU WS XK ZA ZM ZW
+        """.split()
+    ),
+}
+CURRENT_VERSION = max(MARKET_DICTIONARIES)
+
+BITS_FIELD = "available_markets_bits"
+VERSION_FIELD = "markets_dict_version"
+EXTRA_FIELD = "available_markets_extra"
+
+
+def encode_markets(markets: Iterable[str], version: int = CURRENT_VERSION) -> Tuple[str, List[str]]:
+    """Return ``(bits, extra)``: unpadded URL-safe base64 bitset and codes not in the dictionary."""
+    dictionary = MARKET_DICTIONARIES[version]
+    positions = {code: idx for idx, code in enumerate(dictionary)}
+    bitset = bytearray((len(dictionary) + 7) // 8)
+    extra: List[str] = []
+    for code in markets:
+        idx = positions.get(code)
+        if idx is None:
+            if code not in extra:
+                extra.append(code)
+            continue
+        bitset[idx >> 3] |= 1 << (idx & 7)
+    return base64.urlsafe_b64encode(bytes(bitset)).rstrip(b"=").decode("ascii"), extra
+
+
+def decode_markets(bits: str, version: int, extra: Iterable[str] = ()) -> List[str]:
+    """Market codes of an encoded row, in dictionary order followed by ``extra``."""
+    try:
+        dictionary = MARKET_DICTIONARIES[version]
+    except KeyError:
+        raise ValueError(f"unknown market dictionary version {version!r}") from None
+    raw = base64.urlsafe_b64decode(bits + "=" * (-len(bits) % 4))
+    markets = [
+        code
+        for idx, code in enumerate(dictionary)
+        if idx >> 3 < len(raw) and raw[idx >> 3] >> (idx & 7) & 1
+    ]
+    markets.extend(code for code in extra if code not in markets)
+    return markets
+
+
+def row_markets(row: Dict[str, Any]) -> List[str]:
+    """``available_markets`` of a row in either form (plain list or compact bitset)."""
+    markets = row.get("available_markets")
+    if isinstance(markets, list):
+        return markets
+    bits = row.get(BITS_FIELD)
+    if isinstance(bits, str):
+        return decode_markets(bits, int(row.get(VERSION_FIELD, 1)), row.get(EXTRA_FIELD) or ())
+    return []
+
+
+def compact_row(row: Dict[str, Any], version: int = CURRENT_VERSION) -> Dict[str, Any]:
+    """Replace ``available_markets`` by its compact form in place; other fields are kept."""
+    markets = row.pop("available_markets", None)
+    if markets is None:
+        return row
+    bits, extra = encode_markets(markets, version)
+    row[BITS_FIELD] = bits
+    row[VERSION_FIELD] = version
+    if extra:
+        row[EXTRA_FIELD] = extra
+    return row
+
+
+def expand_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Inverse of :func:`compact_row` (in place); rows already in plain form are unchanged."""
+    if BITS_FIELD in row:
+        row["available_markets"] = row_markets(row)
+        for field in (BITS_FIELD, VERSION_FIELD, EXTRA_FIELD):
+            row.pop(field, None)
+    return row
+
+
+__all__ = [
+    "BITS_FIELD",
+    "CURRENT_VERSION",
+    "EXTRA_FIELD",
+    "MARKET_DICTIONARIES",
+    "VERSION_FIELD",
+    "compact_row",
+    "decode_markets",
+    "encode_markets",
+    "expand_row",
+    "row_markets",
+]
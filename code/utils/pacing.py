@@ -0,0 +1,120 @@
+"""AIMD pacing controller for Spotify requests."""
+
+from __future__ import annotations
+
+import os
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+
+class AdaptivePacer:
+    """Spaces request starts by an adaptive delay (AIMD on the request rate).
+
+    Throttling signals (429 or 5xx) grow the delay multiplicatively, at least by
+    ``step``, up to ``max_delay``; every ``decay_every`` consecutive successes shrink it
+    additively by ``step`` back towards ``floor``. Starts are scheduled on a shared
+    timeline, so the spacing holds when several threads use the same pacer.
+
+    Args:
+        step: Additive step in seconds (``ADAPT_SLEEP_STEP``).
+        max_delay: Upper bound for the delay (``ADAPT_SLEEP_MAX``).
+        decay_every: Successes needed before one decay step (``ADAPT_DECAY_EVERY``).
+        floor: Minimum delay between request starts (``SPOTIFY_REQ_SLEEP``).
+        retry_after_jitter: Fraction of random jitter added to ``Retry-After`` waits
+            (``RETRY_AFTER_JITTER``), so processes do not resume in lockstep.
+        clock: Monotonic clock, injectable for tests.
+        sleep: Sleep function, injectable for tests.
+    """
+
+    def __init__(
+        self,
+        *,
+        step: float = 0.25,
+        max_delay: float = 1.5,
+        decay_every: int = 120,
+        floor: float = 0.0,
+        retry_after_jitter: float = 0.15,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.step = max(0.0, step)
+        self.floor = max(0.0, floor)
+        self.max_delay = max(self.floor, max_delay)
+        self.decay_every = max(1, decay_every)
+        self.retry_after_jitter = max(0.0, retry_after_jitter)
+        self.clock = clock
+        self.sleep = sleep
+        self._delay = self.floor
+        self._streak = 0
+        self._next_start = 0.0
+        self._successes = 0
+        self._throttles = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "AdaptivePacer":
+        return cls(
+            step=float(os.getenv("ADAPT_SLEEP_STEP", "0.25") or 0.25),
+            max_delay=float(os.getenv("ADAPT_SLEEP_MAX", "1.5") or 1.5),
+            decay_every=int(os.getenv("ADAPT_DECAY_EVERY", "120") or 120),
+            floor=float(os.getenv("SPOTIFY_REQ_SLEEP", "0") or 0.0),
+            retry_after_jitter=float(os.getenv("RETRY_AFTER_JITTER", "0.15") or 0.0),
+        )
+
+    @property
+    def delay(self) -> float:
+        """Current spacing between request starts, in seconds."""
+        return self._delay
+
+    @property
+    def rate(self) -> Optional[float]:
+        """Current pacing rate in requests per second (``None`` when unpaced)."""
+        delay = self._delay
+        return 1.0 / delay if delay > 0 else None
+
+    def reserve(self) -> float:
+        """Claim the next start slot and return how long the caller must wait for it."""
+        with self._lock:
+            now = self.clock()
+            start = max(now, self._next_start)
+            self._next_start = start + self._delay
+            return start - now
+
+    def wait(self) -> float:
+        """Block until this caller's start slot; returns the time slept."""
+        wait = self.reserve()
+        if wait > 0:
+            self.sleep(wait)
+        return wait
+
+    def on_success(self) -> None:
+        with self._lock:
+            self._successes += 1
+            self._streak += 1
+            if self._streak >= self.decay_every:
+                self._streak = 0
+                self._delay = max(self.floor, self._delay - self.step)
+
+    def on_throttle(self) -> None:
+        with self._lock:
+            self._throttles += 1
+            self._streak = 0
+            self._delay = min(self.max_delay, max(self._delay * 2, self._delay + self.step))
+
+    def retry_after(self, seconds: float) -> float:
+        """Return ``seconds`` plus a random share of ``retry_after_jitter``."""
+        return max(0.0, seconds) * (1.0 + random.uniform(0.0, self.retry_after_jitter))
+
+    def snapshot(self) -> Dict[str, Any]:
+        rate = self.rate
+        return {
+            "delay": round(self._delay, 4),
+            "rate": round(rate, 3) if rate is not None else None,
+            "successes": self._successes,
+            "throttles": self._throttles,
+        }
+
+
+__all__ = ["AdaptivePacer"]
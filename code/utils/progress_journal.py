@@ -0,0 +1,133 @@
+"""Append-only progress journal with coalesced writes and periodic compaction."""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+try:
+    from .jsonl_writer import repair_tail
+except ImportError:  # pragma: no cover - fallback when utils is on sys.path
+    from jsonl_writer import repair_tail  # type: ignore[no-redef]
+
+
+class ProgressJournal:
+    """Key/value progress state persisted as a snapshot plus a journal of deltas.
+
+    :meth:`save` only updates memory; pending changes are appended to the journal as
+    one JSON line at most every ``flush_ms`` (checked on each call) or on :meth:`flush`.
+    After ``compact_every`` journal lines the merged state is written to the snapshot
+    file atomically and the journal is truncated. A partial last line left by a crash is
+    cut off when the journal is opened, so the next append starts on a line of its own;
+    :meth:`load` replays the journal over the snapshot.
+
+    Args:
+        path: Snapshot JSON file (the journal is ``<path>.journal``).
+        flush_ms: Minimum interval between journal appends.
+        compact_every: Journal lines that trigger a compaction.
+        clock: Monotonic clock, injectable for tests.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        flush_ms: float = 1000.0,
+        compact_every: int = 500,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.path = Path(path)
+        self.journal_path = self.path.with_name(self.path.name + ".journal")
+        self.flush_seconds = max(0.0, flush_ms) / 1000.0
+        self.compact_every = max(1, compact_every)
+        self.clock = clock
+        self.appends = 0
+        self.compactions = 0
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        repair_tail(self.journal_path)
+        self._state: Dict[str, Any] = self.load()
+        self._pending: Dict[str, Any] = {}
+        self._journal_lines = self._count_journal_lines()
+        self._last_flush = self.clock()
+
+    def _count_journal_lines(self) -> int:
+        try:
+            with self.journal_path.open("rb") as handle:
+                return sum(1 for _ in handle)
+        except FileNotFoundError:
+            return 0
+
+    def load(self) -> Dict[str, Any]:
+        """Snapshot merged with every complete journal line."""
+        state: Dict[str, Any] = {}
+        try:
+            state.update(json.loads(self.path.read_text(encoding="utf-8")))
+        except (FileNotFoundError, ValueError):
+            pass
+        try:
+            with self.journal_path.open("rb") as handle:
+                for line in handle:
+                    if not line.endswith(b"\n"):
+                        break
+                    try:
+                        state.update(json.loads(line))
+                    except ValueError:
+                        continue
+        except FileNotFoundError:
+            pass
+        return state
+
+    @property
+    def state(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._state)
+
+    def save(self, **changes: Any) -> None:
+        with self._lock:
+            self._state.update(changes)
+            self._pending.update(changes)
+            if self.clock() - self._last_flush >= self.flush_seconds:
+                self._flush_locked()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        self._last_flush = self.clock()
+        if not self._pending:
+            return
+        line = json.dumps(self._pending, ensure_ascii=False) + "\n"
+        with self.journal_path.open("a", encoding="utf-8") as handle:
+            handle.write(line)
+        self._pending.clear()
+        self.appends += 1
+        self._journal_lines += 1
+        if self._journal_lines >= self.compact_every:
+            self._compact_locked()
+
+    def compact(self) -> None:
+        with self._lock:
+            self._flush_locked()
+            self._compact_locked()
+
+    def _compact_locked(self) -> None:
+        tmp_path = self.path.with_name(f".{self.path.name}.tmp")
+        tmp_path.write_text(json.dumps(self._state, ensure_ascii=False, indent=2), encoding="utf-8")
+        os.replace(tmp_path, self.path)
+        # A crash between these two steps only replays deltas already in the snapshot.
+        self.journal_path.write_bytes(b"")
+        self._journal_lines = 0
+        self.compactions += 1
+
+    def close(self) -> None:
+        """Flush pending changes and compact, leaving a plain JSON snapshot behind."""
+        self.compact()
+
+
+__all__ = ["ProgressJournal"]
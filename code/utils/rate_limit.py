@@ -0,0 +1,176 @@
+"""Cross-process token-bucket rate limiter backed by a small ``fcntl``-locked state file."""
+
+from __future__ import annotations
+
+import fcntl
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+from urllib import error, request
+
+DEFAULT_STATE_PATH = "locks/spotify_rate.json"
+
+
+class SharedRateLimiter:
+    """Token bucket shared by every process pointing at the same ``state_path``.
+
+    The bucket holds at most ``max_requests`` tokens and refills at
+    ``max_requests / window_seconds`` tokens per second, which enforces the
+    ``MAX_REQS_PER_WINDOW`` / ``WINDOW_SECONDS`` budget across all collectors. A
+    ``Retry-After`` reported by any process is stored as ``paused_until`` and blocks
+    every other process until it expires.
+
+    Args:
+        state_path: JSON file holding ``tokens``, ``updated`` and ``paused_until``.
+        max_requests: Bucket capacity (requests per window); ``<= 0`` disables limiting.
+        window_seconds: Length of the window in seconds.
+        clock: Wall-clock function, injectable for tests (must be shared across processes).
+        sleep: Sleep function, injectable for tests.
+    """
+
+    def __init__(
+        self,
+        state_path: Path,
+        *,
+        max_requests: int = 30,
+        window_seconds: float = 30.0,
+        clock: Callable[[], float] = time.time,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.state_path = Path(state_path)
+        self.max_requests = int(max_requests)
+        self.window_seconds = max(float(window_seconds), 1e-6)
+        self.clock = clock
+        self.sleep = sleep
+
+    @classmethod
+    def from_env(cls) -> "SharedRateLimiter":
+        return cls(
+            Path(os.getenv("RATE_LIMIT_STATE", DEFAULT_STATE_PATH)),
+            max_requests=int(os.getenv("MAX_REQS_PER_WINDOW", "30") or 30),
+            window_seconds=float(os.getenv("WINDOW_SECONDS", "30") or 30),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_requests > 0
+
+    @property
+    def rate(self) -> float:
+        """Refill rate in requests per second."""
+        return self.max_requests / self.window_seconds
+
+    def _update(self, mutate: Callable[[Dict[str, Any], float], float]) -> float:
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.state_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            raw = b""
+            while chunk := os.read(fd, 4096):
+                raw += chunk
+            now = self.clock()
+            try:
+                state = json.loads(raw) if raw else {}
+            except ValueError:
+                state = {}
+            tokens = float(state.get("tokens", self.max_requests))
+            updated = float(state.get("updated", now))
+            state["tokens"] = min(self.max_requests, tokens + max(0.0, now - updated) * self.rate)
+            state["updated"] = now
+            state.setdefault("paused_until", 0.0)
+            result = mutate(state, now)
+            os.lseek(fd, 0, os.SEEK_SET)
+            os.ftruncate(fd, 0)
+            os.write(fd, json.dumps(state).encode("utf-8"))
+            return result
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+
+    def reserve(self) -> float:
+        """Take a token if one is available; otherwise return the seconds to wait."""
+        if not self.enabled:
+            return 0.0
+
+        def _take(state: Dict[str, Any], now: float) -> float:
+            paused_until = float(state["paused_until"])
+            if now < paused_until:
+                return paused_until - now
+            if state["tokens"] >= 1.0:
+                state["tokens"] -= 1.0
+                return 0.0
+            return (1.0 - state["tokens"]) / self.rate
+
+        return self._update(_take)
+
+    def acquire(self) -> float:
+        """Block until a token is granted; returns the total time spent waiting."""
+        waited = 0.0
+        while (wait := self.reserve()) > 0:
+            self.sleep(wait)
+            waited += wait
+        return waited
+
+    def pause(self, seconds: float) -> None:
+        """Pause all processes for ``seconds`` (e.g. after a ``Retry-After``)."""
+        if not self.enabled or seconds <= 0:
+            return
+
+        def _pause(state: Dict[str, Any], now: float) -> float:
+            state["paused_until"] = max(float(state["paused_until"]), now + seconds)
+            state["tokens"] = 0.0
+            return 0.0
+
+        self._update(_pause)
+
+
+def urlopen_json(
+    req: request.Request,
+    limiter: Optional[SharedRateLimiter],
+    *,
+    max_tries: int = 5,
+    timeout: Optional[float] = None,
+    auth: Optional[Any] = None,
+) -> Dict[str, Any]:
+    """``urllib`` GET honouring the shared limiter and propagating ``Retry-After`` on 429.
+
+    ``auth`` (e.g. ``token_cache.AccessTokenProvider``) is called for a bearer token on
+    every attempt; a 401 invalidates that token and retries once with a fresh one.
+    """
+    if max_tries < 1:
+        raise ValueError("max_tries must be >= 1")
+    reauthorized = False
+    attempt = 0
+    while attempt < max_tries:
+        attempt += 1
+        token = None
+        if auth is not None:
+            token = auth()
+            req.add_header("Authorization", f"Bearer {token}")
+        if limiter is not None:
+            limiter.acquire()
+        try:
+            with request.urlopen(req, timeout=timeout) as response:
+                return json.load(response)
+        except error.HTTPError as exc:
+            if exc.code == 401 and auth is not None and not reauthorized:
+                auth.invalidate(token)
+                reauthorized = True
+                attempt -= 1  # the retry with a fresh token is not a 429 attempt
+                continue
+            if exc.code != 429 or attempt == max_tries:
+                raise
+            try:
+                retry_after = float(exc.headers.get("Retry-After") or 1.0)
+            except ValueError:
+                retry_after = 1.0
+            if limiter is not None:
+                limiter.pause(retry_after)
+            else:
+                time.sleep(retry_after)
+    raise RuntimeError("retry attempts exhausted")
+
+
+__all__ = ["DEFAULT_STATE_PATH", "SharedRateLimiter", "urlopen_json"]
@@ -0,0 +1,174 @@
+"""Persistent artist-name resolution cache (query -> chosen Spotify artist)."""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+DAY = 86400.0
+DEFAULT_RESOLUTION_PATH = "data/cache/artist_resolution.sqlite"
+# Fields of a search result kept for the chosen artist (the rest is refetched by ID).
+ARTIST_FIELDS = ("id", "name", "popularity", "followers", "genres")
+
+
+def normalize_query(query: str) -> str:
+    """Cache key of a seed name: casefolded, accents kept, whitespace collapsed."""
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFC", query or "")).strip().casefold()
+
+
+def artist_summary(item: Dict[str, Any]) -> Dict[str, Any]:
+    return {name: item[name] for name in ARTIST_FIELDS if name in item}
+
+
+@dataclass
+class Resolution:
+    """A cached answer: ``artist`` is empty for a negative (not found) entry."""
+
+    artist: Dict[str, Any]
+    score: Optional[float] = None
+    candidates: List[Dict[str, Any]] = field(default_factory=list)
+    resolved_at: float = 0.0
+
+    @property
+    def artist_id(self) -> Optional[str]:
+        return self.artist.get("id")
+
+    @property
+    def found(self) -> bool:
+        return bool(self.artist_id)
+
+
+class ResolutionCache:
+    """SQLite cache of artist searches, keyed by normalized query, strategy and market.
+
+    ``strategy`` separates resolvers that may pick different artists for the same name
+    (e.g. the collector's top search hit vs. the runners' fuzzy ranking). Matches are
+    kept for ``ttl_s`` together with their score and the runner-up candidates; queries
+    that found nothing are cached for the shorter ``negative_ttl_s``. Search errors must
+    not be stored.
+
+    Args:
+        path: SQLite database file.
+        ttl_s: Lifetime of a positive entry.
+        negative_ttl_s: Lifetime of a not-found entry.
+        max_candidates: Runner-up candidates stored with each match.
+        clock: Wall-clock function, injectable for tests.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        ttl_s: float = 30 * DAY,
+        negative_ttl_s: float = 1 * DAY,
+        max_candidates: int = 5,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.path = Path(path)
+        self.ttl_s = ttl_s
+        self.negative_ttl_s = negative_ttl_s
+        self.max_candidates = max(0, max_candidates)
+        self.clock = clock
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS resolutions ("
+            " query TEXT NOT NULL, strategy TEXT NOT NULL, market TEXT NOT NULL,"
+            " artist_id TEXT, artist TEXT NOT NULL, score REAL, candidates TEXT NOT NULL,"
+            " resolved_at REAL NOT NULL, expires_at REAL NOT NULL,"
+            " PRIMARY KEY (query, strategy, market))"
+        )
+        self._conn.commit()
+
+    @classmethod
+    def from_env(cls, path: Optional[str] = None) -> Optional["ResolutionCache"]:
+        """Build the cache from ``ARTIST_RESOLUTION_CACHE``; ``None`` when set to empty."""
+        path = path or os.getenv("ARTIST_RESOLUTION_CACHE", DEFAULT_RESOLUTION_PATH)
+        if not path:
+            return None
+        return cls(
+            Path(path),
+            ttl_s=float(os.getenv("RESOLUTION_TTL_DAYS", "30") or 30) * DAY,
+            negative_ttl_s=float(os.getenv("RESOLUTION_NEGATIVE_TTL_DAYS", "1") or 1) * DAY,
+        )
+
+    def get(self, query: str, strategy: str, market: str = "") -> Optional[Resolution]:
+        """Cached resolution, or ``None`` when absent or expired (the caller must search)."""
+        key = (normalize_query(query), strategy, market)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT artist, score, candidates, resolved_at, expires_at FROM resolutions"
+                " WHERE query = ? AND strategy = ? AND market = ?",
+                key,
+            ).fetchone()
+            if row is None or row[4] <= self.clock():
+                self.misses += 1
+                return None
+            resolution = Resolution(json.loads(row[0]), row[1], json.loads(row[2]), row[3])
+            if resolution.found:
+                self.hits += 1
+            else:
+                self.negative_hits += 1
+        return resolution
+
+    def put(
+        self,
+        query: str,
+        strategy: str,
+        market: str,
+        artist: Optional[Dict[str, Any]],
+        *,
+        score: Optional[float] = None,
+        candidates: Sequence[Dict[str, Any]] = (),
+    ) -> Resolution:
+        """Store the chosen ``artist`` (``None``/empty = not found) and return the entry."""
+        now = self.clock()
+        summary = artist_summary(artist or {})
+        ttl = self.ttl_s if summary.get("id") else self.negative_ttl_s
+        kept = list(candidates)[: self.max_candidates]
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO resolutions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    normalize_query(query),
+                    strategy,
+                    market,
+                    summary.get("id"),
+                    json.dumps(summary, ensure_ascii=False),
+                    score,
+                    json.dumps(kept, ensure_ascii=False),
+                    now,
+                    now + ttl,
+                ),
+            )
+            self._conn.commit()
+        return Resolution(summary, score, kept, now)
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "negative_hits": self.negative_hits, "misses": self.misses}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+__all__ = [
+    "DEFAULT_RESOLUTION_PATH",
+    "Resolution",
+    "ResolutionCache",
+    "artist_summary",
+    "normalize_query",
+]
@@ -2,9 +2,10 @@
 
 from __future__ import annotations
 
+import asyncio
 import random
 import time
-from typing import Callable, Optional, Tuple, Type, TypeVar
+from typing import Awaitable, Callable, Optional, Tuple, Type, TypeVar
 
 T = TypeVar("T")
 
@@ -70,3 +71,45 @@ def retry_with_backoff(
             raise
 
     raise RetryError("retry attempts exhausted")
+
+
+async def async_retry_with_backoff(
+    func: Callable[[], Awaitable[T]],
+    *,
+    max_tries: int = 5,
+    base: float = 0.5,
+    cap: float = 60.0,
+    jitter: bool = True,
+    sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    retry_exceptions: Tuple[Type[BaseException], ...] = (Exception,),
+    on_retry: Optional[Callable[[BaseException, int], Optional[float]]] = None,
+) -> T:
+    """Asyncio counterpart of :func:`retry_with_backoff`.
+
+    ``func`` is a coroutine factory; waits between attempts use ``sleep`` (``asyncio.sleep``
+    by default) so other tasks keep running. Arguments and semantics are otherwise identical.
+    """
+
+    if max_tries < 1:
+        raise ValueError("max_tries must be >= 1")
+
+    attempt = 0
+    while attempt < max_tries:
+        try:
+            return await func()
+        except retry_exceptions as exc:  # type: ignore[misc]
+            attempt += 1
+            if attempt >= max_tries:
+                raise RetryError("retry attempts exhausted") from exc
+
+            wait = min(cap, base * (2 ** (attempt - 1)))
+            override = on_retry(exc, attempt) if on_retry else None
+            if override is not None:
+                wait = max(0.0, override)
+            elif jitter:
+                wait += random.uniform(0.0, base)
+
+            if wait > 0:
+                await sleep(wait)
+
+    raise RetryError("retry attempts exhausted")
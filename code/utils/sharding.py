@@ -0,0 +1,77 @@
+"""Stable hash-based assignment of seed artists to collection shards."""
+
+from __future__ import annotations
+
+import hashlib
+import re
+from pathlib import Path
+from typing import Any, Callable, List, Optional, Sequence, Tuple, TypeVar
+
+T = TypeVar("T")
+
+SEED_PART_GLOB = "seed_part_*.txt"
+
+
+def parse_shard(spec: str) -> Tuple[int, int]:
+    """Parse ``"i/N"`` (1-based, ``1 <= i <= N``) into ``(i, N)``."""
+    match = re.fullmatch(r"\s*(\d+)\s*/\s*(\d+)\s*", spec or "")
+    if not match:
+        raise ValueError(f"shard must look like i/N, got {spec!r}")
+    index, total = int(match.group(1)), int(match.group(2))
+    if not 1 <= index <= total:
+        raise ValueError(f"shard index must be between 1 and {total}, got {index}")
+    return index, total
+
+
+def shard_key(name: str) -> str:
+    """Normalized artist name used for assignment (case and spacing do not matter)."""
+    return " ".join(name.split()).casefold()
+
+
+def shard_of(name: str, total: int) -> int:
+    """1-based shard of ``name``; depends only on the name and ``total``.
+
+    Uses SHA-1 rather than ``hash()``, which is salted per process.
+    """
+    digest = hashlib.sha1(shard_key(name).encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % total + 1
+
+
+def select_shard(
+    items: Sequence[T],
+    index: int,
+    total: int,
+    key: Optional[Callable[[T], str]] = None,
+) -> List[T]:
+    """Items of ``items`` assigned to shard ``index`` of ``total``, in their original order."""
+    name_of: Callable[[Any], str] = key or str
+    return [item for item in items if shard_of(name_of(item), total) == index]
+
+
+def _part_number(path: Path) -> int:
+    match = re.search(r"(\d+)", path.stem)
+    return int(match.group(1)) if match else 0
+
+
+def load_seed_parts(seed_dir: Path, pattern: str = SEED_PART_GLOB) -> List[str]:
+    """All artists from ``seed_part_*.txt`` in numeric part order, first occurrence kept."""
+    seen = set()
+    artists: List[str] = []
+    for path in sorted(Path(seed_dir).glob(pattern), key=lambda p: (_part_number(p), p.name)):
+        for line in path.read_text(encoding="utf-8").splitlines():
+            name = line.strip()
+            if not name or name.startswith("#") or shard_key(name) in seen:
+                continue
+            seen.add(shard_key(name))
+            artists.append(name)
+    return artists
+
+
+__all__ = [
+    "SEED_PART_GLOB",
+    "load_seed_parts",
+    "parse_shard",
+    "select_shard",
+    "shard_key",
+    "shard_of",
+]
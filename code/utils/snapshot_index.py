@@ -0,0 +1,114 @@
+"""Index of previous raw snapshots for incremental (delta) collection."""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+SNAPSHOT_GLOB = "funk_br_discografia_raw_*.jsonl"
+
+
+def snapshot_history(raw_dir: Path, exclude: Optional[Path] = None) -> List[Path]:
+    """Non-empty ``funk_br_discografia_raw_*.jsonl`` in ``raw_dir`` other than ``exclude``,
+    oldest first."""
+    skip = exclude.resolve() if exclude is not None else None
+    return sorted(
+        (
+            path
+            for path in raw_dir.glob(SNAPSHOT_GLOB)
+            if path.resolve() != skip and path.stat().st_size > 0
+        ),
+        key=lambda path: path.name,
+    )
+
+
+def latest_snapshot(raw_dir: Path, exclude: Optional[Path] = None) -> Optional[Path]:
+    """Most recent ``funk_br_discografia_raw_*.jsonl`` in ``raw_dir`` other than ``exclude``."""
+    history = snapshot_history(raw_dir, exclude)
+    return history[-1] if history else None
+
+
+# (file index, byte offset, length) of one stored row.
+_Span = Tuple[int, int, int]
+
+
+class SnapshotIndex:
+    """Byte offsets of the track rows of each ``(artist_id, album_id)`` across snapshots.
+
+    Global dedup keeps the first occurrence in file-name order, so the rows an incremental
+    run carried forward usually survive only in an older snapshot. The index therefore
+    reads every given snapshot, oldest first: per album each track keeps its newest row
+    and the album's ``album_total_tracks`` comes from the newest snapshot holding it. Only
+    the offsets are kept in memory; rows are read back with ``pread`` when carried
+    forward, so one index can serve several worker threads.
+    """
+
+    def __init__(self, paths: Iterable[Path]) -> None:
+        self.paths = [Path(path) for path in paths]
+        # (artist_id, album_id) -> [album_total_tracks, newest file index, {track: span}]
+        self._albums: Dict[Tuple[str, str], List[Any]] = {}
+        self._fds: List[int] = []
+
+    @property
+    def path(self) -> Optional[Path]:
+        """Newest indexed snapshot."""
+        return self.paths[-1] if self.paths else None
+
+    @classmethod
+    def build(cls, path: Path) -> "SnapshotIndex":
+        return cls.build_many([path])
+
+    @classmethod
+    def build_many(cls, paths: Iterable[Path]) -> "SnapshotIndex":
+        index = cls(paths)
+        for file_idx, path in enumerate(index.paths):
+            index._scan(file_idx, path)
+            index._fds.append(os.open(path, os.O_RDONLY))
+        return index
+
+    def _scan(self, file_idx: int, path: Path) -> None:
+        offset = 0
+        with path.open("rb") as handle:
+            for line in handle:
+                start, offset = offset, offset + len(line)
+                if b'"track_row"' not in line or not line.endswith(b"\n"):
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    continue
+                artist_id, album_id = row.get("artist_id"), row.get("album_id")
+                if row.get("_type") != "track_row" or not artist_id or not album_id:
+                    continue
+                entry = self._albums.setdefault((artist_id, album_id), [None, -1, {}])
+                if entry[1] != file_idx:  # the newest snapshot holding the album sets the total
+                    entry[0], entry[1] = row.get("album_total_tracks"), file_idx
+                track = row.get("track_id") or f"{file_idx}:{start}"
+                entry[2][track] = (file_idx, start, len(line))
+
+    def __len__(self) -> int:
+        return len(self._albums)
+
+    def close(self) -> None:
+        for fd in self._fds:
+            os.close(fd)
+        self._fds = []
+
+    def unchanged_lines(
+        self, artist_id: str, album_id: str, total_tracks: Optional[int]
+    ) -> Optional[List[bytes]]:
+        """Stored rows of an album whose listed ``total_tracks`` still matches, else ``None``."""
+        entry = self._albums.get((artist_id, album_id))
+        if entry is None or total_tracks is None or entry[0] != total_tracks:
+            return None
+        return list(self._read(sorted(entry[2].values())))
+
+    def _read(self, spans: List[_Span]) -> Iterator[bytes]:
+        assert self._fds, "index is closed"
+        for file_idx, offset, length in spans:
+            yield os.pread(self._fds[file_idx], length, offset)
+
+
+__all__ = ["SNAPSHOT_GLOB", "SnapshotIndex", "latest_snapshot", "snapshot_history"]
@@ -0,0 +1,155 @@
+"""Client-credentials OAuth tokens cached on disk and shared between processes."""
+
+from __future__ import annotations
+
+import base64
+import fcntl
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+from urllib import parse, request
+
+TOKEN_URL = "https://accounts.spotify.com/api/token"
+DEFAULT_CACHE_PATH = "data/cache/spotify_token.json"
+
+
+class TokenCache:
+    """JSON file of ``{client_key: {access_token, expires_at}}`` guarded by ``fcntl.flock``.
+
+    The lock is held while a missing or expiring token is fetched, so concurrent
+    processes wait for one POST instead of each issuing their own. Tokens are treated
+    as expired ``refresh_margin`` seconds before ``expires_in`` runs out, which leaves
+    in-flight batches enough headroom to finish without a 401.
+
+    Args:
+        path: Cache file (created with mode 0600).
+        refresh_margin: Seconds before expiry at which a token is refreshed.
+        clock: Wall-clock function, injectable for tests.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        refresh_margin: float = 300.0,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.path = Path(path)
+        self.refresh_margin = max(0.0, refresh_margin)
+        self.clock = clock
+
+    @classmethod
+    def from_env(cls) -> "TokenCache":
+        return cls(
+            Path(os.getenv("SPOTIFY_TOKEN_CACHE", DEFAULT_CACHE_PATH)),
+            refresh_margin=float(os.getenv("SPOTIFY_TOKEN_REFRESH_MARGIN", "300") or 300),
+        )
+
+    @staticmethod
+    def _key(client_id: str) -> str:
+        return hashlib.sha256(client_id.encode("utf-8")).hexdigest()[:16]
+
+    def _locked(self, mutate: Callable[[Dict[str, Any]], Any]) -> Any:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            raw = b""
+            while chunk := os.read(fd, 4096):
+                raw += chunk
+            try:
+                entries = json.loads(raw) if raw else {}
+            except ValueError:
+                entries = {}
+            before = json.dumps(entries, sort_keys=True)
+            result = mutate(entries)
+            if json.dumps(entries, sort_keys=True) != before:
+                os.lseek(fd, 0, os.SEEK_SET)
+                os.ftruncate(fd, 0)
+                os.write(fd, json.dumps(entries).encode("utf-8"))
+            return result
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+
+    def get(self, client_id: str, fetch: Callable[[], Dict[str, Any]]) -> Tuple[str, float]:
+        """Return ``(access_token, expires_at)``, calling ``fetch`` only when needed.
+
+        ``fetch`` must return the token endpoint payload (``access_token``, ``expires_in``).
+        """
+        key = self._key(client_id)
+
+        def _get(entries: Dict[str, Any]) -> Tuple[str, float]:
+            now = self.clock()
+            entry = entries.get(key) or {}
+            if entry.get("access_token") and entry.get("expires_at", 0) - self.refresh_margin > now:
+                return entry["access_token"], float(entry["expires_at"])
+            payload = fetch()
+            token = payload.get("access_token")
+            if not token:
+                raise RuntimeError("no access_token in response")
+            expires_at = now + float(payload.get("expires_in") or 3600)
+            entries[key] = {"access_token": token, "expires_at": expires_at}
+            return token, expires_at
+
+        return self._locked(_get)
+
+    def invalidate(self, client_id: str, token: Optional[str] = None) -> None:
+        """Drop the cached token (only if it still equals ``token``, when given)."""
+        key = self._key(client_id)
+
+        def _drop(entries: Dict[str, Any]) -> None:
+            entry = entries.get(key)
+            if entry and (token is None or entry.get("access_token") == token):
+                del entries[key]
+
+        self._locked(_drop)
+
+
+def request_client_credentials(
+    client_id: str, client_secret: str, *, timeout: float = 30.0
+) -> Dict[str, Any]:
+    """POST the client-credentials grant and return the raw token payload."""
+    basic = base64.b64encode(f"{client_id}:{client_secret}".encode()).decode()
+    data = parse.urlencode({"grant_type": "client_credentials"}).encode()
+    req = request.Request(TOKEN_URL, data=data, headers={"Authorization": f"Basic {basic}"})
+    with request.urlopen(req, timeout=timeout) as response:
+        return json.load(response)
+
+
+class AccessTokenProvider:
+    """Callable returning the shared cached token each time it is called.
+
+    Callers ask for the token per request (cheap once cached), so a long run picks up
+    the refreshed token instead of holding one that expires mid-run; :meth:`invalidate`
+    drops a token the API rejected with a 401.
+    """
+
+    def __init__(
+        self, client_id: str, client_secret: str, cache: Optional[TokenCache] = None
+    ) -> None:
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.cache = cache or TokenCache.from_env()
+
+    def __call__(self) -> str:
+        token, _expires_at = self.cache.get(
+            self.client_id,
+            lambda: request_client_credentials(self.client_id, self.client_secret),
+        )
+        return token
+
+    def invalidate(self, token: str) -> None:
+        self.cache.invalidate(self.client_id, token)
+
+
+__all__ = [
+    "AccessTokenProvider",
+    "DEFAULT_CACHE_PATH",
+    "TOKEN_URL",
+    "TokenCache",
+    "request_client_credentials",
+]
@@ -3,7 +3,7 @@ set -euo pipefail
 SNAP="${1:-$(date +%Y%m%d)}"
 echo "[run] coletando snapshot=$SNAP"
 python code/coletar_discografia_funk_br.py --snapshot "$SNAP"
-echo "[run] dedup global em data/raw/*.jsonl"
+echo "[run] dedup global incremental em data/raw/*.jsonl (só arquivos novos/alterados)"
 python code/dedup_snapshot.py --path data/raw --pattern "*.jsonl" --scope global || \
 python code/dedup_snapshot.py --path data/raw --pattern "*.jsonl"
 echo "[run] ok"
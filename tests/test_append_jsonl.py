@@ -19,14 +19,16 @@ def load_module(module_name: str, relative_path: str):
     return module
 
 
-collect_module = load_module("funkbr_collect_spotify", "code/collect_spotify_catalog.py")
+jsonl_writer = load_module("funkbr_jsonl_writer", "code/utils/jsonl_writer.py")
 
 
-def test_atomic_append_jsonl_appends_in_order(tmp_path: Path) -> None:
+def test_jsonl_writer_appends_in_order(tmp_path: Path) -> None:
     target = tmp_path / "sample.jsonl"
 
-    collect_module.atomic_append_jsonl(target, {"id": 1, "value": "first"})
-    collect_module.atomic_append_jsonl(target, {"id": 2, "value": "second"})
+    with jsonl_writer.JsonlWriter(target) as writer:
+        writer.write({"id": 1, "value": "first"})
+    with jsonl_writer.JsonlWriter(target) as writer:
+        writer.write({"id": 2, "value": "second"})
 
     lines = target.read_text(encoding="utf-8").splitlines()
     assert len(lines) == 2
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import importlib.util
+import sys
+from pathlib import Path
+
+from rapidfuzz import fuzz
+
+
+def load_module(module_name: str, relative_path: str):
+    base = Path(__file__).resolve().parent.parent
+    module_path = base / relative_path
+    if str(module_path.parent) not in sys.path:
+        sys.path.insert(0, str(module_path.parent))
+    spec = importlib.util.spec_from_file_location(module_name, module_path)
+    module = importlib.util.module_from_spec(spec)
+    assert spec and spec.loader
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+artist_match = load_module("funkbr_artist_match", "code/utils/artist_match.py")
+
+
+def _artist(artist_id: str, name: str, popularity=None, followers=None):
+    return {
+        "id": artist_id,
+        "name": name,
+        "popularity": popularity,
+        "followers": {"total": followers},
+    }
+
+
+def _legacy_pick(query, items):
+    """The per-pair ranking the runners used before the batch resolver."""
+    norm = artist_match.normalize_name
+    ranked = [
+        (
+            fuzz.ratio(norm(it.get("name", "")), norm(query)),
+            it.get("popularity") or -1,
+            (it.get("followers") or {}).get("total") or -1,
+            it,
+        )
+        for it in items
+    ]
+    ranked.sort(key=lambda t: (t[0], t[1], t[2]), reverse=True)
+    return ranked[0][3]
+
+
+SEARCHES = [
+    (
+        "MC Kevinho",
+        [
+            _artist("k2", "Mc Kevinho", 40, 100),
+            _artist("k1", "MC Kevinho", 40, 900),
+            _artist("k3", "Kevinho"),
+            _artist("k4", "MC Kevin", 90, 5000),
+        ],
+    ),
+    ("Anitta", [_artist("a1", "Anitta", 90, 10), _artist("a2", "Anitta", 90, 10)]),
+    ("Ludmilla", [_artist("l1", "Ludmila", 50), _artist("l2", "Lud Milla", 80)]),
+    ("Nobody", []),
+]
+
+
+def test_batch_ranking_matches_per_pair_rules() -> None:
+    matches = artist_match.match_artists(SEARCHES)
+
+    for (query, items), match in zip(SEARCHES, matches):
+        if not items:
+            assert match is None
+            continue
+        assert match.artist is _legacy_pick(query, items)
+    kevinho = matches[0]
+    # Same score and popularity: followers break the tie; equal artists keep search order.
+    assert (kevinho.artist["id"], kevinho.score) == ("k1", 100.0)
+    assert [a["id"] for a, _score in kevinho.runners_up] == ["k2", "k4", "k3"]
+    assert matches[1].artist["id"] == "a1"
+
+
+def test_variants_and_pure_python_fallback(monkeypatch) -> None:
+    assert artist_match.query_variants("MC Kevinho (Ao Vivo) feat. Anitta", 6) == [
+        "mc kevinho ao vivo feat anitta",
+        "mc kevinho feat anitta",
+        "mc kevinho",
+        "kevinho",
+    ]
+    assert artist_match.query_variants("Kevinho", 6) == ["kevinho", "mc kevinho"]
+    items = [_artist("x1", "Kevinho", 60), _artist("x2", "MC Kevin", 70)]
+    assert artist_match.best_match("MC Kevinho", items).artist["id"] == "x2"
+    assert artist_match.best_match("MC Kevinho", items, max_variants=6).artist["id"] == "x1"
+
+    monkeypatch.setattr(artist_match, "np", None)
+    fallback = artist_match.match_artists(SEARCHES, max_variants=3)
+    assert [m and m.artist["id"] for m in fallback] == ["k1", "a1", "l2", None]
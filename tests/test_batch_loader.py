@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import importlib.util
+import sys
+import threading
+from pathlib import Path
+
+
+def load_module(module_name: str, relative_path: str):
+    base = Path(__file__).resolve().parent.parent
+    module_path = base / relative_path
+    if str(module_path.parent) not in sys.path:
+        sys.path.insert(0, str(module_path.parent))
+    spec = importlib.util.spec_from_file_location(module_name, module_path)
+    module = importlib.util.module_from_spec(spec)
+    assert spec and spec.loader
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+batch_loader = load_module("funkbr_batch_loader", "code/utils/batch_loader.py")
+
+
+class RecordingClient:
+    def __init__(self) -> None:
+        self.batches: list[list[str]] = []
+        self._lock = threading.Lock()
+
+    def get(self, url, *, params=None):
+        ids = params["ids"].split(",")
+        with self._lock:
+            self.batches.append(ids)
+        # Unknown IDs come back as null; relinked IDs differ from the requested ones.
+        return {"tracks": [None if i == "missing" else {"id": f"{i}-relinked"} for i in ids]}
+
+
+def test_full_batches_dispatch_immediately_and_results_map_by_position() -> None:
+    client = RecordingClient()
+    loader = batch_loader.BatchLoader(client, "tracks", "tracks", max_batch=3, deadline=0)
+
+    result = loader.load_many(["a", "b", "c", "d", "missing", "a"])
+
+    assert client.batches == [["a", "b", "c"], ["d", "missing"]]
+    assert result["a"] == {"id": "a-relinked"}
+    assert result["missing"] is None
+    assert loader.load_many(["b"]) == {"b": {"id": "b-relinked"}}  # memoized
+    assert loader.stats()["requests"] == 2
+
+
+def test_partial_batches_from_concurrent_callers_are_merged() -> None:
+    client = RecordingClient()
+    loader = batch_loader.BatchLoader(client, "tracks", "tracks", max_batch=50, deadline=0.2)
+    results: dict[str, dict] = {}
+
+    def caller(prefix: str) -> None:
+        results.update(loader.load_many([f"{prefix}{i}" for i in range(10)]))
+
+    threads = [threading.Thread(target=caller, args=(p,)) for p in ("x", "y", "z")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(client.batches) == 1
+    assert sorted(client.batches[0]) == sorted(results)
+    assert len(results) == 30
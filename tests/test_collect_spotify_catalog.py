@@ -0,0 +1,430 @@
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+
+def load_module(module_name: str, relative_path: str):
+    base = Path(__file__).resolve().parent.parent
+    module_path = base / relative_path
+    if str(module_path.parent) not in sys.path:
+        sys.path.insert(0, str(module_path.parent))
+    spec = importlib.util.spec_from_file_location(module_name, module_path)
+    module = importlib.util.module_from_spec(spec)
+    assert spec and spec.loader
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+collect_module = load_module("funkbr_collect_spotify", "code/collect_spotify_catalog.py")
+
+
+def test_album_tracks_use_embedded_page_and_follow_next() -> None:
+    calls: list[str] = []
+
+    class PagingClient:
+        def get(self, url, *, params=None):
+            calls.append(url)
+            return {"items": [{"id": "t3"}], "next": None}
+
+    single = {"tracks": {"items": [{"id": "t1"}], "next": None}}
+    paged = {"tracks": {"items": [{"id": "t1"}, {"id": "t2"}], "next": "https://next/page2"}}
+
+    client = PagingClient()
+    assert collect_module.collect_album_track_ids(client, "a1", single, "BR") == ["t1"]
+    assert calls == []
+    assert collect_module.collect_album_track_ids(client, "a2", paged, "BR") == ["t1", "t2", "t3"]
+    assert calls == ["https://next/page2"]
+    assert collect_module.collect_album_track_ids(client, "a3", None, "BR") == ["t3"]
+    assert calls[-1].endswith("/albums/a3/tracks")
+
+
+class FakeCatalogClient:
+    """Serves one album with two tracks per artist; the artist ``boom`` fails in search."""
+
+    def size_pool(self, connections: int) -> None:
+        pass
+
+    def stats(self):
+        return {}
+
+    def get(self, url, *, params=None):
+        params = params or {}
+        if url.endswith("/search"):
+            if params["q"] == "boom":
+                raise RuntimeError("search failed")
+            return {"artists": {"items": [{"id": f"ar-{params['q']}"}]}}
+        if "/artists/" in url:
+            artist_id = url.split("/artists/")[1].split("/")[0]
+            return {"items": [{"id": f"al-{artist_id}", "total_tracks": 2}], "next": None}
+        ids = params["ids"].split(",")
+        if url.endswith("/artists"):
+            return {"artists": [{"id": i, "name": i} for i in ids]}
+        if url.endswith("/albums"):
+            return {
+                "albums": [
+                    {"id": i, "tracks": {"items": [{"id": f"{i}-t1"}, {"id": f"{i}-t2"}]}}
+                    for i in ids
+                ]
+            }
+        return {"tracks": [{"id": i, "album": {"id": i.rsplit("-", 1)[0]}} for i in ids]}
+
+
+def test_parallel_workers_share_one_writer(tmp_path: Path, capsys) -> None:
+    target = tmp_path / "out.jsonl"
+    artists = ["a", "boom", "b", "c"]
+
+    with collect_module.JsonlWriter(target, flush_rows=100) as writer:
+        total = collect_module._collect_artists(
+            FakeCatalogClient(), artists, "BR", writer, workers=3
+        )
+
+    rows = [json.loads(line) for line in target.read_text(encoding="utf-8").splitlines()]
+    events = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert total == 6
+    assert sum(row["_type"] == "track_row" for row in rows) == 6
+    assert sorted(e["artist_query"] for e in events if e["event"] == "artist_done") == [
+        "a",
+        "b",
+        "c",
+    ]
+    assert [e["index"] for e in events if e["event"] == "artist_error"] == [2]
+
+
+def test_failed_artist_is_retried_after_cooldown(tmp_path: Path, capsys) -> None:
+    client = FakeCatalogClient()
+    original_get = client.get
+    failures = {"flaky": 1}
+
+    def flaky_get(url, *, params=None):
+        query = (params or {}).get("q")
+        if url.endswith("/search") and failures.get(query):
+            failures[query] -= 1
+            raise RuntimeError("search failed")
+        return original_get(url, params=params)
+
+    client.get = flaky_get
+    queue = collect_module.JobQueue(tmp_path / "out.jsonl.queue", cooldown_s=0.01)
+    queue.enqueue(["flaky", "a"], "BR")
+    with collect_module.JsonlWriter(tmp_path / "out.jsonl") as writer:
+        total = collect_module._collect_artists(
+            client, ["flaky", "a"], "BR", writer, queue=queue, requeue_wait=1.0
+        )
+
+    events = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert total == 4
+    assert [e["artist_query"] for e in events if e["event"] == "artist_done"] == ["a", "flaky"]
+    assert [e["state"] for e in events if e["event"] == "artist_error"] == ["queued"]
+    assert queue.stats()["done"] == 2
+
+
+def test_resolution_cache_skips_search_on_rerun(tmp_path: Path, capsys) -> None:
+    client = FakeCatalogClient()
+    original_get = client.get
+    searches: list[str] = []
+
+    def recording_get(url, *, params=None):
+        if url.endswith("/search"):
+            searches.append(params["q"])
+            if params["q"] == "ghost":
+                return {"artists": {"items": []}}
+        return original_get(url, params=params)
+
+    client.get = recording_get
+    resolutions = collect_module.ResolutionCache(tmp_path / "resolution.sqlite")
+    for _run in range(2):
+        with collect_module.JsonlWriter(tmp_path / f"out{_run}.jsonl") as writer:
+            total = collect_module._collect_artists(
+                client, ["a", "ghost"], "BR", writer, resolutions=resolutions
+            )
+        assert total == 2
+
+    events = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert searches == ["a", "ghost"]
+    assert [e["cached"] for e in events if e["event"] == "artist_not_found"] == [False, True]
+    assert resolutions.stats() == {"hits": 1, "negative_hits": 1, "misses": 2}
+
+
+def test_resume_rebuilds_state_from_checkpoint_journal(tmp_path: Path) -> None:
+    out = tmp_path / "out.jsonl"
+    journal = collect_module.CheckpointJournal(collect_module.CheckpointJournal.path_for(out))
+    pairs = [{"album_id": "al-x", "track_id": f"al-x-t{i}"} for i in (1, 2, 3)]
+    journal.record_albums("x", "BR", "ar-x", {"al-x": {"album_label": "KondZilla"}}, pairs, 2)
+    journal.record_tracks("x", "BR", 0, 2)
+
+    client = FakeCatalogClient()
+    calls: list[tuple[str, dict | None]] = []
+    original_get = client.get
+
+    def recording_get(url, *, params=None):
+        calls.append((url, params))
+        return original_get(url, params=params)
+
+    client.get = recording_get
+    resumed = collect_module.CheckpointJournal(journal.path)
+    with collect_module.JsonlWriter(out) as writer:
+        total = collect_module.collect_artist_catalog(client, "x", "BR", writer, journal=resumed)
+
+    rows = [json.loads(line) for line in out.read_text(encoding="utf-8").splitlines()]
+    assert total == 3
+    assert [url.rsplit("/", 1)[1] for url, _ in calls] == ["tracks"]
+    assert calls[0][1]["ids"] == "al-x-t3"
+    assert rows[0]["album_label"] == "KondZilla"
+    assert resumed.get("x", "BR").track_batches == {0: 2, 1: 1}
+
+
+def test_incremental_mode_carries_unchanged_albums_forward(tmp_path: Path) -> None:
+    snapshot_index = load_module("funkbr_snapshot_index", "code/utils/snapshot_index.py")
+    previous = tmp_path / "funk_br_discografia_raw_20260101.jsonl"
+    old_rows = [
+        {"_type": "artist_meta", "artist_id": "ar-y"},
+        {
+            "_type": "track_row",
+            "artist_id": "ar-y",
+            "album_id": "al-ar-y",
+            "album_total_tracks": 2,
+            "track_id": "old-1",
+        },
+        {
+            "_type": "track_row",
+            "artist_id": "ar-y",
+            "album_id": "al-ar-y",
+            "album_total_tracks": 2,
+            "track_id": "old-2",
+        },
+        {
+            "_type": "track_row",
+            "artist_id": "ar-z",
+            "album_id": "al-ar-z",
+            "album_total_tracks": 1,
+            "track_id": "stale",
+        },
+    ]
+    previous.write_text("".join(json.dumps(row) + "\n" for row in old_rows), encoding="utf-8")
+    out = tmp_path / "funk_br_discografia_raw_20260102.jsonl"
+    assert snapshot_index.latest_snapshot(tmp_path, out) == previous
+
+    index = collect_module.SnapshotIndex.build(previous)
+    client = FakeCatalogClient()
+    with collect_module.JsonlWriter(out) as writer:
+        unchanged = collect_module.collect_artist_catalog(client, "y", "BR", writer, previous=index)
+        changed = collect_module.collect_artist_catalog(client, "z", "BR", writer, previous=index)
+    index.close()
+
+    lines = out.read_text(encoding="utf-8").splitlines()
+    track_ids = [json.loads(line).get("track_id") for line in lines]
+    assert (unchanged, changed) == (2, 2)
+    assert lines[1:3] == previous.read_text(encoding="utf-8").splitlines()[1:3]
+    assert track_ids[1:3] == ["old-1", "old-2"]
+    assert track_ids[4:] == ["al-ar-z-t1", "al-ar-z-t2"]
+
+
+def test_retry_after_artist_row_does_not_duplicate_rows(tmp_path: Path, capsys) -> None:
+    previous = tmp_path / "funk_br_discografia_raw_20260101.jsonl"
+    carried = {
+        "_type": "track_row",
+        "artist_id": "ar-y",
+        "album_id": "al-ar-y",
+        "album_total_tracks": 2,
+    }
+    previous.write_text(
+        "".join(json.dumps({**carried, "track_id": tid}) + "\n" for tid in ("old-1", "old-2")),
+        encoding="utf-8",
+    )
+    client = FakeCatalogClient()
+    original_get = client.get
+    failures = {"albums": 1}
+
+    def failing_get(url, *, params=None):
+        if url.endswith("/artists/ar-y/albums"):
+            return {
+                "items": [
+                    {"id": "al-ar-y", "total_tracks": 2},
+                    {"id": "al-new", "total_tracks": 2},
+                ],
+                "next": None,
+            }
+        if url.endswith("/albums") and failures["albums"]:
+            failures["albums"] -= 1  # after the artist row and the carry-forward split
+            raise RuntimeError("502 from /albums")
+        return original_get(url, params=params)
+
+    client.get = failing_get
+    out = tmp_path / "funk_br_discografia_raw_20260102.jsonl"
+    journal = collect_module.CheckpointJournal(collect_module.CheckpointJournal.path_for(out))
+    queue = collect_module.JobQueue(tmp_path / "out.jsonl.queue", cooldown_s=0.01)
+    queue.enqueue(["y"], "BR")
+    index = collect_module.SnapshotIndex.build(previous)
+    with collect_module.JsonlWriter(out) as writer:
+        total = collect_module._collect_artists(
+            client,
+            ["y"],
+            "BR",
+            writer,
+            journal=journal,
+            previous=index,
+            queue=queue,
+            requeue_wait=1.0,
+        )
+    index.close()
+
+    rows = [json.loads(line) for line in out.read_text(encoding="utf-8").splitlines()]
+    events = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert total == 4
+    assert [row["_type"] for row in rows] == ["artist_meta"] + ["track_row"] * 4
+    assert [row["track_id"] for row in rows[1:]] == ["old-1", "old-2", "al-new-t1", "al-new-t2"]
+    assert [e["stage"] for e in events if e["event"] == "artist_resumed"] == ["albums"]
+
+
+def test_resume_after_artist_stage_skips_search_and_artist_row(tmp_path: Path) -> None:
+    out = tmp_path / "out.jsonl"
+    journal = collect_module.CheckpointJournal(collect_module.CheckpointJournal.path_for(out))
+    journal.record_artist("x", "BR", "ar-x")  # crashed before the album listing was recorded
+
+    client = FakeCatalogClient()
+    urls: list[str] = []
+    original_get = client.get
+
+    def recording_get(url, *, params=None):
+        urls.append(url.rsplit("/", 1)[1])
+        return original_get(url, params=params)
+
+    client.get = recording_get
+    resumed = collect_module.CheckpointJournal(journal.path)
+    with collect_module.JsonlWriter(out) as writer:
+        total = collect_module.collect_artist_catalog(client, "x", "BR", writer, journal=resumed)
+
+    rows = [json.loads(line) for line in out.read_text(encoding="utf-8").splitlines()]
+    assert total == 2
+    assert urls == ["albums", "albums", "tracks"]
+    assert [row["_type"] for row in rows] == ["track_row", "track_row"]
+
+
+def test_incremental_after_global_dedup_still_carries_albums(tmp_path: Path) -> None:
+    dedup_snapshot = load_module("funkbr_dedup_for_collect", "code/dedup_snapshot.py")
+    client = FakeCatalogClient()
+    original_get = client.get
+    hydrated: list[str] = []
+
+    def listing_get(url, *, params=None):
+        payload = original_get(url, params=params)
+        if url.endswith("/albums") and "/artists/" not in url:
+            hydrated.extend(params["ids"].split(","))
+            for album in payload["albums"]:
+                album["total_tracks"] = 2
+        return payload
+
+    client.get = listing_get
+    for day in ("20260101", "20260102", "20260103"):
+        out = tmp_path / f"funk_br_discografia_raw_{day}.jsonl"
+        args = collect_module.argparse.Namespace(incremental=True, previous=None, snapshot=day)
+        previous = collect_module._previous_index(args, out, None)
+        with collect_module.JsonlWriter(out) as writer:
+            for artist in ("y", f"new{day}"):  # every night also brings unseen rows
+                rows = collect_module.collect_artist_catalog(
+                    client, artist, "BR", writer, previous=previous
+                )
+                assert rows == 2
+        if previous is not None:
+            previous.close()
+        # nightly global dedup: the carried rows only survive in the oldest snapshot
+        seen: set = set()
+        for path in sorted(tmp_path.glob("funk_br_discografia_raw_*.jsonl")):
+            dedup_snapshot.dedup_file(str(path), seen)
+
+    # al-ar-y is hydrated once; days 2 and 3 carry it forward
+    assert [album for album in hydrated if "new" not in album] == ["al-ar-y"]
+    newest = tmp_path / "funk_br_discografia_raw_20260103.jsonl"
+    newest_rows = [json.loads(line) for line in newest.read_text(encoding="utf-8").splitlines()]
+    assert {row["artist_id"] for row in newest_rows} == {"ar-new20260103"}
+
+
+class CatalogSession:
+    """``requests.Session`` stand-in serving :class:`FakeCatalogClient` payloads slowly."""
+
+    def __init__(self) -> None:
+        self.catalog = FakeCatalogClient()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def post(self, *_args, **_kwargs):
+        return FakeResponse({"access_token": "tok", "expires_in": 3600})
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(0.01)
+            return FakeResponse(self.catalog.get(url, params=params))
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+class FakeResponse:
+    status_code = 200
+    headers: dict = {}
+
+    def __init__(self, payload) -> None:
+        self._payload = payload
+
+    def json(self):
+        return self._payload
+
+    def raise_for_status(self) -> None:
+        pass
+
+
+def test_async_batches_respect_max_in_flight(tmp_path: Path, capsys) -> None:
+    session = CatalogSession()
+    client = collect_module.AsyncSpotifyClient(
+        collect_module.SpotifyClient("id", "secret", session=session), max_in_flight=1
+    )
+    artists = [f"a{i}" for i in range(8)]
+
+    with collect_module.JsonlWriter(tmp_path / "out.jsonl") as writer:
+        total = asyncio.run(
+            collect_module._collect_artists_async(client, artists, "BR", writer, workers=6)
+        )
+
+    assert total == 16
+    assert session.max_in_flight == 1
+
+
+def test_resume_counts_artists_finished_by_the_first_run(
+    tmp_path: Path, monkeypatch, capsys
+) -> None:
+    seed = tmp_path / "seed.txt"
+    seed.write_text("a\nb\n", encoding="utf-8")
+    out = tmp_path / "out.jsonl"
+    monkeypatch.setattr(
+        collect_module.SpotifyClient, "from_env", staticmethod(lambda **_: FakeCatalogClient())
+    )
+    argv = [
+        "--seed",
+        str(seed),
+        "--output",
+        str(out),
+        "--lock-file",
+        str(tmp_path / "collect.lock"),
+        "--no-resolution-cache",
+    ]
+
+    assert collect_module.main(argv) == 0
+    capsys.readouterr()
+    assert collect_module.main([*argv, "--resume"]) == 0
+
+    events = [json.loads(line) for line in capsys.readouterr().out.splitlines()[:-1]]
+    complete = [e for e in events if e["event"] == "collector_complete"]
+    assert complete[0]["rows"] == 4
+    assert complete[0]["queue"]["done"] == 2
+    assert [e["artist_query"] for e in events if e["event"] == "artist_skipped"] == ["a", "b"]
+    assert len(out.read_text(encoding="utf-8").splitlines()) == 6  # nothing collected twice
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import importlib.util
+import sys
+from pathlib import Path
+
+
+def load_module(module_name: str, relative_path: str):
+    base = Path(__file__).resolve().parent.parent
+    module_path = base / relative_path
+    if str(module_path.parent) not in sys.path:
+        sys.path.insert(0, str(module_path.parent))
+    spec = importlib.util.spec_from_file_location(module_name, module_path)
+    module = importlib.util.module_from_spec(spec)
+    assert spec and spec.loader
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+crawl_related = load_module("funkbr_crawl_related", "code/crawl_related.py")
+frontier_mod = load_module("funkbr_frontier", "code/utils/frontier.py")
+
+GRAPH = {
+    "seed": [("a", 80), ("b", 20), ("c", 60)],
+    "a": [("seed", 70), ("d", 90)],
+    "c": [("e", 10)],
+    "b": [],
+    "d": [],
+    "e": [],
+}
+
+
+class FakeGraphClient:
+    def __init__(self) -> None:
+        self.calls: list = []
+
+    def get(self, url, *, params=None):
+        self.calls.append(url)
+        if url.endswith("/search"):
+            return {"artists": {"items": [{"id": "seed", "popularity": 50}]}}
+        artist_id = url.split("/artists/")[1].split("/")[0]
+        return {
+            "artists": [
+                {"id": rid, "name": rid.upper(), "popularity": pop} for rid, pop in GRAPH[artist_id]
+            ]
+        }
+
+
+def test_crawl_respects_budget_priority_and_resumes(tmp_path: Path) -> None:
+    db = tmp_path / "frontier.sqlite"
+    frontier = frontier_mod.Frontier(db)
+    assert frontier.add_seeds(["MC Seed"]) == 1
+    client = FakeGraphClient()
+
+    first = crawl_related.crawl(client, frontier, budget=3, max_related=2, max_depth=2, market="BR")
+    assert first["requests"] == 3
+    # search, then seed (depth 0), then "a" (80 * 0.5) ahead of "c" (60 * 0.5); "b" is cut.
+    assert [url.rsplit("/", 2)[-2] for url in client.calls[1:]] == ["seed", "a"]
+    frontier.close()
+
+    frontier = frontier_mod.Frontier(db)
+    assert frontier.add_seeds(["MC Seed"]) == 0
+    second = crawl_related.crawl(
+        client, frontier, budget=10, max_related=2, max_depth=2, market="BR"
+    )
+    # "seed" stays visited; "d" and "e" sit at max_depth and are never expanded.
+    assert second["requests"] == 1
+    assert client.calls[-1].endswith("/artists/c/related-artists")
+    assert frontier.stats() == {"queued": 2, "visited": 3, "failed": 0, "unresolved_seeds": 0}
+
+    out = tmp_path / "related.txt"
+    assert crawl_related.export_discovered(frontier, out) == 4
+    assert out.read_text(encoding="utf-8").split() == ["A", "C", "D", "E"]
+    frontier.close()
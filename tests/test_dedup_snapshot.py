@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import importlib.util
+import json
+import sys
+from pathlib import Path
+
+
+def load_module(module_name: str, relative_path: str):
+    base = Path(__file__).resolve().parent.parent
+    module_path = base / relative_path
+    if str(module_path.parent) not in sys.path:
+        sys.path.insert(0, str(module_path.parent))
+    spec = importlib.util.spec_from_file_location(module_name, module_path)
+    module = importlib.util.module_from_spec(spec)
+    assert spec and spec.loader
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+dedup_snapshot = load_module("funkbr_dedup_snapshot", "code/dedup_snapshot.py")
+
+
+def _rows(*track_ids: str) -> str:
+    return "".join(
+        json.dumps({"artist_id": "ar1", "track_id": tid, "track_name": "Olha a Explosão"}) + "\n"
+        for tid in track_ids
+    )
+
+
+def test_streaming_dedup_shares_keys_and_backs_up_by_hard_link(tmp_path: Path) -> None:
+    first = tmp_path / "a.jsonl"
+    second = tmp_path / "b.jsonl"
+    first.write_text(_rows("t1", "t2", "t1") + "not json\n", encoding="utf-8")
+    second_text = _rows("t3")
+    second.write_text(second_text, encoding="utf-8")
+    original_inode = first.stat().st_ino
+
+    seen: set = set()
+    assert dedup_snapshot.dedup_file(str(first), seen, backup=True) == (4, 3, 1)
+    assert dedup_snapshot.dedup_file(str(second), seen) == (1, 1, 0)
+
+    lines = first.read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["track_id"] for line in lines[:2]] == ["t1", "t2"]
+    assert lines[2] == "not json"
+    backup = tmp_path / "a.jsonl.bak"
+    assert backup.stat().st_ino == original_inode  # linked, not copied
+    assert second.read_text(encoding="utf-8") == second_text  # nothing dropped: untouched
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["a.jsonl", "a.jsonl.bak", "b.jsonl"]
+
+    seen.clear()
+    second.write_text(_rows("t1"), encoding="utf-8")
+    dedup_snapshot.dedup_file(str(first), seen)
+    assert dedup_snapshot.dedup_file(str(second), seen) == (1, 0, 1)
+    assert second.read_text(encoding="utf-8") == ""
+
+
+def test_crash_while_backing_up_keeps_the_original_name(tmp_path: Path, monkeypatch) -> None:
+    target = tmp_path / "snap.jsonl"
+    original = _rows("t1", "t1")
+    target.write_text(original, encoding="utf-8")
+    (tmp_path / "snap.jsonl.bak").write_text("stale\n", encoding="utf-8")
+
+    real_replace = dedup_snapshot.os.replace
+
+    def crash(src, dst):
+        if str(dst) == str(target):
+            raise OSError("killed before the tmp was promoted")
+        real_replace(src, dst)
+
+    monkeypatch.setattr(dedup_snapshot.os, "replace", crash)
+    try:
+        dedup_snapshot.dedup_file(str(target), backup=True)
+    except OSError:
+        pass
+    monkeypatch.undo()
+
+    assert target.read_text(encoding="utf-8") == original
+    assert (tmp_path / "snap.jsonl.bak").read_text(encoding="utf-8") == original
+    assert dedup_snapshot.dedup_file(str(target), backup=True) == (2, 1, 1)
+    assert (tmp_path / "snap.jsonl.bak").read_text(encoding="utf-8") == original
+
+
+def test_kept_rows_are_byte_identical_with_either_parser(tmp_path: Path, monkeypatch) -> None:
+    lines = [
+        b'{"track_id": "t1",   "artist_id": "ar1", "n": 1.50}\n',
+        b'{"artist_id":"ar1","track_id":"t1"}\n',
+        b'{"external_ids": {"isrc": "BRX1"}, "name": "Ra\\u00e7\xc3\xa3o"}\n',
+        b'{"isrc": "BRX1"}\n',
+        b"\xff broken\n",
+        b'{"track_name": "Baile", "artist_name": "MC X", "year_launch": 2019}',
+    ]
+    for parser in (None, json.loads):
+        if parser is not None:
+            monkeypatch.setattr(dedup_snapshot, "_loads", parser)
+        target = tmp_path / "snap.jsonl"
+        target.write_bytes(b"".join(lines))
+        assert dedup_snapshot.dedup_file(str(target)) == (6, 4, 2)
+        assert target.read_bytes() == lines[0] + lines[2] + lines[4] + lines[5] + b"\n"
+
+
+def _run_main(monkeypatch, capsys, base: Path, *extra: str) -> list:
+    monkeypatch.setattr(
+        sys, "argv", ["dedup_snapshot.py", "--path", str(base), "--pattern", "*.jsonl", *extra]
+    )
+    dedup_snapshot.main()
+    return capsys.readouterr().out.splitlines()[1:]
+
+
+def test_parallel_and_external_modes_match_serial_output(
+    tmp_path: Path, monkeypatch, capsys
+) -> None:
+    monkeypatch.setenv("DEDUP_STORE", "")  # full global run every time
+    inputs = {
+        "a.jsonl": _rows("t1", "t2", "t1") + "not json\n",
+        "b.jsonl": _rows("t2", "t3", "t3", "t4") + "\n",
+        "c.jsonl": _rows("t4", "t1") + "not json\n",
+        "d.jsonl": _rows("t5"),
+    }
+    modes = {
+        "file": [["--jobs", "1"], ["--jobs", "3"]],
+        "global": [["--jobs", "1"], ["--jobs", "3"], ["--external", "--run-rows", "2"]],
+    }
+    for scope, variants in modes.items():
+        outputs = []
+        for n, extra in enumerate(variants):
+            base = tmp_path / f"{scope}-{n}"
+            base.mkdir()
+            for name, text in inputs.items():
+                (base / name).write_text(text, encoding="utf-8")
+            lines = _run_main(monkeypatch, capsys, base, "--scope", scope, *extra)
+            files = {p.name: p.read_bytes() for p in sorted(base.iterdir())}
+            outputs.append((lines, files))
+        for lines, files in outputs[1:]:
+            assert (lines, files) == outputs[0]
+            assert list(files) == list(inputs)  # no spill, run or tmp files left behind
+
+    lines, files = outputs[1]
+    assert lines[-1].endswith("total=12 mantidos=7 descartados=5 (41.7%)")
+    assert files["d.jsonl"] == inputs["d.jsonl"].encode()
+    assert files["c.jsonl"] == b"not json\n"
+
+
+def test_global_store_only_reads_new_or_changed_files(tmp_path: Path, monkeypatch, capsys) -> None:
+    raw = tmp_path / "raw"
+    raw.mkdir()
+    monkeypatch.setenv("DEDUP_STORE", str(tmp_path / "store.sqlite"))
+    (raw / "a.jsonl").write_text(_rows("t1", "t2", "t1"), encoding="utf-8")
+    (raw / "b.jsonl").write_text(_rows("t2", "t3"), encoding="utf-8")
+    first = _run_main(monkeypatch, capsys, raw, "--scope", "global")
+    assert first[-1].endswith("total=5 mantidos=3 descartados=2 (40.0%)")
+
+    (raw / "c.jsonl").write_text(_rows("t3", "t4", "t1"), encoding="utf-8")
+    reads = []
+    iter_lines = dedup_snapshot.iter_keyed_lines
+    monkeypatch.setattr(
+        dedup_snapshot, "iter_keyed_lines", lambda path: reads.append(path) or iter_lines(path)
+    )
+    second = _run_main(monkeypatch, capsys, raw, "--scope", "global")
+    assert reads == [str(raw / "c.jsonl")]
+    assert "2 arquivo(s) inalterado(s)" in second[0]
+    assert second[-1].endswith("total=3 mantidos=1 descartados=2 (66.7%)")
+    assert [json.loads(line)["track_id"] for line in (raw / "c.jsonl").open()] == ["t4"]
+
+    # b.jsonl rewritten: it and c.jsonl are redone in order, as a full rebuild would
+    (raw / "b.jsonl").write_text(_rows("t3", "t5", "t4"), encoding="utf-8")
+    third = _run_main(monkeypatch, capsys, raw, "--scope", "global")
+    assert "1 arquivo(s) inalterado(s)" in third[0]
+    assert third[-1].endswith("total=4 mantidos=3 descartados=1 (25.0%)")
+    track_ids = [json.loads(line)["track_id"] for line in (raw / "b.jsonl").open()]
+    assert track_ids == ["t3", "t5", "t4"]
+    assert (raw / "c.jsonl").read_text(encoding="utf-8") == ""
+
+    reads.clear()
+    rebuilt = _run_main(monkeypatch, capsys, raw, "--scope", "global", "--full-rebuild")
+    assert rebuilt[-1].endswith("total=5 mantidos=5 descartados=0 (0.0%)")
+    assert len(reads) == 6  # every file deduped, then re-read into the store
+
+    # --external never goes through the store: always a full pass, then the store is rebuilt
+    external = _run_main(monkeypatch, capsys, raw, "--scope", "global", "--external")
+    assert not any("inalterado" in line for line in external)
+    assert external[-1].endswith("total=5 mantidos=5 descartados=0 (0.0%)")
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import importlib.util
+import os
+import sys
+from pathlib import Path
+
+
+def load_module(module_name: str, relative_path: str):
+    base = Path(__file__).resolve().parent.parent
+    module_path = base / relative_path
+    if str(module_path.parent) not in sys.path:
+        sys.path.insert(0, str(module_path.parent))
+    spec = importlib.util.spec_from_file_location(module_name, module_path)
+    module = importlib.util.module_from_spec(spec)
+    assert spec and spec.loader
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+dedup_store = load_module("funkbr_dedup_store", "code/utils/dedup_store.py")
+
+
+def test_pending_uses_manifest_and_content_hash(tmp_path: Path) -> None:
+    first, second = tmp_path / "a.jsonl", tmp_path / "b.jsonl"
+    first.write_text("a\n", encoding="utf-8")
+    second.write_text("b\n", encoding="utf-8")
+    store = dedup_store.DedupStore(tmp_path / "store.sqlite")
+    files = [str(first), str(second)]
+
+    assert store.pending(files) == files
+    store.record(str(first), ["k1", "k2"])
+    store.record(str(second), ["k2", "k3"])
+    assert store.pending(files) == []
+
+    os.utime(first, ns=(1, 1))  # touched only: the hash says it is unchanged
+    assert store.pending(files) == []
+    assert store.stats() == {"files": 2, "keys": 3}
+
+    second.write_text("c\n", encoding="utf-8")
+    assert store.pending(files) == [str(second)]
+    keys = store.keys_for(str(second))
+    assert "k1" in keys and "k3" not in keys  # the changed file's keys were released
+    keys.add("k4")
+    store.record(str(second))
+
+    first.write_text("z\n", encoding="utf-8")
+    assert store.pending(files) == files  # an earlier file changed: it and everything after
+    assert "k4" not in store.keys_for(str(first))
+    store.record(str(first), ["k1"])
+    store.record(str(second), ["k4"])
+
+    assert store.pending([str(second)]) == []  # a.jsonl vanished: forgotten
+    assert store.stats() == {"files": 1, "keys": 1}
+    assert dedup_store.DedupStore.from_env("") is None
+    store.close()
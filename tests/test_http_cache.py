@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import importlib.util
+import sys
+from pathlib import Path
+
+
+def load_module(module_name: str, relative_path: str):
+    base = Path(__file__).resolve().parent.parent
+    module_path = base / relative_path
+    if str(module_path.parent) not in sys.path:
+        sys.path.insert(0, str(module_path.parent))
+    spec = importlib.util.spec_from_file_location(module_name, module_path)
+    module = importlib.util.module_from_spec(spec)
+    assert spec and spec.loader
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+http_cache = load_module("funkbr_http_cache", "code/utils/http_cache.py")
+
+API = "https://api.spotify.com/v1"
+
+
+def test_key_merges_query_string_and_sorts_params() -> None:
+    key = http_cache.ResponseCache.key
+    assert key(f"{API}/albums/a1/tracks?offset=50&limit=50", {"market": "BR"}) == key(
+        f"{API}/albums/a1/tracks", {"market": "BR", "limit": 50, "offset": 50}
+    )
+
+
+def test_ttls_expire_entries_per_endpoint(tmp_path: Path) -> None:
+    now = {"t": 0.0}
+    cache = http_cache.ResponseCache(tmp_path / "http.sqlite", clock=lambda: now["t"])
+
+    cache.put(f"{API}/albums", {"ids": "a1,a2"}, {"albums": []})
+    cache.put(f"{API}/tracks", {"ids": "t1"}, {"tracks": []})
+    cache.put(f"{API}/artists/x/albums", {"limit": 50}, {"items": []})
+
+    now["t"] = 86400.0
+    assert cache.get(f"{API}/albums", {"ids": "a1,a2"}) == {"albums": []}
+    assert cache.get(f"{API}/tracks", {"ids": "t1"}) is None  # popularity: short TTL
+    assert cache.get(f"{API}/artists/x/albums", {"limit": 50}) is None  # never cached
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_lru_eviction_keeps_recently_used(tmp_path: Path) -> None:
+    now = {"t": 0.0}
+    cache = http_cache.ResponseCache(
+        tmp_path / "http.sqlite", max_entries=2, clock=lambda: now["t"]
+    )
+    for album_id in ("a1", "a2"):
+        now["t"] += 1
+        cache.put(f"{API}/albums/{album_id}/tracks", None, {"id": album_id})
+    now["t"] += 1
+    cache.get(f"{API}/albums/a1/tracks")
+    now["t"] += 1
+    cache.put(f"{API}/albums/a3/tracks", None, {"id": "a3"})
+
+    assert cache.get(f"{API}/albums/a2/tracks") is None
+    assert cache.get(f"{API}/albums/a1/tracks") == {"id": "a1"}
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["entries"] == 2
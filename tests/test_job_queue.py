@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import importlib.util
+import sys
+from pathlib import Path
+
+
+def load_module(module_name: str, relative_path: str):
+    base = Path(__file__).resolve().parent.parent
+    module_path = base / relative_path
+    if str(module_path.parent) not in sys.path:
+        sys.path.insert(0, str(module_path.parent))
+    spec = importlib.util.spec_from_file_location(module_name, module_path)
+    module = importlib.util.module_from_spec(spec)
+    assert spec and spec.loader
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+job_queue = load_module("funkbr_job_queue", "code/utils/job_queue.py")
+
+
+def test_failed_jobs_cool_down_without_blocking_and_get_skipped(tmp_path: Path) -> None:
+    now = [1000.0]
+    db = tmp_path / "out.jsonl.queue"
+    queue = job_queue.JobQueue(
+        db, cooldown_s=60, skip_on_429=2, skip_on_errors=3, clock=lambda: now[0]
+    )
+    assert queue.enqueue(["a", "b", "c"], "BR") == 3
+
+    first = queue.claim()
+    assert (first.artist, first.attempts) == ("a", 1)
+    assert queue.fail(first, "429", rate_limited=True) == "queued"
+    # "a" cools down; the artists behind it are served meanwhile.
+    assert [queue.claim().artist, queue.claim().artist, queue.claim()] == ["b", "c", None]
+    assert queue.next_ready_at() == 1060.0
+
+    now[0] = 1061.0
+    retry = queue.claim()
+    assert (retry.artist, retry.attempts) == ("a", 2)
+    assert queue.fail(retry, "429", rate_limited=True) == "skipped"
+    assert queue.stats() == {"queued": 0, "running": 2, "done": 0, "skipped": 1}
+    queue.close()
+
+    # A reopened queue (--resume) keeps attempts and requeues jobs left running by a crash.
+    queue = job_queue.JobQueue(db, clock=lambda: now[0])
+    assert queue.enqueue(["a", "b", "c"], "BR") == 0
+    assert [queue.claim().artist, queue.claim().artist, queue.claim()] == ["b", "c", None]
+    assert queue.next_ready_at() is None
+    queue.close()
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import importlib.util
+import json
+import sys
+from pathlib import Path
+
+
+def load_module(module_name: str, relative_path: str):
+    base = Path(__file__).resolve().parent.parent
+    module_path = base / relative_path
+    if str(module_path.parent) not in sys.path:
+        sys.path.insert(0, str(module_path.parent))
+    spec = importlib.util.spec_from_file_location(module_name, module_path)
+    module = importlib.util.module_from_spec(spec)
+    assert spec and spec.loader
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+jsonl_writer = load_module("funkbr_jsonl_writer", "code/utils/jsonl_writer.py")
+
+
+def test_rows_are_committed_in_groups(tmp_path: Path) -> None:
+    now = [0.0]
+    target = tmp_path / "out.jsonl"
+    writer = jsonl_writer.JsonlWriter(
+        target, flush_rows=3, flush_ms=1000, fsync="never", clock=lambda: now[0]
+    )
+
+    writer.write({"id": 1})
+    writer.write({"id": 2})
+    assert target.read_text(encoding="utf-8") == ""
+    writer.write({"id": 3})
+    assert len(target.read_text(encoding="utf-8").splitlines()) == 3
+
+    writer.write({"id": 4, "nome": "MC Ração"})
+    now[0] = 1.5
+    writer.write({"id": 5})  # flush_ms elapsed
+    writer.write({"id": 6})
+    writer.close()
+
+    rows = [json.loads(line) for line in target.read_text(encoding="utf-8").splitlines()]
+    assert [row["id"] for row in rows] == [1, 2, 3, 4, 5, 6]
+    assert rows[3]["nome"] == "MC Ração"
+    assert writer.stats()["flushes"] == 3
+
+
+def test_partial_last_line_is_truncated_on_open(tmp_path: Path) -> None:
+    target = tmp_path / "out.jsonl"
+    target.write_bytes(b'{"id": 1}\n{"id": 2}\n{"id": 3, "tru')
+
+    with jsonl_writer.JsonlWriter(target, flush_rows=10) as writer:
+        assert writer.repaired_bytes == len(b'{"id": 3, "tru')
+        writer.write({"id": 3})
+
+    assert target.read_text(encoding="utf-8").splitlines() == [
+        '{"id": 1}',
+        '{"id": 2}',
+        '{"id": 3}',
+    ]
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import importlib.util
+import json
+import sys
+from pathlib import Path
+
+
+def load_module(module_name: str, relative_path: str):
+    base = Path(__file__).resolve().parent.parent
+    module_path = base / relative_path
+    if str(module_path.parent) not in sys.path:
+        sys.path.insert(0, str(module_path.parent))
+    spec = importlib.util.spec_from_file_location(module_name, module_path)
+    module = importlib.util.module_from_spec(spec)
+    assert spec and spec.loader
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+key_index = load_module("funkbr_key_index", "code/utils/key_index.py")
+
+
+def isrc_key(row: dict) -> str:
+    return f"isrc::{row['isrc']}"
+
+
+def write_rows(path: Path, isrcs: list[str], mode: str = "w") -> None:
+    with path.open(mode, encoding="utf-8") as handle:
+        for isrc in isrcs:
+            handle.write(json.dumps({"isrc": isrc}) + "\n")
+
+
+def test_sync_ingests_only_new_data(tmp_path: Path) -> None:
+    first, second = tmp_path / "a.jsonl", tmp_path / "b.jsonl"
+    write_rows(first, ["BR1", "BR2"])
+    write_rows(second, ["BR3"])
+    index = key_index.KeyIndex(tmp_path / "keys.sqlite", isrc_key)
+
+    assert index.sync([first, second])["ingested_rows"] == 3
+    assert "isrc::BR2" in index and "isrc::US9" not in index
+    assert index.sync([first, second])["ingested_files"] == 0
+
+    write_rows(first, ["BR4"], mode="a")
+    assert index.sync([first, second])["ingested_rows"] == 1  # only the appended tail
+
+    write_rows(second, ["BR5"])  # rewritten in place with the same size
+    assert index.sync([first, second])["ingested_rows"] == 1
+    assert "isrc::BR3" not in index and "isrc::BR5" in index
+
+    stats = index.sync([first])
+    assert stats["dropped_files"] == 1 and "isrc::BR5" not in index
+    assert len(index) == 3
+
+
+def test_key_stays_while_another_file_holds_it(tmp_path: Path) -> None:
+    first, second = tmp_path / "a.jsonl", tmp_path / "b.jsonl"
+    write_rows(first, ["BRX", "BR1"])
+    write_rows(second, ["BRX"])
+    index = key_index.KeyIndex(tmp_path / "keys.sqlite", isrc_key)
+    index.sync([first, second])
+
+    first.unlink()
+    index.sync([second])
+    assert "isrc::BRX" in index and "isrc::BR1" not in index
+
+    index.add("isrc::BR2")  # written this run; read back from its file by the next sync
+    write_rows(second, ["BRX", "BR2"])
+    assert index.sync([second])["ingested_rows"] == 1  # BRX was already ingested
+    assert "isrc::BR2" in index and len(index) == 2
+    index.close()
+
+
+def test_lazy_index_opens_on_first_lookup(tmp_path: Path) -> None:
+    raw = tmp_path / "raw.jsonl"
+    write_rows(raw, ["BR1"])
+    lazy = key_index.LazyKeyIndex(tmp_path / "keys.sqlite", isrc_key, lambda: [raw])
+
+    assert not lazy.loaded and not (tmp_path / "keys.sqlite").exists()
+    assert "isrc::BR1" in lazy
+    lazy.add("isrc::BR9")
+    assert "isrc::BR9" in lazy and lazy.last_sync["ingested_rows"] == 1
+    lazy.close()
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import importlib.util
+import json
+import sys
+from pathlib import Path
+
+
+def load_module(module_name: str, relative_path: str):
+    base = Path(__file__).resolve().parent.parent
+    module_path = base / relative_path
+    if str(module_path.parent) not in sys.path:
+        sys.path.insert(0, str(module_path.parent))
+    spec = importlib.util.spec_from_file_location(module_name, module_path)
+    module = importlib.util.module_from_spec(spec)
+    assert spec and spec.loader
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+markets = load_module("funkbr_markets", "code/utils/markets.py")
+
+
+def test_compact_row_round_trips_and_keeps_plain_fields() -> None:
+    all_markets = list(markets.MARKET_DICTIONARIES[1])
+    row = {"track_id": "t1", "available_markets": all_markets + ["ZZ"], "n_markets": 186}
+
+    compact = markets.compact_row(dict(row))
+
+    assert "available_markets" not in compact
+    assert compact["n_markets"] == 186
+    assert compact[markets.EXTRA_FIELD] == ["ZZ"]
+    assert len(json.dumps(compact)) < len(json.dumps(row)) / 5
+    assert markets.row_markets(compact) == all_markets + ["ZZ"]
+    assert markets.expand_row(compact) == row
+
+
+def test_row_markets_reads_either_form() -> None:
+    bits, extra = markets.encode_markets(["US", "BR"])
+
+    assert markets.row_markets({"available_markets": ["US", "BR"]}) == ["US", "BR"]
+    assert markets.row_markets({markets.BITS_FIELD: bits, markets.VERSION_FIELD: 1}) == [
+        "BR",
+        "US",
+    ]
+    assert extra == []
+    assert markets.row_markets({}) == []
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import importlib.util
+import json
+import sys
+from pathlib import Path
+
+
+def load_module(module_name: str, relative_path: str):
+    base = Path(__file__).resolve().parent.parent
+    module_path = base / relative_path
+    if str(module_path.parent) not in sys.path:
+        sys.path.insert(0, str(module_path.parent))
+    spec = importlib.util.spec_from_file_location(module_name, module_path)
+    module = importlib.util.module_from_spec(spec)
+    assert spec and spec.loader
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+progress_journal = load_module("funkbr_progress_journal", "code/utils/progress_journal.py")
+
+
+def test_saves_are_coalesced_replayed_and_compacted(tmp_path: Path) -> None:
+    now = [0.0]
+    target = tmp_path / "progress.json"
+    target.write_text(json.dumps({"artist_index": 3, "snapshot": "20250101"}), encoding="utf-8")
+    journal = progress_journal.ProgressJournal(
+        target, flush_ms=100, compact_every=3, clock=lambda: now[0]
+    )
+    assert journal.state["artist_index"] == 3  # legacy plain JSON is still read
+
+    for album in range(1, 6):
+        journal.save(stage="tracks", album_index=album)
+    assert journal.appends == 0  # no write before flush_ms elapses
+
+    now[0] = 0.2
+    journal.save(stage="artist", artist_index=4)
+    assert journal.appends == 1
+    assert progress_journal.ProgressJournal(target).load()["album_index"] == 5
+
+    # A torn last line (crash mid-append) is cut off when the journal is reopened, so
+    # the first save after the crash is not glued onto it.
+    with journal.journal_path.open("a", encoding="utf-8") as handle:
+        handle.write('{"artist_index": 99')
+    journal = progress_journal.ProgressJournal(
+        target, flush_ms=100, compact_every=3, clock=lambda: now[0]
+    )
+    assert journal.state["artist_index"] == 4
+    now[0] += 0.2
+    journal.save(stage="tracks", artist_index=5)
+    lines = journal.journal_path.read_bytes().splitlines()
+    assert [json.loads(line)["artist_index"] for line in lines] == [4, 5]
+    assert progress_journal.ProgressJournal(target).load()["artist_index"] == 5
+
+    now[0] += 0.2
+    journal.save(artist_index=6)
+    assert journal.compactions == 1
+    assert journal.journal_path.read_bytes() == b""
+    assert json.loads(target.read_text(encoding="utf-8"))["artist_index"] == 6
+
+    journal.save(stage="done")
+    journal.close()
+    assert json.loads(target.read_text(encoding="utf-8"))["stage"] == "done"
+    assert progress_journal.ProgressJournal(target).load() == journal.state
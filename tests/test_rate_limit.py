@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import importlib.util
+import sys
+from pathlib import Path
+
+
+def load_module(module_name: str, relative_path: str):
+    base = Path(__file__).resolve().parent.parent
+    module_path = base / relative_path
+    if str(module_path.parent) not in sys.path:
+        sys.path.insert(0, str(module_path.parent))
+    spec = importlib.util.spec_from_file_location(module_name, module_path)
+    module = importlib.util.module_from_spec(spec)
+    assert spec and spec.loader
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+rate_limit = load_module("funkbr_rate_limit", "code/utils/rate_limit.py")
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+def make_limiter(state: Path, clock: FakeClock):
+    return rate_limit.SharedRateLimiter(
+        state, max_requests=2, window_seconds=10, clock=clock, sleep=clock.sleep
+    )
+
+
+def test_bucket_is_shared_between_instances(tmp_path: Path) -> None:
+    clock = FakeClock()
+    state = tmp_path / "rate.json"
+    first, second = make_limiter(state, clock), make_limiter(state, clock)
+
+    assert first.reserve() == 0.0
+    assert second.reserve() == 0.0
+    assert first.reserve() == 5.0  # bucket empty, refills at 2 req / 10 s
+
+    assert second.acquire() == 5.0
+    assert clock.now == 1005.0
+
+
+def test_pause_blocks_every_process(tmp_path: Path) -> None:
+    clock = FakeClock()
+    state = tmp_path / "rate.json"
+    first, second = make_limiter(state, clock), make_limiter(state, clock)
+
+    first.pause(30)
+
+    assert second.reserve() == 30.0
+    clock.now += 30
+    assert second.reserve() == 0.0
+
+
+def test_disabled_limiter_never_waits(tmp_path: Path) -> None:
+    limiter = rate_limit.SharedRateLimiter(tmp_path / "rate.json", max_requests=0)
+
+    assert all(limiter.reserve() == 0.0 for _ in range(100))
+    assert not (tmp_path / "rate.json").exists()
+
+
+def test_urlopen_json_retries_once_with_a_fresh_token_on_401(monkeypatch) -> None:
+    import io
+    from urllib import error, request
+
+    class Provider:
+        def __init__(self) -> None:
+            self.tokens = ["expired", "fresh"]
+            self.invalidated: list[str] = []
+
+        def __call__(self) -> str:
+            return self.tokens[0]
+
+        def invalidate(self, token: str) -> None:
+            self.invalidated.append(token)
+            self.tokens.remove(token)
+
+    seen: list[str] = []
+
+    def fake_urlopen(req, timeout=None):
+        seen.append(req.get_header("Authorization"))
+        if seen[-1] != "Bearer fresh":
+            raise error.HTTPError(req.full_url, 401, "Unauthorized", {}, None)
+        return io.BytesIO(b'{"ok": true}')
+
+    monkeypatch.setattr(rate_limit.request, "urlopen", fake_urlopen)
+    provider = Provider()
+    req = request.Request("https://api.spotify.com/v1/tracks?ids=x")
+
+    assert rate_limit.urlopen_json(req, None, max_tries=1, auth=provider) == {"ok": True}
+    assert seen == ["Bearer expired", "Bearer fresh"]
+    assert provider.invalidated == ["expired"]
+
+    provider.tokens = ["revoked"]
+    monkeypatch.setattr(provider, "invalidate", lambda token: None)
+    try:
+        rate_limit.urlopen_json(req, None, auth=provider)
+    except error.HTTPError as exc:
+        assert exc.code == 401  # a second 401 is the caller's problem
+    else:
+        raise AssertionError("expected HTTPError")
+    assert seen[2:] == ["Bearer revoked", "Bearer revoked"]
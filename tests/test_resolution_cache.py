@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import importlib.util
+import sys
+from pathlib import Path
+
+
+def load_module(module_name: str, relative_path: str):
+    base = Path(__file__).resolve().parent.parent
+    module_path = base / relative_path
+    if str(module_path.parent) not in sys.path:
+        sys.path.insert(0, str(module_path.parent))
+    spec = importlib.util.spec_from_file_location(module_name, module_path)
+    module = importlib.util.module_from_spec(spec)
+    assert spec and spec.loader
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+resolution_cache = load_module("funkbr_resolution_cache", "code/utils/resolution_cache.py")
+DAY = resolution_cache.DAY
+
+
+def test_matches_and_misses_expire_on_their_own_ttl(tmp_path: Path) -> None:
+    now = [0.0]
+    db = tmp_path / "resolution.sqlite"
+    cache = resolution_cache.ResolutionCache(
+        db, ttl_s=30 * DAY, negative_ttl_s=DAY, clock=lambda: now[0]
+    )
+    artist = {"id": "ar1", "name": "MC Kevinho", "popularity": 70, "images": [{"url": "x"}]}
+    runner_up = {"id": "ar2", "name": "MC Kevin", "score": 93.3}
+    cache.put("MC Kevinho", "fuzzy", "", artist, score=100.0, candidates=[runner_up])
+    cache.put("MC Ninguém", "fuzzy", "", None)
+    cache.close()
+
+    cache = resolution_cache.ResolutionCache(
+        db, ttl_s=30 * DAY, negative_ttl_s=DAY, clock=lambda: now[0]
+    )
+    hit = cache.get("  mc   KEVINHO ", "fuzzy")
+    assert hit.artist == {"id": "ar1", "name": "MC Kevinho", "popularity": 70}
+    assert (hit.score, hit.candidates) == (100.0, [runner_up])
+    assert cache.get("MC Kevinho", "search_top1", "BR") is None  # other strategy
+    assert cache.get("mc ninguém", "fuzzy").found is False
+    assert cache.get("MC Ninguem", "fuzzy") is None  # accents are part of the key
+
+    now[0] = 2 * DAY
+    assert cache.get("MC Ninguém", "fuzzy") is None
+    assert cache.get("MC Kevinho", "fuzzy").artist_id == "ar1"
+    assert cache.stats() == {"hits": 2, "negative_hits": 1, "misses": 3}
+    cache.close()
@@ -56,3 +56,16 @@ def test_schema_validation_reports_missing_fields(tmp_path: Path) -> None:
     errors = validate_schema.validate_records(Path("schema.json"), sample)
     assert errors, "expected validation errors for missing track_name"
     assert any("track_name" in message for message in errors)
+
+
+def test_schema_accepts_compact_markets_but_not_both_forms(tmp_path: Path) -> None:
+    compact = build_record(available_markets_bits="AAAgAAAAAAAAAAAAAAAAAAAAAAAAIAAA")
+    compact.pop("available_markets")
+    compact["markets_dict_version"] = 1
+    both = build_record(available_markets_bits="AAAg", markets_dict_version=1)
+    sample = tmp_path / "compact.jsonl"
+    sample.write_text(json.dumps(compact) + "\n" + json.dumps(both) + "\n", encoding="utf-8")
+
+    errors = validate_schema.validate_records(Path("schema.json"), sample)
+    assert len(errors) == 1
+    assert errors[0].startswith("line 2:")
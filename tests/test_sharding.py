@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import importlib.util
+import json
+import sys
+from pathlib import Path
+
+
+def load_module(module_name: str, relative_path: str):
+    base = Path(__file__).resolve().parent.parent
+    module_path = base / relative_path
+    if str(module_path.parent) not in sys.path:
+        sys.path.insert(0, str(module_path.parent))
+    spec = importlib.util.spec_from_file_location(module_name, module_path)
+    module = importlib.util.module_from_spec(spec)
+    assert spec and spec.loader
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+sharding = load_module("funkbr_sharding", "code/utils/sharding.py")
+merge_shards = load_module("funkbr_merge_shards", "code/merge_shards.py")
+
+
+def test_assignment_is_stable_and_partitions_the_seed(tmp_path: Path) -> None:
+    (tmp_path / "seed_part_2.txt").write_text("MC Kevin\nAnitta\n", encoding="utf-8")
+    (tmp_path / "seed_part_10.txt").write_text("Ludmilla\n# comentário\n", encoding="utf-8")
+    (tmp_path / "seed_part_1.txt").write_text("anitta \nMC Livinho\n", encoding="utf-8")
+
+    artists = sharding.load_seed_parts(tmp_path)
+    shards = [sharding.select_shard(artists, i, 3) for i in (1, 2, 3)]
+
+    assert artists == ["anitta", "MC Livinho", "MC Kevin", "Ludmilla"]
+    assert sorted(sum(shards, [])) == sorted(artists)
+    assert sharding.shard_of("Anitta", 3) == sharding.shard_of("  anitta", 3)
+    # SHA-1 based, so these values must never change between runs or machines.
+    assert [sharding.shard_of(name, 4) for name in artists] == [3, 1, 3, 3]
+    assert sharding.parse_shard("2/5") == (2, 5)
+
+
+def test_merge_dedups_globally_and_writes_manifest(tmp_path: Path) -> None:
+    shard_dir = tmp_path / "shards"
+    shard_dir.mkdir()
+    rows = {
+        1: [
+            {"_type": "artist_meta", "artist_query": "A", "market": "BR"},
+            {"_type": "track_row", "artist_id": "a", "track_id": "t1", "isrc": "BR1"},
+        ],
+        2: [
+            {"_type": "track_row", "artist_id": "b", "track_id": "t9", "isrc": "BR1"},
+            {"_type": "track_row", "artist_id": "b", "track_id": "t2", "isrc": "BR2"},
+        ],
+    }
+    for index, shard_rows in rows.items():
+        path = shard_dir / f"funk_br_discografia_raw_20260101_shard-{index}-of-2.jsonl"
+        path.write_text("".join(json.dumps(row) + "\n" for row in shard_rows), encoding="utf-8")
+    with path.open("a", encoding="utf-8") as handle:
+        handle.write("[]\n1\n")  # valid JSON, not an object: kept like a broken line
+    out = tmp_path / "merged.jsonl"
+
+    code = merge_shards.main(
+        ["--snapshot", "20260101", "--shard-dir", str(shard_dir), "--output", str(out)]
+    )
+
+    lines = out.read_text(encoding="utf-8").splitlines()
+    merged = [json.loads(line) for line in lines[:3]]
+    manifest = json.loads((tmp_path / "merged.jsonl.manifest.json").read_text(encoding="utf-8"))
+    assert code == 0
+    assert [row.get("isrc") for row in merged] == [None, "BR1", "BR2"]
+    assert lines[3:] == ["[]", "1"]
+    assert manifest["duplicates"] == 1
+    assert manifest["output"]["rows"] == 5
+    assert [entry["kept"] for entry in manifest["inputs"]] == [2, 3]
+    assert merge_shards.main(["--snapshot", "20260102", "--shard-dir", str(shard_dir)]) == 3
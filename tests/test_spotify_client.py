@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import sys
+import threading
+import time
+from pathlib import Path
+
+
+def load_module(module_name: str, relative_path: str):
+    base = Path(__file__).resolve().parent.parent
+    module_path = base / relative_path
+    if str(module_path.parent) not in sys.path:
+        sys.path.insert(0, str(module_path.parent))
+    spec = importlib.util.spec_from_file_location(module_name, module_path)
+    module = importlib.util.module_from_spec(spec)
+    assert spec and spec.loader
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+client_module = load_module("funkbr_spotify_client", "code/spotify_client.py")
+
+
+class FakeResponse:
+    def __init__(self, status_code: int = 200, payload=None, headers=None) -> None:
+        self.status_code = status_code
+        self._payload = payload if payload is not None else {}
+        self.headers = headers or {}
+
+    def json(self):
+        return self._payload
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+
+class FakeSession:
+    """Records GETs and replays scripted responses (default: 200 echoing the URL)."""
+
+    def __init__(self, script=None, delay: float = 0.0) -> None:
+        self.script = list(script or [])
+        self.delay = delay
+        self.calls: list[tuple[str, dict | None]] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def post(self, *_args, **_kwargs) -> FakeResponse:
+        return FakeResponse(payload={"access_token": "tok", "expires_in": 3600})
+
+    def get(self, url, params=None, headers=None, timeout=None) -> FakeResponse:
+        with self._lock:
+            self.calls.append((url, params))
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            response = self.script.pop(0) if self.script else None
+        try:
+            if self.delay:
+                time.sleep(self.delay)
+            return response or FakeResponse(payload={"url": url, "params": params})
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+def make_client(session: FakeSession, **kwargs):
+    retry = client_module.RetryConfig(max_tries=3, base=0.0, cap=0.0)
+    return client_module.SpotifyClient("id", "secret", session=session, retry=retry, **kwargs)
+
+
+def test_sync_get_retries_after_rate_limit() -> None:
+    session = FakeSession([FakeResponse(429, headers={"Retry-After": "0"})])
+    client = make_client(session)
+
+    payload = client.get("https://api.spotify.com/v1/albums/a1")
+
+    assert payload["url"].endswith("/albums/a1")
+    assert len(session.calls) == 2
+
+
+def test_async_client_bounds_in_flight_requests() -> None:
+    session = FakeSession(delay=0.02)
+    aclient = client_module.AsyncSpotifyClient(make_client(session), max_in_flight=3)
+
+    async def run():
+        urls = [f"https://api.spotify.com/v1/albums/{i}" for i in range(12)]
+        return await asyncio.gather(*(aclient.get(url) for url in urls))
+
+    results = asyncio.run(run())
+
+    assert [r["url"].rsplit("/", 1)[1] for r in results] == [str(i) for i in range(12)]
+    assert 1 < session.max_in_flight <= 3
+
+
+def test_async_client_retries_server_errors() -> None:
+    session = FakeSession([FakeResponse(503), FakeResponse(401)])
+    aclient = client_module.AsyncSpotifyClient(make_client(session), max_in_flight=2)
+
+    payload = asyncio.run(aclient.get("https://api.spotify.com/v1/tracks", params={"ids": "t1"}))
+
+    assert payload["params"] == {"ids": "t1"}
+    assert len(session.calls) == 3
+
+
+def test_pacer_backs_off_on_throttle_and_decays_after_successes() -> None:
+    pacing = load_module("funkbr_pacing", "code/utils/pacing.py")
+    pacer = pacing.AdaptivePacer(step=0.25, max_delay=1.0, decay_every=2, sleep=lambda _: None)
+    session = FakeSession([FakeResponse(429, headers={"Retry-After": "0"}), FakeResponse(502)])
+    client = make_client(session, pacer=pacer)
+
+    client.get("https://api.spotify.com/v1/albums/a1")
+    assert pacer.delay == 0.5
+    assert client.stats()["pacing"]["rate"] == 2.0
+
+    client.get("https://api.spotify.com/v1/albums/a2")
+    assert pacer.delay == 0.25
+    for _ in range(4):
+        pacer.on_success()
+    assert pacer.delay == 0.0
+    assert pacer.rate is None
+
+
+def test_identical_requests_are_coalesced_and_memoized() -> None:
+    session = FakeSession(delay=0.05)
+    client = make_client(session)
+    aclient = client_module.AsyncSpotifyClient(client, max_in_flight=4)
+
+    async def run():
+        return await asyncio.gather(
+            *(aclient.get("https://api.spotify.com/v1/albums/a1/tracks") for _ in range(5))
+        )
+
+    results = asyncio.run(run())
+    threads = [
+        threading.Thread(target=client.get, args=("https://api.spotify.com/v1/albums/a2",))
+        for _ in range(3)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    client.get("https://api.spotify.com/v1/albums/a1/tracks")
+
+    assert all(result is results[0] for result in results)
+    assert [url.rsplit("/v1/", 1)[1] for url, _ in session.calls] == [
+        "albums/a1/tracks",
+        "albums/a2",
+    ]
+    assert client.stats()["coalescing"]["saved_calls"] == 7
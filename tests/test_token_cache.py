@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import importlib.util
+import sys
+from pathlib import Path
+
+
+def load_module(module_name: str, relative_path: str):
+    base = Path(__file__).resolve().parent.parent
+    module_path = base / relative_path
+    if str(module_path.parent) not in sys.path:
+        sys.path.insert(0, str(module_path.parent))
+    spec = importlib.util.spec_from_file_location(module_name, module_path)
+    module = importlib.util.module_from_spec(spec)
+    assert spec and spec.loader
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+token_cache = load_module("funkbr_token_cache", "code/utils/token_cache.py")
+
+
+def test_token_is_reused_until_refresh_margin(tmp_path: Path) -> None:
+    now = {"t": 1000.0}
+    fetches: list[str] = []
+
+    def fetch():
+        fetches.append("post")
+        return {"access_token": f"tok{len(fetches)}", "expires_in": 3600}
+
+    cache = token_cache.TokenCache(
+        tmp_path / "token.json", refresh_margin=300, clock=lambda: now["t"]
+    )
+    other_process = token_cache.TokenCache(
+        tmp_path / "token.json", refresh_margin=300, clock=lambda: now["t"]
+    )
+
+    assert cache.get("client", fetch) == ("tok1", 4600.0)
+    assert other_process.get("client", fetch)[0] == "tok1"
+    now["t"] = 4299.0
+    assert cache.get("client", fetch)[0] == "tok1"
+    now["t"] = 4301.0  # inside the refresh margin
+    assert cache.get("client", fetch)[0] == "tok2"
+    assert len(fetches) == 2
+    assert (tmp_path / "token.json").stat().st_mode & 0o777 == 0o600
+
+
+def test_invalidate_only_drops_matching_token(tmp_path: Path) -> None:
+    cache = token_cache.TokenCache(tmp_path / "token.json")
+    cache.get("client", lambda: {"access_token": "fresh", "expires_in": 3600})
+
+    cache.invalidate("client", "stale")
+    assert cache.get("client", lambda: {"access_token": "other"})[0] == "fresh"
+
+    cache.invalidate("client", "fresh")
+    assert cache.get("client", lambda: {"access_token": "other"})[0] == "other"